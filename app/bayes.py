@@ -0,0 +1,111 @@
+import copy
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Prior on the (similarity, citation score, recency) weights
+PRIOR_MEAN = np.array([0.8, 0.5, 0.5])
+PRIOR_SD = np.array([0.3, 0.3, 0.3])
+
+
+class BayesianLinearRanker:
+    """
+    Closed-form Bayesian linear regression with Gaussian weight priors.
+
+    Only the sufficient statistics X'X, X'y, y'y and n are kept, so new papers
+    or relevance feedback can be folded in with update() in O(d^2) and the
+    posterior recomputed in O(d^3) for d=3 features, i.e. microseconds.
+
+    The noise scale is estimated by a few EM (variational) iterations instead
+    of being sampled, which gives the posterior mean weights that MCMC on
+    the same model converges to.
+    """
+
+    def __init__(
+        self,
+        prior_mean: Sequence[float] = PRIOR_MEAN,
+        prior_sd: Sequence[float] = PRIOR_SD,
+        sigma: Optional[float] = None,
+        em_iterations: int = 20,
+    ):
+        self.prior_mean = np.asarray(prior_mean, dtype=float)
+        self.prior_precision = np.diag(1.0 / np.asarray(prior_sd, dtype=float) ** 2)
+        self.fixed_sigma = sigma
+        self.em_iterations = em_iterations
+        d = len(self.prior_mean)
+        self.xtx = np.zeros((d, d))
+        self.xty = np.zeros(d)
+        self.yty = 0.0
+        self.n = 0
+        self.sigma2 = (sigma ** 2) if sigma else 1.0
+        self._posterior = None
+
+    def update(self, X, y=None) -> "BayesianLinearRanker":
+        """Add observations. y defaults to 1 for every row (an 'is relevant' anchor)."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if X.size == 0:
+            return self
+        y = np.ones(len(X)) if y is None else np.asarray(y, dtype=float)
+        self.xtx += X.T @ X
+        self.xty += X.T @ y
+        self.yty += float(y @ y)
+        self.n += len(X)
+        self._posterior = None
+        return self
+
+    def copy(self) -> "BayesianLinearRanker":
+        """An independent ranker with the same prior and observations."""
+        other = copy.copy(self)
+        other.xtx, other.xty = self.xtx.copy(), self.xty.copy()
+        return other
+
+    def _solve(self, sigma2: float):
+        precision = self.prior_precision + self.xtx / sigma2
+        cov = np.linalg.inv(precision)
+        mean = cov @ (self.prior_precision @ self.prior_mean + self.xty / sigma2)
+        return mean, cov
+
+    def posterior(self):
+        """(mean, covariance) of the weight posterior."""
+        if self._posterior is None:
+            sigma2 = self.sigma2
+            mean, cov = self._solve(sigma2)
+            if self.fixed_sigma is None and self.n:
+                for _ in range(self.em_iterations):
+                    # E[||y - Xw||^2] under the current posterior
+                    resid = self.yty - 2 * mean @ self.xty + mean @ self.xtx @ mean
+                    sigma2 = max((resid + np.trace(self.xtx @ cov)) / self.n, 1e-6)
+                    mean, cov = self._solve(sigma2)
+            self.sigma2 = sigma2
+            self._posterior = (mean, cov)
+        return self._posterior
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self.posterior()[0]
+
+    def predict(self, X) -> np.ndarray:
+        """Posterior predictive mean relevance for each row of X."""
+        return np.asarray(X, dtype=float) @ self.weights
+
+
+def pymc_posterior_mean(X, draws: int = 2000, tune: int = 500, chains: int = 4, cores: int = 4) -> np.ndarray:
+    """
+    Posterior mean weights by MCMC (the original engine). Slow; kept to
+    validate the analytic engine.
+    """
+    import pymc as pm
+
+    X = np.asarray(X, dtype=float)
+    with pm.Model():
+        # Priors on weights
+        w = pm.Normal("w", mu=PRIOR_MEAN, sigma=PRIOR_SD, shape=X.shape[1])
+        sigma = pm.HalfNormal("sigma", sigma=1.0)
+
+        mu = pm.math.dot(X, w)
+        pm.Normal("relevance", mu=mu, sigma=sigma, observed=np.ones(len(X)))  # fake obs to anchor
+
+        trace = pm.sample(draws, tune=tune, chains=chains, cores=cores, progressbar=True)
+
+    # Posterior mean weights
+    return trace.posterior["w"].mean(dim=["chain", "draw"]).values
@@ -0,0 +1,227 @@
+import atexit
+import collections
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app import config
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36"
+)
+VIEWPORT = {"width": 1280, "height": 900}
+BLOCKED_RESOURCES = ("image", "font", "stylesheet", "media")
+
+
+def _route_request(route):
+    """Skip heavy resources the scraper never looks at, except in captcha widgets."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCES and "recaptcha" not in request.url:
+        route.abort()
+    else:
+        route.continue_()
+
+
+class BrowserSlot:
+    """
+    One warm Chromium browser + context + page.
+    Playwright's sync API is bound to the thread that started it, so every
+    slot owns a single worker thread and all browser work runs there.
+    """
+
+    def __init__(self, headless: bool, slow_mo: int, max_pages: int, block_resources: bool = True):
+        self.headless = headless
+        self.slow_mo = slow_mo
+        self.max_pages = max_pages
+        self.block_resources = block_resources
+        self.pages_served = 0
+        self.launches = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser-slot")
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._page = None
+
+    # ── runs on the slot thread ───────────────────────────────────────────────
+    def _healthy(self) -> bool:
+        return (
+            self._browser is not None
+            and self._browser.is_connected()
+            and self._page is not None
+            and not self._page.is_closed()
+        )
+
+    def _launch(self):
+        from playwright.sync_api import sync_playwright
+
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=self.headless, slow_mo=self.slow_mo)
+        self._context = self._browser.new_context(user_agent=USER_AGENT, viewport=VIEWPORT)
+        if self.block_resources:
+            self._context.route("**/*", _route_request)
+        self._page = self._context.new_page()
+        self.pages_served = 0
+        self.launches += 1
+        print(f"DEBUG: Launched browser (headless={self.headless}, launch #{self.launches})")
+
+    def _shutdown_browser(self):
+        try:
+            if self._browser is not None:
+                self._browser.close()
+        except Exception as e:
+            print(f"⚠️ Error closing browser: {e}")
+        self._browser = self._context = self._page = None
+
+    def _ensure_ready(self):
+        if self.pages_served >= self.max_pages:
+            print(f"DEBUG: Recycling browser after {self.pages_served} pages")
+            self._shutdown_browser()
+        if not self._healthy():
+            self._shutdown_browser()
+            self._launch()
+
+    def _run(self, fn: Callable[[Any], Any]):
+        self._ensure_ready()
+        try:
+            result = fn(self._page)
+        except Exception:
+            # crashed or wedged browser: start fresh on the next call
+            self._shutdown_browser()
+            raise
+        self.pages_served += 1
+        return result
+
+    def _stop(self):
+        self._shutdown_browser()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    # ── called from any thread ────────────────────────────────────────────────
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        return self._executor.submit(self._run, fn)
+
+    def warm(self) -> Future:
+        return self._executor.submit(self._ensure_ready)
+
+    def close(self):
+        if self._playwright is not None:
+            try:
+                self._executor.submit(self._stop).result()
+            except RuntimeError:
+                # interpreter shutdown: executors take no new work, the browser exits with us
+                pass
+        self._executor.shutdown(wait=True)
+
+
+class BrowserPool:
+    """
+    Long-lived pool of browser slots shared across searches.
+    pool.run(fn) borrows a free slot and calls fn(page) on it;
+    pool.submit(fn) does the same without blocking and returns a Future,
+    queueing the call until a slot frees up.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        headless: bool = False,
+        slow_mo: int = 200,
+        max_pages: int = 100,
+        block_resources: bool = True,
+    ):
+        self.size = size
+        self.headless = headless
+        self._slots = [BrowserSlot(headless, slow_mo, max_pages, block_resources) for _ in range(size)]
+        self._free = collections.deque(self._slots)
+        self._waiting = collections.deque()  # (fn, future) with no slot yet
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        outer = Future()
+        with self._lock:
+            if not self._free:
+                self._waiting.append((fn, outer))
+                return outer
+            slot = self._free.popleft()
+        self._dispatch(slot, fn, outer)
+        return outer
+
+    def _dispatch(self, slot: BrowserSlot, fn, outer: Future):
+        if not outer.set_running_or_notify_cancel():
+            self._release(slot)
+            return
+        inner = slot.submit(fn)
+
+        def done(f: Future):
+            try:
+                if f.cancelled():
+                    # e.g. the slot's executor shut down; outer is already running, so fail it
+                    outer.set_exception(CancelledError())
+                elif f.exception() is not None:
+                    outer.set_exception(f.exception())
+                else:
+                    outer.set_result(f.result())
+            finally:
+                self._release(slot)
+
+        inner.add_done_callback(done)
+
+    def _release(self, slot: BrowserSlot):
+        with self._lock:
+            if not self._waiting:
+                self._free.append(slot)
+                return
+            fn, outer = self._waiting.popleft()
+        self._dispatch(slot, fn, outer)
+
+    def run(self, fn: Callable[[Any], Any], timeout: Optional[float] = None):
+        return self.submit(fn).result(timeout=timeout)
+
+    def warm(self):
+        """Launch every browser up front instead of on first use."""
+        for future in [slot.warm() for slot in self._slots]:
+            future.result()
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "headless": self.headless,
+            "free": len(self._free),
+            "waiting": len(self._waiting),
+            "launches": sum(s.launches for s in self._slots),
+            "pages_served": [s.pages_served for s in self._slots],
+        }
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for slot in self._slots:
+            slot.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Process-wide browser pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                size=config.BROWSER_POOL_SIZE,
+                headless=config.BROWSER_HEADLESS,
+                slow_mo=config.BROWSER_SLOW_MO,
+                max_pages=config.BROWSER_MAX_PAGES,
+                block_resources=config.BROWSER_BLOCK_RESOURCES,
+            )
+            atexit.register(_pool.close)
+    return _pool
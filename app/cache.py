@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from app import config
+from app.tracing import CACHE_REQUESTS
+
+
+class DiskCache:
+    """
+    Small SQLite-backed key/value cache with TTL and LRU eviction.
+    Values are stored as JSON. Safe to share between threads.
+    max_entries / max_bytes cap the row count / total JSON size.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table}(accessed)")
+        self._conn.commit()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache=self.table, result="miss")
+                return default
+            value, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache=self.table, result="miss")
+                return default
+            self._conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        CACHE_REQUESTS.inc(cache=self.table, result="hit")
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl is not None:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE created < ?", (now - self.ttl,))
+        if self.max_entries is not None:
+            # drop least recently used rows beyond the cap
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        if self.max_bytes is not None:
+            # keep the most recently used rows that fit in max_bytes
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM (SELECT key, SUM(LENGTH(value)) OVER (ORDER BY accessed DESC) AS running "
+                f"FROM {self.table}) WHERE running > ?)",
+                (self.max_bytes,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+
+# ── Scholar result page cache ─────────────────────────────────────────────────
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def page_key(query: str, sort_by: str, start: int) -> str:
+    return f"{normalize_query(query)}|{sort_by}|{start}"
+
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[DiskCache]:
+    """Shared page cache, or None when caching is disabled."""
+    global _page_cache
+    if not config.PAGE_CACHE_ENABLED:
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = DiskCache(
+                os.path.join(config.CACHE_DIR, "scholar_pages.sqlite3"),
+                table="pages",
+                ttl=config.PAGE_CACHE_TTL,
+                max_entries=config.PAGE_CACHE_MAX_ENTRIES,
+            )
+    return _page_cache
+
+
+# ── Per-paper LLM summaries ───────────────────────────────────────────────────
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> Optional[DiskCache]:
+    """Shared cache of paper summaries, or None when disabled."""
+    global _summary_cache
+    if not config.SUMMARY_CACHE_ENABLED:
+        return None
+    with _summary_cache_lock:
+        if _summary_cache is None:
+            _summary_cache = DiskCache(
+                os.path.join(config.CACHE_DIR, "summaries.sqlite3"),
+                table="summaries",
+                ttl=config.SUMMARY_CACHE_TTL,
+            )
+    return _summary_cache
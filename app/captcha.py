@@ -0,0 +1,108 @@
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+
+class CaptchaBroker:
+    """
+    In-process coordination between scrape sessions blocked on a captcha
+    and whoever can unblock them (the Streamlit UI, the API).
+
+    Each scrape session registers its captcha wait under its own id, so
+    concurrent sessions never clobber each other and the others keep
+    scraping. Events ({"type": "captcha" | "resume" | "resolved" | "done",
+    "session": id, ...}) are pushed to listeners as they happen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, dict] = {}
+        self._events: Dict[str, threading.Event] = {}
+        self._listeners: List[tuple] = []  # (session filter or None, callback)
+
+    @staticmethod
+    def new_session() -> str:
+        return uuid.uuid4().hex
+
+    # ── pub/sub ───────────────────────────────────────────────────────────────
+    def publish(self, event: dict):
+        event.setdefault("time", time.time())
+        with self._lock:
+            listeners = list(self._listeners)
+        for session_filter, callback in listeners:
+            if session_filter is None or session_filter == event.get("session"):
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"⚠️ Captcha listener failed: {e}")
+
+    def listen(self, callback: Callable[[dict], None], session_id: Optional[str] = None) -> Callable[[], None]:
+        """Call callback(event) for every event (of one session); returns an unsubscribe function."""
+        entry = (session_id, callback)
+        with self._lock:
+            self._listeners.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._listeners:
+                    self._listeners.remove(entry)
+
+        return unsubscribe
+
+    def subscribe(self, session_id: Optional[str] = None):
+        """Queue receiving events, plus its unsubscribe function."""
+        q = queue.Queue()
+        return q, self.listen(q.put, session_id)
+
+    # ── scraper side ──────────────────────────────────────────────────────────
+    def register(self, session_id: str, url: str = "") -> threading.Event:
+        """Announce that session_id is blocked on a captcha; returns its resume event."""
+        with self._lock:
+            entry = self._pending.get(session_id)
+            if entry is None:
+                entry = self._pending[session_id] = {"session": session_id, "url": url, "since": time.time(), "waiters": 0}
+                self._events[session_id] = threading.Event()
+            entry["waiters"] += 1
+            event = self._events[session_id]
+        self.publish({"type": "captcha", "session": session_id, "url": url})
+        return event
+
+    def resolved(self, session_id: str):
+        """A page of session_id got past its captcha."""
+        with self._lock:
+            entry = self._pending.get(session_id)
+            if entry is None:
+                return
+            entry["waiters"] -= 1
+            if entry["waiters"] > 0:
+                return
+            del self._pending[session_id]
+            del self._events[session_id]
+        self.publish({"type": "resolved", "session": session_id})
+
+    def done(self, session_id: str):
+        self.publish({"type": "done", "session": session_id})
+
+    # ── UI / API side ─────────────────────────────────────────────────────────
+    def pending(self) -> List[dict]:
+        with self._lock:
+            return [{k: v for k, v in e.items() if k != "waiters"} for e in self._pending.values()]
+
+    def resume(self, session_id: str) -> bool:
+        """Tell a blocked session to stop waiting. False if it isn't waiting."""
+        with self._lock:
+            event = self._events.get(session_id)
+        if event is None:
+            return False
+        event.set()
+        self.publish({"type": "resume", "session": session_id})
+        return True
+
+
+_broker = CaptchaBroker()
+
+
+def get_captcha_broker() -> CaptchaBroker:
+    return _broker
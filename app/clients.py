@@ -0,0 +1,25 @@
+import os
+import threading
+
+from app import config  # (also loads .env before the key is read)
+
+_client = None
+_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Shared OpenAI client, built (and the openai package imported) on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            from openai import OpenAI
+
+            _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=config.OPENAI_BASE_URL)
+    return _client
+
+
+def set_openai_client(client):
+    """Swap in another client (e.g. a fake for tests and benchmarks)."""
+    global _client
+    with _lock:
+        _client = client
@@ -0,0 +1,130 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# ── On-disk caches ────────────────────────────────────────────────────────────
+CACHE_DIR = os.getenv("RESEARCH_HELPER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "research_helper"))
+
+# Scholar result pages (one entry per query/sort/offset)
+PAGE_CACHE_ENABLED = _env_bool("SCHOLAR_CACHE_ENABLED", True)
+PAGE_CACHE_TTL = _env_float("SCHOLAR_CACHE_TTL", 24 * 3600)  # seconds
+PAGE_CACHE_MAX_ENTRIES = _env_int("SCHOLAR_CACHE_MAX_ENTRIES", 5000)
+
+# Local full-text index of every scraped paper, for local-first lookups
+LOCAL_INDEX_ENABLED = _env_bool("LOCAL_INDEX_ENABLED", True)
+LOCAL_FIRST = _env_bool("LOCAL_FIRST", False)  # default for lookups that don't say
+
+# ── Upstream endpoints ────────────────────────────────────────────────────────
+# Point these at a local stand-in (python -m benchmarks.mock_server) to test
+# or load-test without touching the real services.
+SCHOLAR_BASE_URL = os.getenv("SCHOLAR_BASE_URL", "https://scholar.google.com").rstrip("/")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # None: the official API
+
+# ── Browser pool ──────────────────────────────────────────────────────────────
+# Visible browser by default so captchas can be solved by hand; set
+# SCHOLAR_HEADLESS=1 on servers without a display.
+BROWSER_HEADLESS = _env_bool("SCHOLAR_HEADLESS", False)
+BROWSER_SLOW_MO = _env_int("SCHOLAR_SLOW_MO", 200)  # ms between browser actions
+# Result pages fetched at once for a single search (one browser slot each)
+FETCH_CONCURRENCY = _env_int("SCHOLAR_FETCH_CONCURRENCY", 1)
+BROWSER_POOL_SIZE = _env_int("SCHOLAR_BROWSER_POOL_SIZE", max(1, FETCH_CONCURRENCY))
+BROWSER_MAX_PAGES = _env_int("SCHOLAR_BROWSER_MAX_PAGES", 100)  # recycle browser after N pages
+
+# Result pages are fetched with a plain keep-alive HTTP client ("http") and
+# only fall back to the browser on a captcha/block, after which the HTTP tier
+# sits out BLOCK_COOLDOWN seconds; "browser" always renders pages.
+FETCH_MODE = os.getenv("SCHOLAR_FETCH_MODE", "http").strip().lower()
+HTTP_TIMEOUT = _env_float("SCHOLAR_HTTP_TIMEOUT", 15)
+HTTP_BLOCK_COOLDOWN = _env_float("SCHOLAR_HTTP_BLOCK_COOLDOWN", 600)
+# Don't download images, fonts, stylesheets and media in the browser
+# (captcha widgets are always loaded in full)
+BROWSER_BLOCK_RESOURCES = _env_bool("SCHOLAR_BLOCK_RESOURCES", True)
+
+# Pacing between page loads: each fetch waits a random 0..JITTER seconds
+# before loading and DELAY seconds afterwards.
+PAGE_DELAY = _env_float("SCHOLAR_PAGE_DELAY", 1.0)
+PAGE_JITTER = _env_float("SCHOLAR_PAGE_JITTER", 0.5)
+
+# ── Embeddings ────────────────────────────────────────────────────────────────
+# "openai" for real embeddings, "local" for the offline hashed stand-in
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+EMBEDDING_CACHE_ENABLED = _env_bool("EMBEDDING_CACHE_ENABLED", True)
+
+# ── Ranking ───────────────────────────────────────────────────────────────────
+# Lexical query/paper similarity: "tfidf" (cosine) or "bm25"
+SIMILARITY_SCHEME = os.getenv("SIMILARITY_SCHEME", "tfidf")
+# The last scraped pool of each session is kept with its feature matrix, so
+# another ranking mode (or a smaller lookup of the same query) needs no scrape
+POOL_SESSIONS_MAX = _env_int("POOL_SESSIONS_MAX", 64)
+POOL_SESSION_TTL = _env_float("POOL_SESSION_TTL", 3600)  # seconds
+
+# ── LLM responses ─────────────────────────────────────────────────────────────
+# off: no cache; on: reuse identical prompts; record: always call the API and
+# store; replay: answer only from the cache (no network), failing on a miss
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "on").strip().lower()
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_responses.sqlite3"))
+LLM_CACHE_TTL = _env_float("LLM_CACHE_TTL", 7 * 24 * 3600)  # seconds; recordings never expire
+LLM_CACHE_MAX_ENTRIES = _env_int("LLM_CACHE_MAX_ENTRIES", 10000)
+LLM_CACHE_MAX_MB = _env_float("LLM_CACHE_MAX_MB", 200)
+
+# Each LLM call gives up after TIMEOUT seconds; if no answer arrived after
+# HEDGE_AFTER seconds (or an attempt failed) another attempt is started, up to
+# MAX_ATTEMPTS, and the first good answer wins.
+LLM_TIMEOUT = _env_float("LLM_TIMEOUT", 90)
+LLM_HEDGE_AFTER = _env_float("LLM_HEDGE_AFTER", 30)
+LLM_MAX_ATTEMPTS = _env_int("LLM_MAX_ATTEMPTS", 2)
+LLM_MAX_CONCURRENCY = _env_int("LLM_MAX_CONCURRENCY", 8)  # API calls in flight at once
+
+# ── Summaries ─────────────────────────────────────────────────────────────────
+# stream: summaries are produced per paper (or per chunk of papers) in
+# parallel, cached by paper and reported as each one is ready;
+# batch: one prompt for all papers, shown when the whole answer is in
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "stream").strip().lower()
+SUMMARY_CHUNK_SIZE = _env_int("SUMMARY_CHUNK_SIZE", 1)  # papers per LLM call
+SUMMARY_CONCURRENCY = _env_int("SUMMARY_CONCURRENCY", 4)  # summary calls in flight
+SUMMARY_CACHE_ENABLED = _env_bool("SUMMARY_CACHE_ENABLED", True)
+SUMMARY_CACHE_TTL = _env_float("SUMMARY_CACHE_TTL", 30 * 24 * 3600)  # seconds
+
+# ── Conversation history ──────────────────────────────────────────────────────
+# Prompts carry the newest chat turns within a token budget (estimated, see
+# app.history): the router gets HISTORY_MAX_TOKENS, the rerank and summary
+# prompts of a lookup only HISTORY_LOOKUP_TOKENS. With HISTORY_COMPACT, turns
+# that fall out of the budget are folded into a running LLM summary of at
+# most HISTORY_SUMMARY_TOKENS (part of HISTORY_MAX_TOKENS).
+HISTORY_MAX_TOKENS = _env_int("HISTORY_MAX_TOKENS", 1000)
+HISTORY_LOOKUP_TOKENS = _env_int("HISTORY_LOOKUP_TOKENS", 300)
+HISTORY_COMPACT = _env_bool("HISTORY_COMPACT", False)
+HISTORY_SUMMARY_TOKENS = _env_int("HISTORY_SUMMARY_TOKENS", 200)
+
+# ── Observability ─────────────────────────────────────────────────────────────
+# Append one JSON line per finished span (fetch, parse, rank, LLM call, ...)
+# to this file; empty disables the trace log. Metrics are always at /metrics.
+TRACE_LOG = os.getenv("TRACE_LOG", "")
+
+# ── Background jobs ───────────────────────────────────────────────────────────
+JOB_WORKERS = _env_int("JOB_WORKERS", 2)  # lookups processed at once
+JOB_MAX_QUEUED = _env_int("JOB_MAX_QUEUED", 100)  # submissions beyond this are rejected
+JOB_RETENTION = _env_int("JOB_RETENTION", 500)  # finished jobs kept for polling
+# The UI answers an identical lookup (any session) with the running or
+# finished job for it, if submitted less than this many seconds ago
+LOOKUP_REUSE_TTL = _env_float("LOOKUP_REUSE_TTL", 3600)
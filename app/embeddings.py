@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app import config
+from app.tracing import CACHE_REQUESTS, record_usage, span
+
+DEFAULT_MODEL = "text-embedding-3-small"
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+class OpenAIEmbeddings:
+    """Embeds texts with the OpenAI API, many inputs per request."""
+
+    name = "openai"
+
+    def __init__(self, client=None, batch_size: int = 256):
+        self.client = client
+        self.batch_size = batch_size
+
+    def embed(self, texts: List[str], model: str) -> np.ndarray:
+        if self.client is None:
+            from app.clients import get_openai_client
+            self.client = get_openai_client()
+        vectors = []
+        for i in range(0, len(texts), self.batch_size):
+            batch = texts[i:i + self.batch_size]
+            with span("embeddings.request", model=model, inputs=len(batch)):
+                response = self.client.embeddings.create(model=model, input=batch)
+            record_usage("embeddings", model, getattr(response, "usage", None))
+            # the API may return items out of order; index tells us where they belong
+            for item in sorted(response.data, key=lambda d: d.index):
+                vectors.append(item.embedding)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class LocalEmbeddings:
+    """
+    Offline stand-in: hashed bag of words + character trigrams.
+    Deterministic and dependency free, good enough for tests and benchmarks.
+    """
+
+    name = "local"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        grams = [w[i:i + 3] for w in words for i in range(max(1, len(w) - 2))]
+        return words + grams
+
+    def embed(self, texts: List[str], model: str) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                out[row, h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+BACKENDS = {
+    "openai": OpenAIEmbeddings,
+    "local": LocalEmbeddings,
+}
+
+
+# ── Persistent vector cache ───────────────────────────────────────────────────
+class EmbeddingCache:
+    """
+    Vectors for one model stored in a memory-mapped float32 .npy matrix,
+    with a JSON index mapping text hash -> row. Rows are append-only; the
+    file grows geometrically when it fills up. Writers from several worker
+    processes are serialized with a lock file and pick up each other's rows.
+    """
+
+    def __init__(self, directory: str, model: str):
+        self.directory = directory
+        self.model = model
+        self.dim = None
+        safe_model = re.sub(r"[^\w.-]", "_", model)
+        self.matrix_path = os.path.join(directory, f"{safe_model}.npy")
+        self.index_path = os.path.join(directory, f"{safe_model}.index.json")
+        self.lock_path = os.path.join(directory, f"{safe_model}.lock")
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._index_mtime = None
+        self._matrix = None
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._refresh()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _refresh(self):
+        """Reload index and matrix if another process has written since."""
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._index_mtime:
+            return
+        with open(self.index_path) as f:
+            self._index = json.load(f)
+        self._matrix = np.load(self.matrix_path, mmap_mode="r+")
+        self.dim = self._matrix.shape[1]
+        self._index_mtime = mtime
+
+    def lookup(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vector per text, or None where there is none."""
+        with self._lock:
+            self._refresh()
+            found = []
+            for text in texts:
+                row = self._index.get(self.key(text))
+                if row is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self.hits += 1
+                    found.append(np.array(self._matrix[row]))
+        hits = sum(v is not None for v in found)
+        CACHE_REQUESTS.inc(hits, cache="embeddings", result="hit")
+        CACHE_REQUESTS.inc(len(found) - hits, cache="embeddings", result="miss")
+        return found
+
+    def _grow(self, needed: int):
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 1024)
+        grown = np.lib.format.open_memmap(
+            self.matrix_path + ".tmp", mode="w+", dtype=np.float32, shape=(new_capacity, self.dim)
+        )
+        if self._matrix is not None:
+            grown[:capacity] = self._matrix
+        grown.flush()
+        del grown
+        os.replace(self.matrix_path + ".tmp", self.matrix_path)
+        self._matrix = np.load(self.matrix_path, mmap_mode="r+")
+
+    def store(self, texts: List[str], vectors: np.ndarray):
+        if not texts:
+            return
+        with self._lock, _file_lock(self.lock_path):
+            self._refresh()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            new = {}
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                if key not in self._index:
+                    new[key] = vector
+            if not new:
+                return
+            start = len(self._index)
+            self._grow(start + len(new))
+            for offset, (key, vector) in enumerate(new.items()):
+                self._matrix[start + offset] = vector
+                self._index[key] = start + offset
+            self._matrix.flush()
+            tmp = self.index_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._index, f)
+            os.replace(tmp, self.index_path)
+            self._index_mtime = os.stat(self.index_path).st_mtime_ns
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive inter-process lock (no-op where fcntl is unavailable)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_backends: Dict[str, object] = {}
+_lock = threading.Lock()
+
+
+def get_embedding_cache(model: str) -> Optional[EmbeddingCache]:
+    if not config.EMBEDDING_CACHE_ENABLED:
+        return None
+    with _lock:
+        if model not in _caches:
+            _caches[model] = EmbeddingCache(os.path.join(config.CACHE_DIR, "embeddings"), model)
+        return _caches[model]
+
+
+def get_backend(name: Optional[str] = None):
+    name = name or config.EMBEDDING_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name!r} (choose from {sorted(BACKENDS)})")
+    with _lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+def embed_texts(texts: List[str], model: str = DEFAULT_MODEL, backend=None) -> np.ndarray:
+    """
+    Embed texts as an (n, dim) float32 matrix.
+    Cached vectors are reused; only unseen texts go to the backend, in batches.
+    backend: a backend name ("openai", "local") or any object with embed(texts, model).
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    if backend is None or isinstance(backend, str):
+        backend = get_backend(backend)
+
+    # keep stand-in vectors apart from real model vectors in the cache
+    backend_name = getattr(backend, "name", type(backend).__name__)
+    cache_model = model if backend_name == "openai" else f"{backend_name}-{model}"
+    cache = get_embedding_cache(cache_model)
+    cached = cache.lookup(texts) if cache is not None else [None] * len(texts)
+
+    todo = sorted({t for t, v in zip(texts, cached) if v is None})
+    fresh = {}
+    if todo:
+        with span("embeddings.embed", backend=backend_name, texts=len(todo)):
+            vectors = backend.embed(todo, model)
+        fresh = dict(zip(todo, vectors))
+        if cache is not None:
+            cache.store(todo, vectors)
+
+    return np.vstack([v if v is not None else fresh[t] for t, v in zip(texts, cached)]).astype(np.float32)
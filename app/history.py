@@ -0,0 +1,189 @@
+import re
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Words and single punctuation marks; a long word counts as one token per
+# 4 characters, close to what BPE tokenizers do for English text
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Estimated LLM tokens in text (no tokenizer needed, errs on the high side)."""
+    return sum((len(t) + 3) // 4 for t in TOKEN_RE.findall(text))
+
+
+def _clip_tokens(text: str, max_tokens: int) -> str:
+    """The end of text holding at most max_tokens tokens, starting at a word."""
+    total, cut = 0, len(text)
+    for m in reversed(list(TOKEN_RE.finditer(text))):
+        total += (len(m.group()) + 3) // 4
+        if total > max_tokens:
+            break
+        cut = m.start()
+    else:
+        return text
+    while 0 < cut < len(text) and not text[cut - 1].isspace():
+        cut += 1  # never start inside a word
+    rest = text[cut:].lstrip()
+    return "… " + rest if rest else ""
+
+
+def _turn(message: Dict[str, str], max_tokens: int) -> Tuple[str, int]:
+    """A message as prompt text with its token count; an oversized one keeps its end."""
+    prefix = f"{message['role'].upper()}: "
+    text = prefix + message["content"]
+    tokens = count_tokens(text)
+    if tokens > max_tokens:
+        text = prefix + _clip_tokens(message["content"], max_tokens - count_tokens(prefix) - 1)
+        tokens = count_tokens(text)
+    return text, tokens
+
+
+def clip_history(history: List[Dict[str, str]], max_tokens: int) -> str:
+    """
+    The newest whole turns of history within max_tokens, oldest first.
+    Walks back from the end, so the cost depends on the budget, not on
+    the length of the conversation.
+    """
+    chunks, total = [], 0
+    for message in reversed(history):
+        text, tokens = _turn(message, max_tokens)
+        if total + tokens > max_tokens:
+            break
+        chunks.append(text)
+        total += tokens
+    return "\n".join(reversed(chunks))
+
+
+class HistoryBuffer:
+    """
+    Conversation history for prompts, kept incrementally: every turn is
+    rendered and counted once, and the oldest turns leave the window as
+    soon as it holds more than max_tokens.
+
+    With summarize(summary, turns) -> str, turns leaving the window are
+    folded into a running summary (once summary_tokens of them have piled
+    up) that is kept at the head of the history text.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1000,
+        summarize: Optional[Callable[[str, List[str]], str]] = None,
+        summary_tokens: int = 200,
+    ):
+        if max_tokens <= 0:
+            raise ValueError(f"max_tokens must be positive, got {max_tokens}")
+        if summarize and not 0 < summary_tokens < max_tokens:
+            raise ValueError(f"summary_tokens must be between 1 and max_tokens - 1 ({max_tokens - 1}), got {summary_tokens}")
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self._summarize = summarize
+        self._window = max_tokens - (summary_tokens if summarize else 0)
+        self._turns: "deque[Tuple[str, int]]" = deque()
+        self._tokens = 0
+        self._evicted: List[Tuple[str, int]] = []  # out of the window, not yet in the summary
+        self._seen = 0
+        self._compacting = False
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> int:
+        """Tokens of the turns currently in the window."""
+        return self._tokens
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def append(self, message: Dict[str, str]):
+        with self._lock:
+            turn = _turn(message, self._window)
+            self._turns.append(turn)
+            self._tokens += turn[1]
+            self._seen += 1
+            while self._tokens > self._window and self._turns:
+                old = self._turns.popleft()
+                self._tokens -= old[1]
+                if self._summarize:
+                    self._evicted.append(old)
+
+    def sync(self, messages: List[Dict[str, str]]) -> "HistoryBuffer":
+        """Append the messages not seen yet (the list only ever grows); a shorter list starts over."""
+        if len(messages) < self._seen:
+            self.clear()
+        for message in messages[self._seen:]:
+            self.append(message)
+        return self
+
+    def clear(self):
+        with self._lock:
+            self._turns.clear()
+            self._evicted.clear()
+            self._tokens = self._seen = 0
+            self.summary = ""
+            self._generation += 1  # a summary being made for the old turns is dropped
+
+    def _compact(self):
+        """
+        Fold the evicted turns into the summary. The LLM call runs without
+        the lock, so sync() and copy() never wait for it; turns evicted
+        meanwhile stay queued for the next fold.
+        """
+        with self._lock:
+            if self._compacting or sum(tokens for _, tokens in self._evicted) < self.summary_tokens:
+                return
+            self._compacting = True
+            summary, folded, generation = self.summary, len(self._evicted), self._generation
+            turns = [text for text, _ in self._evicted]
+        try:
+            summary = self._summarize(summary, turns)
+        except Exception as e:
+            print(f"⚠️ History summary failed: {e}")
+            summary = None
+        with self._lock:
+            self._compacting = False
+            if summary is None or generation != self._generation:
+                return
+            self.summary = _clip_tokens(summary.strip(), self.summary_tokens)
+            del self._evicted[:folded]
+        print(f"DEBUG: Folded {len(turns)} old turns into the history summary")
+
+    def text(self, max_tokens: Optional[int] = None) -> str:
+        """
+        History as prompt text: the summary (if any) and the newest turns.
+        A smaller max_tokens keeps only the newest turns that fit, without
+        the summary (and without making one): enough for prompts that only
+        need the latest context.
+        """
+        if max_tokens is not None and max_tokens < self.max_tokens:
+            with self._lock:
+                chunks, total = [], 0
+                for text, tokens in reversed(self._turns):
+                    if total + tokens > max_tokens:
+                        if not chunks:
+                            chunks.append(_clip_tokens(text, max_tokens))
+                        break
+                    chunks.append(text)
+                    total += tokens
+            return "\n".join(reversed(chunks))
+        if self._summarize and self._evicted:
+            self._compact()
+        with self._lock:
+            chunks = [text for text, _ in self._turns]
+            if self.summary:
+                chunks.insert(0, f"(Summary of the earlier conversation: {self.summary})")
+        return "\n".join(chunks)
+
+    def copy(self) -> "HistoryBuffer":
+        """An independent snapshot, e.g. for a background job."""
+        with self._lock:
+            other = HistoryBuffer(self.max_tokens, self._summarize, self.summary_tokens)
+            other.summary = self.summary
+            other._turns = deque(self._turns)
+            other._tokens = self._tokens
+            other._evicted = list(self._evicted)
+            other._seen = self._seen
+        return other
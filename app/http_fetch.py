@@ -0,0 +1,100 @@
+import re
+import threading
+import time
+from typing import Optional
+
+from app import config
+from app.browser import USER_AGENT
+from app.tracing import HTTP_BLOCKED
+
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+CAPTCHA_RE = re.compile(r"gs_captcha|g-recaptcha|/sorry/|unusual traffic|not a robot", re.I)
+RESULTS_RE = re.compile(r"""id=["']gs_res_ccl|class=["'][^"']*\bgs_ri\b""")
+NO_RESULTS_RE = re.compile(r"did not match any articles", re.I)
+
+
+class Blocked(Exception):
+    """Scholar answered with a captcha, a block page or something that isn't a result page."""
+
+
+def check_page(status: int, url: str, html_content: str):
+    """Raise Blocked unless this response is a usable result page (possibly an empty one)."""
+    if status >= 400:  # 429/503 are Scholar's usual "slow down"
+        raise Blocked(f"HTTP {status}")
+    if "/sorry/" in url or (CAPTCHA_RE.search(html_content) and not RESULTS_RE.search(html_content)):
+        raise Blocked("captcha page")
+    if not RESULTS_RE.search(html_content) and not NO_RESULTS_RE.search(html_content):
+        raise Blocked("not a result page")
+
+
+class HttpFetcher:
+    """
+    Plain HTTP tier for result pages: one keep-alive connection pool shared
+    by all searches, no rendering. After a block it stands aside for
+    cooldown seconds so pages go straight to the browser meanwhile.
+    """
+
+    def __init__(self, timeout: float = 15.0, cooldown: float = 600.0, max_connections: int = 10, transport=None):
+        import httpx
+
+        self.cooldown = cooldown
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.client = httpx.Client(
+            headers=HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    @property
+    def available(self) -> bool:
+        return time.time() >= self.blocked_until
+
+    def fetch(self, url: str) -> str:
+        """HTML of a result page; raises Blocked (and starts the cooldown) otherwise."""
+        import httpx
+
+        try:
+            response = self.client.get(url)
+            check_page(response.status_code, str(response.url), response.text)
+        except (Blocked, httpx.HTTPError) as e:
+            reason = str(e) or type(e).__name__
+            if isinstance(e, Blocked):
+                with self._lock:
+                    self.blocked_until = time.time() + self.cooldown
+                HTTP_BLOCKED.inc()
+            raise Blocked(reason) from e
+        return response.text
+
+    def adopt_cookies(self, cookies: list):
+        """Take over cookies from a browser session (e.g. after a solved captcha)."""
+        for c in cookies:
+            self.client.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+
+    def close(self):
+        self.client.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_http_fetcher() -> Optional[HttpFetcher]:
+    """Shared HTTP tier, or None when SCHOLAR_FETCH_MODE=browser."""
+    global _fetcher
+    if config.FETCH_MODE != "http":
+        return None
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = HttpFetcher(
+                timeout=config.HTTP_TIMEOUT,
+                cooldown=config.HTTP_BLOCK_COOLDOWN,
+                max_connections=max(1, config.FETCH_CONCURRENCY) * 2,
+            )
+    return _fetcher
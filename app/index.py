@@ -0,0 +1,141 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from app import config
+
+PAPER_FIELDS = ("title", "link", "scholar_link", "pdf_link", "snippet", "authors_year", "citations", "year")
+TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_title(title: Optional[str]) -> str:
+    return " ".join(TOKEN_RE.findall((title or "").lower()))
+
+
+def paper_key(paper: dict) -> str:
+    """Identity of a paper across scrapes: normalized title + year."""
+    return f"{normalize_title(paper.get('title'))}|{paper.get('year') or ''}"
+
+
+class PaperIndex:
+    """
+    Persistent full-text index (SQLite FTS5) of every paper ever scraped,
+    deduplicated by normalized title and year. Re-scraped papers refresh
+    their citation counts and fill in links that were missing before.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                title TEXT, link TEXT, scholar_link TEXT, pdf_link TEXT,
+                snippet TEXT, authors_year TEXT, citations INTEGER, year INTEGER,
+                added REAL NOT NULL, updated REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                title, snippet, content='papers', content_rowid='id', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                INSERT INTO papers_fts(rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+            END;
+            CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+                INSERT INTO papers_fts(papers_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+                INSERT INTO papers_fts(rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+            END;
+            """
+        )
+        self._conn.commit()
+
+    def add(self, papers: Iterable[dict]) -> int:
+        """Ingest papers; returns how many were new to the index."""
+        now = time.time()
+        rows = [
+            (paper_key(p), *(p.get(f) for f in PAPER_FIELDS), now, now)
+            for p in papers
+            if normalize_title(p.get("title"))
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+            self._conn.executemany(
+                f"""
+                INSERT INTO papers (key, {", ".join(PAPER_FIELDS)}, added, updated)
+                VALUES (?, {", ".join("?" for _ in PAPER_FIELDS)}, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    link = COALESCE(excluded.link, link),
+                    scholar_link = COALESCE(excluded.scholar_link, scholar_link),
+                    pdf_link = COALESCE(excluded.pdf_link, pdf_link),
+                    snippet = COALESCE(excluded.snippet, snippet),
+                    citations = COALESCE(MAX(excluded.citations, citations), excluded.citations, citations),
+                    updated = excluded.updated
+                """,
+                rows,
+            )
+            new = self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0] - before
+            self._conn.commit()
+        print(f"DEBUG: Indexed {len(rows)} papers ({new} new)")
+        return new
+
+    def search(self, query: str, limit: int = 100, title_only: bool = False) -> List[dict]:
+        """
+        Papers containing every query term (stemmed) in their title (or
+        snippet, unless title_only), best BM25 match first.
+        """
+        tokens = TOKEN_RE.findall(query.lower())
+        if not tokens:
+            return []
+        match = " ".join(f'"{t}"' for t in tokens)
+        if title_only:
+            match = f"title : ({match})"
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {", ".join("p." + f for f in PAPER_FIELDS)}
+                FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid
+                WHERE papers_fts MATCH ?
+                ORDER BY bm25(papers_fts, 10.0, 1.0)
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def papers_since(self, rowid: int = 0) -> List[tuple]:
+        """(rowid, paper) for every paper added after rowid, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, {', '.join(PAPER_FIELDS)} FROM papers WHERE id > ? ORDER BY id", (rowid,)
+            ).fetchall()
+        return [(row["id"], {f: row[f] for f in PAPER_FIELDS}) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_paper_index() -> Optional[PaperIndex]:
+    """Shared local paper index, or None when it is disabled."""
+    global _index
+    if not config.LOCAL_INDEX_ENABLED:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = PaperIndex(os.path.join(config.CACHE_DIR, "papers.sqlite3"))
+    return _index
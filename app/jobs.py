@@ -0,0 +1,191 @@
+import itertools
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app import config
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class Job:
+    """
+    One unit of background work. Progress is recorded as a list of
+    {stage, message, time} events that clients can poll or follow.
+    """
+
+    def __init__(self, fn: Callable[["Job"], Any], kind: str, priority: int, params: Optional[dict]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.priority = priority
+        self.params = params or {}
+        self.status = QUEUED
+        self.stage = None
+        self.events: List[dict] = []
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._fn = fn
+        self._exception = None
+        self._cond = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def report(self, message: str, stage: Optional[str] = None, **data):
+        """Record a progress event (plus any extra JSON fields); stage defaults to the current one."""
+        with self._cond:
+            if stage:
+                self.stage = stage
+            self.events.append({"stage": self.stage, "message": message, "time": time.time(), **data})
+            self._cond.notify_all()
+
+    def _run(self):
+        with self._cond:
+            self.status = RUNNING
+            self.started = time.time()
+            self._cond.notify_all()
+        try:
+            result = self._fn(self)
+        except Exception as e:
+            with self._cond:
+                self.status, self.error, self._exception = FAILED, f"{type(e).__name__}: {e}", e
+                self.finished = time.time()
+                self._cond.notify_all()
+            print(f"⚠️ Job {self.id} failed: {e}")
+            return
+        with self._cond:
+            self.status, self.result = DONE, result
+            self.finished = time.time()
+            self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.done, timeout=timeout)
+
+    def follow(self, since: int = 0, timeout: Optional[float] = None) -> Iterator[dict]:
+        """Yield progress events (starting at index since) until the job finishes."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self.events) > since or self.done,
+                    timeout=None if deadline is None else max(0.0, deadline - time.time()),
+                )
+                new = self.events[since:]
+                finished = self.done
+            for event in new:
+                yield event
+            since += len(new)
+            if finished or (deadline is not None and time.time() >= deadline):
+                return
+
+    def get_result(self):
+        """Result of a finished job; re-raises the job's exception if it failed."""
+        if self._exception is not None:
+            raise self._exception
+        return self.result
+
+    def to_dict(self, since: int = 0) -> dict:
+        with self._cond:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "priority": self.priority,
+                "status": self.status,
+                "stage": self.stage,
+                "events": self.events[since:],
+                "result": self.result,
+                "error": self.error,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished,
+            }
+
+
+class JobQueue:
+    """
+    Bounded priority queue served by a fixed pool of worker threads.
+    Lower priority numbers run first; equal priorities run in submit order.
+    Finished jobs are kept (up to `retention`) so clients can still fetch
+    results after reconnecting.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 100, retention: int = 500):
+        self.max_queued = max_queued
+        self.retention = retention
+        self._queue = queue.PriorityQueue()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(
+        self,
+        fn: Callable[[Job], Any],
+        kind: str = "job",
+        priority: int = 0,
+        params: Optional[dict] = None,
+    ) -> Job:
+        job = Job(fn, kind, priority, params)
+        with self._lock:
+            queued = sum(1 for j in self._jobs.values() if j.status == QUEUED)
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} jobs already queued")
+            self._jobs[job.id] = job
+            self._prune()
+        self._queue.put((priority, next(self._seq), job))
+        return job
+
+    def _prune(self):
+        finished = [jid for jid, j in self._jobs.items() if j.done]
+        for jid in finished[: max(0, len(self._jobs) - self.retention)]:
+            del self._jobs[jid]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _worker(self):
+        while True:
+            _, _, job = self._queue.get()
+            job._run()
+            self._queue.task_done()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": len(self._threads), **counts}
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue, started on first use."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(
+                workers=config.JOB_WORKERS,
+                max_queued=config.JOB_MAX_QUEUED,
+                retention=config.JOB_RETENTION,
+            )
+    return _job_queue
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from app import config
+from app.cache import DiskCache
+from app.clients import get_openai_client
+from app.tracing import record_usage, span
+
+CACHE_MODES = ("off", "on", "record", "replay")
+
+
+class LLMReplayMiss(LookupError):
+    """Replay mode was asked for a prompt that was never recorded."""
+
+
+class LLMInvalidAnswer(ValueError):
+    """Every attempt returned an answer that failed validation."""
+
+
+def prompt_key(model: str, messages: List[Dict[str, str]], **params) -> str:
+    """Cache key for one chat completion: model + hash of the exact request."""
+    payload = json.dumps({"messages": messages, **params}, sort_keys=True, ensure_ascii=False)
+    return f"{model}|{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[DiskCache]:
+    """Shared LLM response cache, or None when LLM_CACHE_MODE=off."""
+    global _llm_cache
+    if config.LLM_CACHE_MODE == "off":
+        return None
+    if config.LLM_CACHE_MODE not in CACHE_MODES:
+        raise ValueError(f"Unknown LLM_CACHE_MODE: {config.LLM_CACHE_MODE!r} (choose one of {CACHE_MODES})")
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            # record/replay keep a reproducible set of responses, so nothing expires
+            recording = config.LLM_CACHE_MODE in ("record", "replay")
+            _llm_cache = DiskCache(
+                config.LLM_CACHE_PATH,
+                table="responses",
+                ttl=None if recording else config.LLM_CACHE_TTL,
+                max_entries=None if recording else config.LLM_CACHE_MAX_ENTRIES,
+                max_bytes=None if recording else int(config.LLM_CACHE_MAX_MB * 1024 * 1024),
+            )
+    return _llm_cache
+
+
+def chat_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    refresh: bool = False,
+    validate: Optional[Callable[[str], bool]] = None,
+    **params,
+) -> str:
+    """
+    Text of the first choice of a chat completion, through the response cache
+    (see LLM_CACHE_MODE). refresh=True skips the cached answer, e.g. when a
+    retry needs a fresh sample, and stores the new one instead (replay always
+    answers from the recording). Answers that
+    fail validate(content) are returned but never cached.
+    """
+    mode = config.LLM_CACHE_MODE
+    cache = get_llm_cache()
+    key = prompt_key(model, messages, **params)
+
+    if cache is not None and (mode == "replay" or (mode == "on" and not refresh)):
+        cached = cache.get(key)
+        if cached is not None:
+            return cached["content"]
+    if mode == "replay":
+        raise LLMReplayMiss(f"No recorded response for {key}")
+
+    with span("llm.request", model=model) as s:
+        response = get_openai_client().chat.completions.create(model=model, messages=messages, **params)
+        usage = getattr(response, "usage", None)
+        s.set(
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+        )
+    record_usage("chat", model, usage)
+    content = response.choices[0].message.content
+    if cache is not None and content and (validate is None or validate(content)):
+        cache.set(key, {"model": model, "content": content})
+    return content
+
+
+# ── Concurrent calls ──────────────────────────────────────────────────────────
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.LLM_MAX_CONCURRENCY, thread_name_prefix="llm")
+    return _executor
+
+
+def hedged_chat(
+    messages: List[Dict[str, str]],
+    model: str,
+    timeout: Optional[float] = None,
+    hedge_after: Optional[float] = None,
+    attempts: Optional[int] = None,
+    validate: Optional[Callable[[str], bool]] = None,
+    **params,
+) -> str:
+    """
+    chat_completion with a deadline and hedged retries: when an attempt
+    fails, returns an invalid answer or is still running after hedge_after
+    seconds, another one is started alongside it (up to attempts in all);
+    the first valid answer wins. Raises the last error, or TimeoutError.
+    """
+    with span("llm.call", model=model):
+        return _hedged_chat(messages, model, timeout, hedge_after, attempts, validate, **params)
+
+
+def _hedged_chat(messages, model, timeout, hedge_after, attempts, validate, **params) -> str:
+    timeout = config.LLM_TIMEOUT if timeout is None else timeout
+    hedge_after = config.LLM_HEDGE_AFTER if hedge_after is None else hedge_after
+    attempts = max(1, config.LLM_MAX_ATTEMPTS if attempts is None else attempts)
+    deadline = time.monotonic() + timeout
+    pending = set()
+    launched = 0
+    last_error: Optional[Exception] = None
+
+    def launch():
+        nonlocal launched
+        # later attempts want a fresh sample, not the cached answer
+        pending.add(_get_executor().submit(
+            chat_completion, messages, model, refresh=launched > 0, validate=validate, **params
+        ))
+        launched += 1
+
+    launch()
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, _ = wait(
+            pending,
+            timeout=min(remaining, hedge_after) if launched < attempts else remaining,
+            return_when=FIRST_COMPLETED,
+        )
+        if not done:
+            print(f"DEBUG: LLM call still running after {hedge_after}s, hedging (attempt {launched + 1})")
+            launch()
+            continue
+        for future in done:
+            pending.discard(future)
+            try:
+                content = future.result()
+            except Exception as e:
+                print(f"⚠️ LLM attempt failed: {e}")
+                last_error = e
+                continue
+            if validate is None or validate(content):
+                for other in pending:
+                    other.cancel()
+                return content
+            last_error = LLMInvalidAnswer(f"Invalid LLM answer: {content[:80]!r}")
+        if not pending and launched < attempts:
+            launch()
+
+    for future in pending:
+        future.cancel()
+    raise last_error or TimeoutError(f"No LLM answer within {timeout}s")
+
+
+def gather(*calls: Callable[[], Any]) -> list:
+    """Run independent LLM stages at once; their results, in order."""
+    with ThreadPoolExecutor(max_workers=max(1, len(calls)), thread_name_prefix="llm-stage") as pool:
+        futures = [pool.submit(call) for call in calls]
+        return [future.result() for future in futures]
@@ -1,16 +1,32 @@
-from fastapi import FastAPI, Query
+import json
+import queue
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from typing import List, Union
-from app.scholar import search_scholar
-from app.models import Paper, format_results_for_llm
+from app.cache import normalize_query
+from app.captcha import get_captcha_broker
+from app.jobs import JobQueueFull, get_job_queue
+from app.scholar import asearch_scholar, iter_scholar
+from app.models import LookupRequest, Paper, VerifyRequest, format_results_for_llm
+from app.singleflight import SingleFlight
+from app.tracing import REGISTRY
 
 app = FastAPI()
 
+# identical in-flight searches share one scrape
+search_flight = SingleFlight()
+
 @app.get("/ping")
 def ping():
     return {"message": "pong"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics: stage/fetch/LLM latencies, cache hits, pages, tokens."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/search")
-def search(
+async def search(
     query: str,
     max_results: int = Query(10, ge=1, le=50),
     sort_by: str = Query("relevance", pattern="^(relevance|date)$"),
@@ -20,10 +36,155 @@ def search(
     Search Google Scholar.
     - raw=true → return JSON (list of Paper objects)
     - raw=false → return formatted text for LLMs
+    Concurrent requests for the same (query, sort_by, max_results) share one scrape.
     """
-    results = search_scholar(query, max_results=max_results, sort_by=sort_by)
+    key = (normalize_query(query), sort_by, max_results)
+    pool = await search_flight.do(
+        key, lambda: asearch_scholar(query, pool_size=max_results, sort_by=sort_by)
+    )
+    results = pool[:max_results]
 
     if raw:
         return results  # validated as JSON
     else:
         return {"results": format_results_for_llm(results)}
+
+
+@app.get("/search/stream")
+def search_stream(
+    query: str,
+    max_results: int = Query(10, ge=1, le=50),
+    sort_by: str = Query("relevance", pattern="^(relevance|date)$"),
+):
+    """
+    Stream Google Scholar results as NDJSON (one Paper per line),
+    sent as soon as each result page has been parsed, then a final
+    {"done": true, "count": n} line.
+    """
+    def lines():
+        count = 0
+        for paper in iter_scholar(query, pool_size=max_results, sort_by=sort_by):
+            if count >= max_results:
+                break
+            count += 1
+            yield json.dumps(Paper(**paper).model_dump()) + "\n"
+        yield json.dumps({"done": True, "count": count}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/verify")
+def verify(request: VerifyRequest):
+    """
+    Check a reference list: each citation gets a verdict (found / not_found /
+    error) with its match score, from the local fuzzy title index or, for
+    titles it can't match, a Scholar search.
+    """
+    from app.verify import verify_citations
+
+    verdicts = verify_citations(request.citations, threshold=request.threshold, scrape=request.scrape)
+    return {
+        "found": sum(v["status"] == "found" for v in verdicts),
+        "total": len(verdicts),
+        "verdicts": verdicts,
+    }
+
+
+# ── Background lookup jobs ────────────────────────────────────────────────────
+@app.post("/jobs", status_code=202)
+def create_job(request: LookupRequest):
+    """
+    Queue a full Scholar lookup (scrape → rank → rerank → summarize).
+    Returns a job id to poll with GET /jobs/{id} or follow via /jobs/{id}/events.
+    """
+    from llm_wrapper import submit_lookup
+
+    route = request.model_dump(exclude={"history", "priority"})
+    try:
+        job = submit_lookup(route, request.history, priority=request.priority)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Job queue is full: {e}")
+    return {"id": job.id, "status": job.status}
+
+
+def _get_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, since: int = Query(0, ge=0)):
+    """Job status, current stage, progress events (from index since) and result."""
+    return _get_job(job_id).to_dict(since=since)
+
+
+@app.get("/jobs/{job_id}/events")
+def job_events(job_id: str, since: int = Query(0, ge=0)):
+    """Follow a job as NDJSON: one line per progress event, then a final status line."""
+    job = _get_job(job_id)
+
+    def lines():
+        for event in job.follow(since=since):
+            yield json.dumps(event) + "\n"
+        final = job.to_dict()
+        yield json.dumps({k: final[k] for k in ("id", "status", "result", "error")}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/sessions/{session_id}/rank")
+def session_rank(
+    session_id: str,
+    mode: str = "balanced",
+    top_k: int = Query(20, ge=1, le=500),
+):
+    """
+    Re-rank the pool a session's last lookup scraped under another ranking
+    mode: no scraping and no LLM, just the kept feature matrix re-scored.
+    """
+    from llm_wrapper import MODES, rescore
+
+    if mode not in MODES or mode == "auto":
+        raise HTTPException(status_code=422, detail=f"Unknown ranking mode (choose from {[m for m in MODES if m != 'auto']})")
+    papers = rescore(session_id, mode, top_k)
+    if papers is None:
+        raise HTTPException(status_code=404, detail="No pool kept for this session")
+    return {"session": session_id, "mode": mode, "papers": papers}
+
+
+# ── Captcha coordination ──────────────────────────────────────────────────────
+@app.get("/captcha")
+def captcha_pending():
+    """Scrape sessions currently blocked on a captcha."""
+    return {"pending": get_captcha_broker().pending()}
+
+
+@app.post("/captcha/{session_id}/resume")
+def captcha_resume(session_id: str):
+    """Unblock a session waiting on a captcha (it continues with the page as is)."""
+    if not get_captcha_broker().resume(session_id):
+        raise HTTPException(status_code=404, detail="No captcha pending for this session")
+    return {"session": session_id, "resumed": True}
+
+
+@app.get("/captcha/events")
+def captcha_events(session_id: Union[str, None] = None, heartbeat: float = Query(15.0, gt=0)):
+    """Follow captcha events (all sessions, or one) as NDJSON, pushed as they happen."""
+    events, unsubscribe = get_captcha_broker().subscribe(session_id)
+
+    def lines():
+        try:
+            for pending in get_captcha_broker().pending():
+                if session_id is None or pending["session"] == session_id:
+                    yield json.dumps({"type": "captcha", **pending}) + "\n"
+            while True:
+                try:
+                    yield json.dumps(events.get(timeout=heartbeat)) + "\n"
+                except queue.Empty:
+                    yield json.dumps({"type": "heartbeat"}) + "\n"
+        finally:
+            unsubscribe()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
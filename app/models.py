@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Dict, Iterator, Optional, List, Sequence
 import re
 
 class Paper(BaseModel):
@@ -9,7 +9,105 @@ class Paper(BaseModel):
     pdf_link: Optional[str]
     snippet: Optional[str]
     authors_year: Optional[str]
-    citations: Optional[int] 
+    citations: Optional[int]
+    year: Optional[int] = None
+
+STRING_FIELDS = ("title", "link", "scholar_link", "pdf_link", "snippet", "authors_year")
+
+
+class PaperBatch:
+    """
+    Column-oriented pool of papers for the ranking pipeline.
+
+    Numeric features live in NumPy columns (citations: -1 when unknown,
+    year: 0 when unknown, has_pdf) so rankers read them without touching
+    every paper; strings are kept once, in one list per field, shared with
+    the dicts the batch was built from rather than copied.
+    Indexing or iterating yields plain paper dicts, so code written for
+    lists of dicts keeps working; to_papers() builds the pydantic models.
+    """
+
+    __slots__ = STRING_FIELDS + ("citations", "year", "has_pdf")
+
+    def __init__(self, columns: dict):
+        import numpy as np
+
+        n = len(columns["title"])
+        for name in STRING_FIELDS:
+            setattr(self, name, list(columns.get(name) or [None] * n))
+        self.citations = np.asarray(columns["citations"], dtype=np.int64)
+        self.year = np.asarray(columns["year"], dtype=np.int32)
+        self.has_pdf = np.array([bool(link) for link in self.pdf_link], dtype=bool)
+
+    @classmethod
+    def from_dicts(cls, papers: Sequence[dict]) -> "PaperBatch":
+        if isinstance(papers, PaperBatch):
+            return papers
+        columns = {name: [p.get(name) for p in papers] for name in STRING_FIELDS}
+        columns["title"] = [t if t is not None else "" for t in columns["title"]]
+        columns["citations"] = [c if c is not None else -1 for c in (p.get("citations") for p in papers)]
+        columns["year"] = [p.get("year") or 0 for p in papers]
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return len(self.title)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(range(*i.indices(len(self))))
+        citations, year = int(self.citations[i]), int(self.year[i])
+        paper = {name: getattr(self, name)[i] for name in STRING_FIELDS}
+        paper["citations"] = citations if citations >= 0 else None
+        paper["year"] = year or None
+        return paper
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self[i] for i in range(len(self)))
+
+    def take(self, indices) -> "PaperBatch":
+        """Sub-batch of the given rows, in the given order."""
+        import numpy as np
+
+        idx = np.asarray(indices, dtype=np.int64)
+        batch = PaperBatch.__new__(PaperBatch)
+        for name in STRING_FIELDS:
+            column = getattr(self, name)
+            setattr(batch, name, [column[i] for i in idx.tolist()])
+        batch.citations = self.citations[idx]
+        batch.year = self.year[idx]
+        batch.has_pdf = self.has_pdf[idx]
+        return batch
+
+    def texts(self) -> List[str]:
+        """Text each paper is matched on: its title, or the snippet if untitled."""
+        return [t or s or "" for t, s in zip(self.title, self.snippet)]
+
+    def to_dicts(self) -> List[dict]:
+        return list(self)
+
+    def to_papers(self) -> List[Paper]:
+        return [Paper(**paper) for paper in self]
+
+
+class LookupRequest(BaseModel):
+    """Body of POST /jobs: a Scholar lookup route plus optional chat history."""
+    query: str
+    mode: str = Field("broad", pattern="^(broad|direct)$")
+    pool_size: int = Field(100, ge=1, le=500)
+    filter_top_k: int = Field(20, ge=1, le=100)
+    final_top_n: int = Field(10, ge=1, le=50)
+    sort_by: str = Field("relevance", pattern="^(relevance|date)$")
+    ranking_mode: str = "balanced"
+    local_first: Optional[bool] = None  # answer from the local index when it can
+    session_id: Optional[str] = None  # keep the scraped pool for re-ranking (GET /sessions/{id}/rank)
+    history: List[Dict[str, str]] = []
+    priority: int = 0  # lower runs first
+
+class VerifyRequest(BaseModel):
+    """Body of POST /verify: a pasted reference list, one citation per entry."""
+    citations: List[str] = Field(..., min_length=1, max_length=200)
+    threshold: float = Field(0.8, ge=0.0, le=1.0)
+    scrape: bool = True  # search Scholar for titles the local index can't match
 
 def clean_text(text: str) -> str:
     """Remove non-ASCII characters and tidy up spaces."""
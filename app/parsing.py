@@ -0,0 +1,182 @@
+import html
+import re
+import time
+from typing import Callable, Dict, List, Optional
+
+from app import config
+from app.models import Paper
+
+ENTRY_CLASSES = ("gs_ri", "gs_r", "gs_or")
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+
+
+# ── Shared field helpers ──────────────────────────────────────────────────────
+def _clean(text: Optional[str]) -> str:
+    return html.unescape(text.strip()) if text else ""
+
+
+def _scholar_link(href: Optional[str]) -> Optional[str]:
+    if not href:
+        return None
+    return config.SCHOLAR_BASE_URL + href if href.startswith("/scholar") else href
+
+
+def _parse_citations(raw: str) -> Optional[int]:
+    cleaned = (
+        raw.replace("Cited by", "")
+        .replace("\xa0", "")   # non-breaking space
+        .replace("\u202f", "") # narrow space
+        .replace(",", "")      # thousands separator
+        .replace(".", "")      # fallback
+        .strip()
+    )
+    return int(cleaned) if cleaned.isdigit() else None
+
+
+def _parse_year(authors_year: str) -> Optional[int]:
+    match = YEAR_RE.search(authors_year)
+    return int(match.group(0)) if match else None
+
+
+def _make_paper(title, href, snippet, authors_year, pdf_link, cited_by) -> Paper:
+    return Paper(
+        title=_clean(title) or "No title",
+        link=href,
+        scholar_link=_scholar_link(href),
+        pdf_link=pdf_link,
+        snippet=_clean(snippet),
+        authors_year=_clean(authors_year),
+        citations=_parse_citations(cited_by) if cited_by else None,
+        year=_parse_year(_clean(authors_year)),
+    )
+
+
+# ── lxml backend ──────────────────────────────────────────────────────────────
+def _xp_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_LXML_ENTRY_XPATH = "//*[" + " or ".join(_xp_class(c) for c in ENTRY_CLASSES) + "]"
+_LXML_TITLE_XPATH = ".//h3//a"
+_LXML_SNIPPET_XPATH = f".//*[{_xp_class('gs_rs')}]"
+_LXML_AUTHORS_XPATH = f".//*[{_xp_class('gs_a')}]"
+_LXML_PDF_XPATH = f".//*[{_xp_class('gs_or_ggsm')}]//a | .//*[{_xp_class('gs_ggsd')}]//a"
+_LXML_FOOTER_LINK_XPATH = f".//*[{_xp_class('gs_fl')}]//a"
+
+
+def _parse_lxml(html_content: str) -> List[Paper]:
+    from lxml import etree, html as lxml_html
+
+    if not html_content or not html_content.strip():
+        return []  # e.g. an aborted load; bs4 yields no entries here too
+    try:
+        root = lxml_html.fromstring(html_content)
+    except etree.ParserError:  # "Document is empty" (only comments / whitespace nodes)
+        return []
+    matched = root.xpath(_LXML_ENTRY_XPATH)
+    matched_ids = set(map(id, matched))
+
+    papers = []
+    for entry in matched:
+        # nested matches (.gs_ri inside .gs_r) describe the same paper
+        if any(id(a) in matched_ids for a in entry.iterancestors()):
+            continue
+
+        def first_text(xpath):
+            found = entry.xpath(xpath)
+            return found[0].text_content() if found else None
+
+        title_tags = entry.xpath(_LXML_TITLE_XPATH)
+        title_tag = title_tags[0] if title_tags else None
+        pdf_tags = entry.xpath(_LXML_PDF_XPATH)
+        cited_by = next(
+            (a.text_content() for a in entry.xpath(_LXML_FOOTER_LINK_XPATH) if "Cited by" in a.text_content()),
+            None,
+        )
+        papers.append(_make_paper(
+            title=title_tag.text_content() if title_tag is not None else None,
+            href=title_tag.get("href") if title_tag is not None else None,
+            snippet=first_text(_LXML_SNIPPET_XPATH),
+            authors_year=first_text(_LXML_AUTHORS_XPATH),
+            pdf_link=pdf_tags[0].get("href") if pdf_tags else None,
+            cited_by=cited_by,
+        ))
+    return papers
+
+
+# ── BeautifulSoup backend (pure Python fallback) ──────────────────────────────
+def _parse_bs4(html_content: str) -> List[Paper]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, "html.parser")
+    matched = soup.select(", ".join("." + c for c in ENTRY_CLASSES))
+    matched_ids = set(map(id, matched))
+
+    papers = []
+    for entry in matched:
+        # nested matches (.gs_ri inside .gs_r) describe the same paper
+        if any(id(p) in matched_ids for p in entry.parents):
+            continue
+
+        def first_text(selector):
+            tag = entry.select_one(selector)
+            return tag.text if tag else None
+
+        title_tag = entry.select_one("h3 a")
+        pdf_tag = entry.select_one(".gs_or_ggsm a, .gs_ggsd a")
+        cited_by = next(
+            (a.get_text(" ", strip=True) for a in entry.select(".gs_fl a") if "Cited by" in a.get_text()),
+            None,
+        )
+        papers.append(_make_paper(
+            title=title_tag.text if title_tag else None,
+            href=title_tag.get("href") if title_tag else None,
+            snippet=first_text(".gs_rs"),
+            authors_year=first_text(".gs_a"),
+            pdf_link=pdf_tag.get("href") if pdf_tag else None,
+            cited_by=cited_by,
+        ))
+    return papers
+
+
+BACKENDS: Dict[str, Callable[[str], List[Paper]]] = {
+    "lxml": _parse_lxml,
+    "bs4": _parse_bs4,
+}
+
+
+def default_backend() -> str:
+    """Fastest available backend: lxml if installed, else BeautifulSoup."""
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "bs4"
+
+
+def parse_results_page(html_content: str, backend: Optional[str] = None) -> List[Paper]:
+    """
+    Parse one Google Scholar result page into Paper objects.
+    backend: "lxml" (fast) or "bs4" (pure Python); defaults to the fastest installed.
+    """
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend!r} (choose from {sorted(BACKENDS)})")
+    return BACKENDS[backend](html_content)
+
+
+if __name__ == "__main__":
+    import glob
+    import os
+    import sys
+
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures")
+    pages = [open(p, encoding="utf-8").read() for p in sorted(glob.glob(os.path.join(fixture_dir, "scholar_*.html")))]
+    rounds = 50
+    print(f"🔎 Parsing {len(pages)} fixture pages x {rounds} rounds\n")
+    for name in BACKENDS:
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            n = sum(len(parse_results_page(p, backend=name)) for p in pages)
+        elapsed = time.perf_counter() - t0
+        print(f"{name:5s}: {rounds * len(pages) / elapsed:8.1f} pages/s ({n} papers per round)")
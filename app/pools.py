@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app import config
+from app.cache import normalize_query
+from app.models import PaperBatch
+
+
+class RankedPool:
+    """
+    A scraped pool kept with its heuristic feature matrix, so ranking it
+    under any weights is one matrix-vector product plus a top-k selection.
+    """
+
+    def __init__(self, query: str, papers, sort_by: str = "relevance", pool_size: Optional[int] = None):
+        from app.scholar import heuristic_features
+
+        self.query = query
+        self.sort_by = sort_by
+        self.papers = PaperBatch.from_dicts(papers)
+        self.pool_size = len(self.papers) if pool_size is None else pool_size
+        self.features = heuristic_features(query, self.papers)
+        self.created = time.time()
+
+    def covers(self, query: str, sort_by: str, pool_size: int) -> bool:
+        """Whether this pool can answer a lookup without scraping again."""
+        return (
+            normalize_query(query) == normalize_query(self.query)
+            and sort_by == self.sort_by
+            and pool_size <= self.pool_size
+        )
+
+    def rank(self, weights: Dict[str, float], k: int) -> PaperBatch:
+        """Top k papers under weights (w_sim, w_cites, w_recency), best first."""
+        from app.scholar import top_k
+
+        scores = self.features @ [weights["w_sim"], weights["w_cites"], weights["w_recency"]]
+        return self.papers.take(top_k(scores, k))
+
+    def __len__(self) -> int:
+        return len(self.papers)
+
+
+class PoolStore:
+    """The last RankedPool of each session, least recently used dropped first."""
+
+    def __init__(self, max_sessions: int = 64, ttl: Optional[float] = 3600):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._pools: "OrderedDict[str, RankedPool]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[RankedPool]:
+        with self._lock:
+            pool = self._pools.get(session_id)
+            if pool is None:
+                return None
+            if self.ttl is not None and time.time() - pool.created > self.ttl:
+                del self._pools[session_id]
+                return None
+            self._pools.move_to_end(session_id)
+            return pool
+
+    def put(self, session_id: str, pool: RankedPool):
+        with self._lock:
+            self._pools[session_id] = pool
+            self._pools.move_to_end(session_id)
+            while len(self._pools) > self.max_sessions:
+                self._pools.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_pool_store() -> PoolStore:
+    """Process-wide per-session pool store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PoolStore(max_sessions=config.POOL_SESSIONS_MAX, ttl=config.POOL_SESSION_TTL)
+    return _store
@@ -1,149 +1,299 @@
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
-import html
+import asyncio
 from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterator, Optional
 import time
-import math
-import re
-from difflib import SequenceMatcher
-import numpy as np
+import random
 from datetime import datetime
-from openai import OpenAI
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-import pymc as pm
-import numpy as np
+from app import config
+from app.browser import get_browser_pool
+from app.cache import get_page_cache, page_key
+from app.captcha import get_captcha_broker
+from app.index import get_paper_index
+from app.clients import get_openai_client
+from app.http_fetch import Blocked, check_page, get_http_fetcher
+from app.models import PaperBatch
+from app.parsing import parse_results_page
+from app.tracing import CAPTCHAS, PAGES_FETCHED, PAPERS_PARSED, span, traced
 
+# Ranking engines (NumPy, embeddings, PyMC) and the OpenAI client are loaded
+# on first use so that importing this module stays cheap for API workers.
+if TYPE_CHECKING:
+    from app.bayes import BayesianLinearRanker
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+def __getattr__(name):
+    # backwards compatible `from app.scholar import client`
+    if name == "client":
+        return get_openai_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def search_scholar(query: str, pool_size: int = 100, sort_by: str = "relevance", wait_for_user=False):
+
+def search_scholar(
+    query: str,
+    pool_size: int = 100,
+    sort_by: str = "relevance",
+    wait_for_user=False,
+    concurrency: Optional[int] = None,
+    session_id: Optional[str] = None,
+):
     """
     Scrape Google Scholar for a pool of papers.
     If captcha appears, user solves it manually in the visible browser.
-    When scraping completes, prints "DONE SCRAPING" and writes scrape_done.txt.
-    If wait_for_user=True, Streamlit will show a resume button after captcha.
+    If wait_for_user=True, the captcha is announced on the captcha broker under
+    session_id, so the UI/API can show it and resume the scrape.
+    When scraping completes, prints "DONE SCRAPING" and publishes a "done" event.
+    Result pages are cached on disk per (query, sort_by, offset), so only the
+    pages missing from the cache are fetched, using the shared browser pool.
+    concurrency: pages fetched in parallel (default SCHOLAR_FETCH_CONCURRENCY);
+    results are always merged in page order.
     """
-    results = []
-    encoded_query = quote_plus(query)
-    per_page = 10
-    pages = (pool_size + per_page - 1) // per_page
-    sort_param = "0" if sort_by == "relevance" else "1"
+    return list(iter_scholar(query, pool_size, sort_by, wait_for_user, concurrency, session_id))
 
-    # remove any old flags
-    if os.path.exists("scrape_done.txt"):
-        os.remove("scrape_done.txt")
-    if os.path.exists("captcha_flag.txt"):
-        os.remove("captcha_flag.txt")
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, slow_mo=200)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                       "AppleWebKit/537.36 (KHTML, like Gecko) "
-                       "Chrome/124.0.0.0 Safari/537.36",
-            viewport={"width": 1280, "height": 900}
-        )
-        page = context.new_page()
 
+def iter_scholar(
+    query: str,
+    pool_size: int = 100,
+    sort_by: str = "relevance",
+    wait_for_user=False,
+    concurrency: Optional[int] = None,
+    session_id: Optional[str] = None,
+) -> Iterator[dict]:
+    """
+    Streaming variant of search_scholar: yields papers (in page order) as soon
+    as each result page has been parsed, instead of after the whole pool.
+    """
+    session_id = session_id or get_captcha_broker().new_session()
+    pages, page_results, missing = _cached_pages(query, pool_size, sort_by)
+    pool = get_browser_pool() if missing else None
+    fetcher = get_http_fetcher() if missing else None
+
+    def load(i):
+        time.sleep(random.uniform(0, config.PAGE_JITTER))
+        url = _page_url(query, i, sort_by)
+        html_content = _http_fetch(fetcher, url)
+        if html_content is None:
+            html_content = pool.run(lambda page: _browser_fetch(page, url, wait_for_user, session_id, fetcher))
+        papers = _store_page(query, sort_by, i, html_content)
+        time.sleep(config.PAGE_DELAY)
+        return papers
+
+    # browser slots bound the parallelism only when every page needs one
+    limit = pool.size if missing and fetcher is None else len(missing)
+    workers = max(1, min(concurrency or config.FETCH_CONCURRENCY, limit, len(missing))) if missing else 1
+    executor = None
+    futures = {}
+    if workers > 1:
+        print(f"DEBUG: Fetching {len(missing)} pages with concurrency={workers}")
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scholar-fetch")
+        futures = {i: executor.submit(load, i) for i in missing}
+
+    try:
         for i in range(pages):
-            start = i * per_page
-            url = f"https://scholar.google.com/scholar?hl=en&q={encoded_query}&start={start}&scisbd={sort_param}"
-            print(f"DEBUG: Visiting {url}")
-
-            page.goto(url)
+            if i in page_results:
+                papers = page_results[i]
+            elif i in futures:
+                papers = futures[i].result()
+            else:
+                papers = load(i)
+            yield from papers
+    finally:
+        if executor is not None:
+            # consumer stopped early: drop pages nobody will read
+            executor.shutdown(wait=False, cancel_futures=True)
+        # also when stopped early or failed, so listeners never wait forever
+        _signal_done(session_id)
+
+
+async def asearch_scholar(
+    query: str,
+    pool_size: int = 100,
+    sort_by: str = "relevance",
+    wait_for_user=False,
+    concurrency: Optional[int] = None,
+    session_id: Optional[str] = None,
+) -> list:
+    """
+    Async variant of search_scholar for the API: page loads are handed to the
+    browser pool and awaited, and cache reads, parsing and storing run in
+    worker threads, so the event loop is never blocked.
+    """
+    session_id = session_id or get_captcha_broker().new_session()
+    try:
+        pages, page_results, missing = await asyncio.to_thread(_cached_pages, query, pool_size, sort_by)
+        if missing:
+            pool = get_browser_pool()
+            fetcher = get_http_fetcher()
+            workers = concurrency or config.FETCH_CONCURRENCY
+            limit = asyncio.Semaphore(max(1, workers if fetcher is not None else min(workers, pool.size)))
+
+            async def load(i):
+                async with limit:
+                    await asyncio.sleep(random.uniform(0, config.PAGE_JITTER))
+                    url = _page_url(query, i, sort_by)
+                    html_content = await asyncio.to_thread(_http_fetch, fetcher, url)
+                    if html_content is None:
+                        html_content = await asyncio.wrap_future(
+                            pool.submit(lambda page: _browser_fetch(page, url, wait_for_user, session_id, fetcher))
+                        )
+                    page_results[i] = await asyncio.to_thread(_store_page, query, sort_by, i, html_content)
+                    await asyncio.sleep(config.PAGE_DELAY)
 
+            tasks = [asyncio.ensure_future(load(i)) for i in missing]
             try:
-                page.wait_for_selector(".gs_ri, .gs_r, .gs_or", timeout=15000)
-            except Exception:
-                print("⚠️ Captcha detected, please solve it in the browser.")
-
-                if wait_for_user:
-                    # signal to UI that we're waiting
-                    with open("captcha_flag.txt", "w") as f:
-                        f.write("waiting")
-
-                    # wait until UI removes this file
-                    while os.path.exists("captcha_flag.txt"):
-                        time.sleep(1)
-
-                # otherwise just block until solved
-                page.wait_for_selector(".gs_ri, .gs_r, .gs_or", timeout=0)
-
-            # parse entries
-            html_content = page.content()
-            soup = BeautifulSoup(html_content, "html.parser")
-            entries = soup.select(".gs_ri, .gs_r, .gs_or")
-            print(f"DEBUG: Page {i}, found {len(entries)} entries")
-
-            for entry in entries:
-                title_tag = entry.select_one("h3 a")
-                title = html.unescape(title_tag.text.strip()) if title_tag else "No title"
-                link = title_tag["href"] if title_tag else None
-                snippet = entry.select_one(".gs_rs")
-                snippet_text = html.unescape(snippet.text.strip()) if snippet else ""
-                authors_year = entry.select_one(".gs_a")
-                authors_year_text = html.unescape(authors_year.text.strip()) if authors_year else ""
-                scholar_link = None
-                if title_tag and title_tag.has_attr("href"):
-                    scholar_link = (
-                        "https://scholar.google.com" + title_tag["href"]
-                        if title_tag["href"].startswith("/scholar")
-                        else title_tag["href"]
-                    )
-                pdf_tag = entry.select_one(".gs_or_ggsm a, .gs_ggsd a")
-                pdf_link = pdf_tag["href"] if pdf_tag else None
-                citations = None
-                footer = entry.select_one(".gs_fl")
-                if footer:
-                    cite_link = footer.find("a", string=lambda s: s and "Cited by" in s)
-                    if cite_link:
-                        raw = cite_link.get_text(" ", strip=True)
-                        cleaned = (
-                            raw.replace("Cited by", "")
-                            .replace("\xa0", "")   # non-breaking space
-                            .replace("\u202f", "") # narrow space
-                            .replace(",", "")      # thousands separator
-                            .replace(".", "")      # fallback
-                            .strip()
-                        )
-                        if cleaned.isdigit():
-                            citations = int(cleaned)
-                        else:
-                            citations = None
-                year = None
-                match = re.search(r"\b(19|20)\d{2}\b", authors_year_text)
-                if match:
-                    year = int(match.group(0))
-
-                results.append({
-                    "title": title,
-                    "link": link,
-                    "scholar_link": scholar_link,
-                    "pdf_link": pdf_link,
-                    "snippet": snippet_text,
-                    "authors_year": authors_year_text,
-                    "citations": citations,
-                    "year": year
-                })
-
-            time.sleep(1)
-
-        browser.close()
-
-    # 🔹 Signal scraping is done
-    with open("scrape_done.txt", "w") as f:
-        f.write("done")
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # one page failed: stop the others instead of leaving them running unobserved
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        return [paper for i in range(pages) for paper in page_results[i]]
+    finally:
+        # also on failure, so captcha listeners never wait forever
+        _signal_done(session_id)
+
+
+# ── Scraping helpers ──────────────────────────────────────────────────────────
+PER_PAGE = 10
+
+
+def _page_url(query: str, page_index: int, sort_by: str) -> str:
+    sort_param = "0" if sort_by == "relevance" else "1"
+    start = page_index * PER_PAGE
+    return f"{config.SCHOLAR_BASE_URL}/scholar?hl=en&q={quote_plus(query)}&start={start}&scisbd={sort_param}"
+
+
+def _cached_pages(query: str, pool_size: int, sort_by: str):
+    """Split the pages needed for pool_size into cached results and missing page indices."""
+    pages = (pool_size + PER_PAGE - 1) // PER_PAGE
+    cache = get_page_cache()
+    page_results = {}
+    for i in range(pages):
+        if cache is not None:
+            cached = cache.get(page_key(query, sort_by, i * PER_PAGE))
+            if cached is not None:
+                page_results[i] = cached
+    missing = [i for i in range(pages) if i not in page_results]
+    print(f"DEBUG: Page cache hits={pages - len(missing)}, misses={len(missing)}")
+    return pages, page_results, missing
+
+
+def _store_page(query: str, sort_by: str, page_index: int, html_content: Optional[str]) -> list:
+    """
+    Parse a fetched result page, cache its papers and add them to the local
+    index. A page without entries is only cached if it is Scholar's genuine
+    "no results" page, never a captcha or block page (or None: no page).
+    """
+    if html_content is None:
+        print(f"DEBUG: Page {page_index} unavailable, skipped")
+        return []
+    with span("scholar.parse", page=page_index) as s:
+        papers = [paper.model_dump() for paper in parse_results_page(html_content)]
+        s.set(entries=len(papers))
+    PAPERS_PARSED.inc(len(papers))
+    print(f"DEBUG: Page {page_index}, found {len(papers)} entries")
+    if not papers:
+        try:
+            check_page(200, "", html_content)
+        except Blocked as e:
+            print(f"⚠️ Page {page_index} is not a result page ({e}), not caching it")
+            return []
+    cache = get_page_cache()
+    if cache is not None:
+        cache.set(page_key(query, sort_by, page_index * PER_PAGE), papers)
+    index = get_paper_index()
+    if index is not None:
+        index.add(papers)
+    return papers
+
+
+def _signal_done(session_id: str):
+    get_captcha_broker().done(session_id)
     print("✅ DONE SCRAPING")
 
-    return results
 
+RESULTS_SELECTOR = ".gs_ri, .gs_r, .gs_or"
+CAPTCHA_CHECK_MS = 250
+
+
+def _http_fetch(fetcher, url: str) -> Optional[str]:
+    """Result page over plain HTTP, or None if the browser has to do it."""
+    if fetcher is None or not fetcher.available:
+        return None
+    try:
+        with span("scholar.http_fetch", url=url):
+            html_content = fetcher.fetch(url)
+    except Blocked as e:
+        print(f"⚠️ HTTP fetch blocked ({e}), falling back to the browser")
+        return None
+    PAGES_FETCHED.inc(via="http")
+    return html_content
 
 
+def _browser_fetch(page, url: str, wait_for_user: bool, session_id: Optional[str], fetcher=None) -> Optional[str]:
+    """
+    _fetch_page, then hand the browser's cookies (e.g. a solved captcha) to
+    the HTTP tier. None if the page is still a captcha (resumed unsolved).
+    """
+    html_content = _fetch_page(page, url, wait_for_user, session_id)
+    try:
+        check_page(200, page.url, html_content)
+    except Blocked as e:
+        print(f"⚠️ Still blocked after the captcha wait ({e}), skipping {url}")
+        return None
+    if fetcher is not None:
+        fetcher.adopt_cookies(page.context.cookies())
+    return html_content
+
+
+def _fetch_page(page, url: str, wait_for_user: bool, session_id: Optional[str] = None) -> str:
+    """Load one result page in a pooled browser tab and return its HTML."""
+    print(f"DEBUG: Visiting {url}")
+    with span("scholar.fetch_page", url=url) as s:
+        page.goto(url)
+
+        try:
+            page.wait_for_selector(RESULTS_SELECTOR, timeout=15000)
+        except Exception:
+            print("⚠️ Captcha detected, please solve it in the browser.")
+            CAPTCHAS.inc()
+            s.set(captcha=True)
+
+            with span("scholar.captcha_wait", session=session_id):
+                if wait_for_user and session_id:
+                    _wait_for_captcha(page, url, session_id)
+                else:
+                    # otherwise just block until solved
+                    page.wait_for_selector(RESULTS_SELECTOR, timeout=0)
+
+        html_content = page.content()
+    PAGES_FETCHED.inc(via="browser")
+    return html_content
+
+
+def _wait_for_captcha(page, url: str, session_id: str):
+    """
+    Announce the captcha on the broker and block this session until the user
+    solves it in the browser or resumes it from the UI/API (an unsolved page
+    is then skipped, see _browser_fetch). Other sessions keep scraping meanwhile.
+    """
+    broker = get_captcha_broker()
+    resumed = broker.register(session_id, url)
+    try:
+        while not resumed.is_set():
+            try:
+                page.wait_for_selector(RESULTS_SELECTOR, timeout=CAPTCHA_CHECK_MS)
+                return
+            except Exception:
+                if page.is_closed():
+                    raise
+    finally:
+        broker.resolved(session_id)
+
+
+@traced("rank.heuristic")
 def rank_papers(
     query: str,
     papers: list,
@@ -156,145 +306,188 @@ def rank_papers(
     Heuristic filtering stage: rank by similarity + citations + recency.
     Weights can be customized (default: sim=0.5, cites=0.3, recency=0.2).
     Returns top max_results to feed into the LLM.
+    papers may be a list of dicts or a PaperBatch (then a PaperBatch is returned).
     """
-    scored = []
-    for paper in papers:
-        # similarity (title > snippet)
-        sim = 0.0
-        if paper.get("title"):
-            sim = SequenceMatcher(None, query.lower(), paper["title"].lower()).ratio()
-        elif paper.get("snippet"):
-            sim = SequenceMatcher(None, query.lower(), paper["snippet"].lower()).ratio()
-
-        # citations (log scaled)
-        cites = math.log1p(paper["citations"]) if paper.get("citations") else 0.0
-
-        # recency boost (2000 → 0.0, 2025 → 1.0)
-        recency = 0.0
-        if paper.get("year"):
-            recency = max(0, (paper["year"] - 2000) / 25.0)
-
-        # weighted score
-        score = (w_sim * sim) + (w_cites * (cites / 10)) + (w_recency * recency)
-        scored.append((score, paper))
-
-    # Sort by score (descending)
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [p for _, p in scored[:max_results]]
+    if not len(papers):
+        return _select(papers, [])
+    features = heuristic_features(query, PaperBatch.from_dicts(papers))
+    scores = features @ [w_sim, w_cites, w_recency]
+    return _select(papers, top_k(scores, max_results))
+
+
+HEURISTIC_FEATURES = ("similarity", "citations", "recency")
+
+
+def heuristic_features(query: str, batch: PaperBatch):
+    """
+    (n, 3) matrix of the heuristic ranking features, one row per paper, so
+    any weighting of them is a single matrix-vector product.
+    """
+    import numpy as np
+    from app.similarity import lexical_similarity
+
+    # similarity (title > snippet), scored against the whole pool at once
+    sim = lexical_similarity(query, batch.texts())
+
+    # citations (log scaled)
+    cites = np.log1p(np.maximum(batch.citations, 0)) / 10
+
+    # recency boost (2000 → 0.0, 2025 → 1.0)
+    years = batch.year.astype(float)
+    recency = np.where(years > 0, np.maximum(0, (years - 2000) / 25.0), 0.0)
+    return np.column_stack([sim, cites, recency])
+
+
+def top_k(scores, k: int):
+    """
+    Indices of the k best scores, best first (ties in pool order, like a
+    stable sort), via a partial selection instead of sorting everything.
+    """
+    import numpy as np
+
+    scores = np.asarray(scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[: k - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
+
+
+def _select(papers, order):
+    """Rows of papers in the given order, as the same kind of container."""
+    if isinstance(papers, PaperBatch):
+        return papers.take(order)
+    return [papers[i] for i in order]
 
 def cosine_similarity(v1, v2):
+    import numpy as np
+
     return np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
 
 
-def smart_rank_papers(query: str, papers: list, max_results: int = 20, tau: float = 5.0):
+@traced("rank.smart")
+def smart_rank_papers(
+    query: str,
+    papers: list,
+    max_results: int = 20,
+    tau: float = 5.0,
+    embedding_backend=None,
+):
     """
     Super Smart filtering stage:
     - Semantic similarity (OpenAI embeddings)
     - Citation impact normalized by paper age
     - Recency via exponential decay
     - PDF boost
-    Returns top max_results to feed into the LLM.
+    Query and papers are embedded together in batched requests, reusing the
+    on-disk embedding cache; embedding_backend="local" works offline.
+    Returns top max_results to feed into the LLM (a PaperBatch if given one).
     """
-    current_year = datetime.now().year
+    import numpy as np
+    from app.embeddings import embed_texts
 
-    # Embed the query once
-    query_vec = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=query
-    ).data[0].embedding
+    current_year = datetime.now().year
+    batch = PaperBatch.from_dicts(papers)
 
-    scored = []
-    for paper in papers:
-        # Title + snippet combined for embedding
-        text = (paper.get("title") or "") + " " + (paper.get("snippet") or "")
+    # Title + snippet combined for embedding
+    keep, texts = [], []
+    for i, (title, snippet) in enumerate(zip(batch.title, batch.snippet)):
+        text = (title or "") + " " + (snippet or "")
         if not text.strip():
             continue
-
-        # Embedding similarity
-        paper_vec = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        ).data[0].embedding
-        semantic_sim = cosine_similarity(query_vec, paper_vec)
-
-        # Citation impact per year
-        citations = paper.get("citations") or 0
-        year = paper.get("year") or current_year
-        age = max(1, current_year - year + 1)
-        citation_score = citations / age  # favors influential + newer
-
-        # Recency with exponential decay
-        recency = np.exp(-(current_year - year) / tau) if paper.get("year") else 0.0
-
-        # PDF boost (slight bump if accessible)
-        pdf_boost = 0.1 if paper.get("pdf_link") else 0.0
-
-        # Weighted score
-        score = (0.4 * semantic_sim +
-                 0.25 * (citation_score / 100) +  # scaled down
-                 0.25 * recency +
-                 pdf_boost)
-
-        scored.append((score, paper))
+        keep.append(i)
+        texts.append(text)
+    if not keep:
+        return _select(papers, [])
+    keep = np.asarray(keep)
+
+    vectors = embed_texts([query] + texts, backend=embedding_backend)
+    query_vec, paper_vecs = vectors[0], vectors[1:]
+
+    # Embedding similarity for every paper in one matrix-vector product
+    norms = np.linalg.norm(paper_vecs, axis=1) * np.linalg.norm(query_vec)
+    norms[norms == 0] = 1.0
+    semantic_sim = (paper_vecs @ query_vec) / norms
+
+    # Citation impact per year
+    has_year = batch.year[keep] > 0
+    citations = np.maximum(batch.citations[keep], 0).astype(float)
+    years = np.where(has_year, batch.year[keep], current_year).astype(float)
+    age = np.maximum(1, current_year - years + 1)
+    citation_score = citations / age  # favors influential + newer
+
+    # Recency with exponential decay
+    recency = np.where(has_year, np.exp(-(current_year - years) / tau), 0.0)
+
+    # PDF boost (slight bump if accessible)
+    pdf_boost = np.where(batch.has_pdf[keep], 0.1, 0.0)
+
+    # Weighted score
+    scores = (0.4 * semantic_sim +
+              0.25 * (citation_score / 100) +  # scaled down
+              0.25 * recency +
+              pdf_boost)
 
     # Sort by score
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [p for _, p in scored[:max_results]]
+    order = np.argsort(-scores, kind="stable")[:max_results]
+    return _select(papers, keep[order])
 
 
 
-def bayesian_rank_papers(query: str, papers: list, max_results: int = 20):
+@traced("rank.bayesian")
+def bayesian_rank_papers(
+    query: str,
+    papers: list,
+    max_results: int = 20,
+    engine: str = "analytic",
+    ranker: Optional["BayesianLinearRanker"] = None,
+):
     """
     Bayesian linear model filter:
     Uses semantic similarity, citation score (per year), and recency.
     Returns top max_results papers by posterior predictive mean relevance.
+    engine="analytic" computes the posterior in closed form (milliseconds);
+    engine="pymc" samples it with MCMC for validation.
+    Pass a BayesianLinearRanker to rank with a posterior kept across calls
+    (e.g. with relevance feedback via ranker.update(X, y)); it is not modified.
+    papers may be a list of dicts or a PaperBatch (then a PaperBatch is returned).
     """
+    import numpy as np
+    from app.bayes import BayesianLinearRanker, pymc_posterior_mean
+    from app.similarity import lexical_similarity
+
+    if not len(papers):
+        return _select(papers, [])
+    batch = PaperBatch.from_dicts(papers)
 
     # Build feature matrix
-    X, paper_list = [], []
     current_year = datetime.now().year
-
-    for paper in papers:
-        # Features
-        sim = 0.0
-        if paper.get("title"):
-            sim = SequenceMatcher(None, query.lower(), paper["title"].lower()).ratio()
-        elif paper.get("snippet"):
-            sim = SequenceMatcher(None, query.lower(), paper["snippet"].lower()).ratio()
-
-        cites = paper.get("citations") or 0
-        year = paper.get("year") or current_year
-        age = max(1, current_year - year + 1)
-        citation_score = cites / age
-
-        recency = np.exp(-(current_year - year) / 5.0) if paper.get("year") else 0.0
-
-        X.append([sim, citation_score, recency])
-        paper_list.append(paper)
-
-    X = np.array(X)
-
-    # Priors + Bayesian linear regression
-    with pm.Model() as model:
-        # Priors on weights
-        w = pm.Normal("w", mu=[0.8, 0.5, 0.5], sigma=[0.3, 0.3, 0.3], shape=3)
-        sigma = pm.HalfNormal("sigma", sigma=1.0)
-
-        mu = pm.math.dot(X, w)
-        relevance = pm.Normal("relevance", mu=mu, sigma=sigma, observed=np.ones(len(X)))  # fake obs to anchor
-
-        trace = pm.sample(2000, tune=500, chains=4, cores=4, progressbar=True)
+    sims = lexical_similarity(query, batch.texts())
+    cites = np.maximum(batch.citations, 0).astype(float)
+    has_year = batch.year > 0
+    years = np.where(has_year, batch.year, current_year).astype(float)
+    age = np.maximum(1, current_year - years + 1)
+    citation_score = cites / age
+    recency = np.where(has_year, np.exp(-(current_year - years) / 5.0), 0.0)
+    X = np.column_stack([sims, citation_score, recency])
 
     # Posterior mean weights
-    w_mean = trace.posterior["w"].mean(dim=["chain", "draw"]).values
+    if engine == "pymc":
+        w_mean = pymc_posterior_mean(X)
+    elif engine == "analytic":
+        # fake obs (relevance=1) to anchor, on a copy: the caller's ranker only learns from real feedback
+        base = ranker.copy() if ranker is not None else BayesianLinearRanker()
+        w_mean = base.update(X).weights
+    else:
+        raise ValueError(f"Unknown engine: {engine!r} (choose 'analytic' or 'pymc')")
 
     # Score papers with posterior mean weights
     scores = X @ w_mean
-    ranked = sorted(zip(scores, paper_list), key=lambda x: x[0], reverse=True)
-
-    return [p for _, p in ranked[:max_results]]
-
-
+    order = np.argsort(-scores, kind="stable")[:max_results]
+    return _select(papers, order)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app import config
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class LexicalIndex:
+    """
+    Sparse term index over a pool of texts, built once and scored against
+    any number of queries in a single vectorized pass.
+    scheme="tfidf": cosine of sublinear TF-IDF vectors, in [0, 1].
+    scheme="bm25": Okapi BM25, divided by the best score in the pool.
+    """
+
+    def __init__(self, texts: List[str], scheme: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.scheme = scheme or config.SIMILARITY_SCHEME
+        if self.scheme not in ("tfidf", "bm25"):
+            raise ValueError(f"Unknown similarity scheme: {self.scheme!r} (choose 'tfidf' or 'bm25')")
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(texts)
+        self.vocab: Dict[str, int] = {}
+
+        doc_ids, term_ids = [], []
+        for d, text in enumerate(texts):
+            for token in tokenize(text):
+                term_ids.append(self.vocab.setdefault(token, len(self.vocab)))
+                doc_ids.append(d)
+        n_terms = len(self.vocab)
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+
+        # one (doc, term, count) triple per distinct term in a doc
+        keys, tf = np.unique(doc_ids * max(n_terms, 1) + term_ids, return_counts=True)
+        self.doc = keys // max(n_terms, 1)
+        self.term = keys % max(n_terms, 1)
+        self.tf = tf.astype(np.float64)
+
+        self.df = np.bincount(self.term, minlength=n_terms).astype(np.float64)
+        self.doc_len = np.bincount(doc_ids, minlength=self.n_docs).astype(np.float64)
+
+        if self.scheme == "tfidf":
+            self.idf = np.log((1 + self.n_docs) / (1 + self.df)) + 1
+            self.weight = (1 + np.log(self.tf)) * self.idf[self.term]
+            self.doc_norm = np.sqrt(np.bincount(self.doc, weights=self.weight ** 2, minlength=self.n_docs))
+        else:
+            self.idf = np.log(1 + (self.n_docs - self.df + 0.5) / (self.df + 0.5))
+            avg_len = self.doc_len.mean() if self.n_docs else 0.0
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[self.doc] / (avg_len or 1.0))
+            self.weight = self.idf[self.term] * self.tf * (self.k1 + 1) / (self.tf + norm)
+
+    def score(self, query: str) -> np.ndarray:
+        """Similarity of every text in the pool to query, shape (n_docs,)."""
+        scores = np.zeros(self.n_docs)
+        tokens = tokenize(query)
+        if not tokens or not self.n_docs:
+            return scores
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        query_weight = np.zeros(len(self.vocab))
+        unseen_norm = 0.0
+        for token, count in counts.items():
+            t = self.vocab.get(token)
+            if self.scheme == "tfidf":
+                idf = self.idf[t] if t is not None else np.log(1 + self.n_docs) + 1
+                w = (1 + np.log(count)) * idf
+                if t is None:
+                    # terms missing from the pool still lower the cosine
+                    unseen_norm += w ** 2
+                else:
+                    query_weight[t] = w
+            elif t is not None:
+                query_weight[t] = 1.0
+
+        mask = query_weight[self.term] != 0
+        dots = np.bincount(
+            self.doc[mask], weights=self.weight[mask] * query_weight[self.term[mask]], minlength=self.n_docs
+        )
+        if self.scheme == "tfidf":
+            query_norm = np.sqrt((query_weight ** 2).sum() + unseen_norm)
+            denom = self.doc_norm * query_norm
+            np.divide(dots, denom, out=scores, where=denom > 0)
+            return np.clip(scores, 0.0, 1.0)
+
+        best = dots.max()
+        return dots / best if best > 0 else dots
+
+
+def lexical_similarity(query: str, texts: List[str], scheme: Optional[str] = None) -> np.ndarray:
+    """Score all texts against query at once; see LexicalIndex."""
+    return LexicalIndex(texts, scheme=scheme).score(query)
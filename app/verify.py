@@ -0,0 +1,213 @@
+import re
+import threading
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app import config
+from app.index import get_paper_index, normalize_title, paper_key
+from app.tracing import traced
+
+MATCH_THRESHOLD = 0.8  # shingle Jaccard similarity that counts as "found"
+MERSENNE_PRIME = 4294967311  # smallest prime above 2**32
+MAX_CANDIDATES = 50  # LSH candidates scored exactly per lookup
+
+
+# ── Citation parsing ──────────────────────────────────────────────────────────
+LIST_MARKER_RE = re.compile(r"^\s*(?:\[\d+\]|\d+[.)]|[-*•])\s*")
+QUOTED_RE = re.compile(r"[\"“]([^\"”]{10,})[\"”]")
+APA_RE = re.compile(r"\(\s*(?:19|20)\d{2}[a-z]?\s*\)[.,]?\s*(.+?)(?:[.?!](?:\s|$)|$)")
+
+
+def split_citations(text: str) -> List[str]:
+    """One citation per non-empty line of a pasted reference list."""
+    return [line.strip() for line in text.splitlines() if LIST_MARKER_RE.sub("", line).strip()]
+
+
+def extract_title(citation: str) -> str:
+    """
+    Best guess at the title inside a citation: a quoted title, else the
+    sentence after an APA-style "(2020)." year, else the whole line.
+    """
+    text = LIST_MARKER_RE.sub("", citation).strip()
+    for pattern in (QUOTED_RE, APA_RE):
+        match = pattern.search(text)
+        if match and len(match.group(1).split()) >= 2:
+            return match.group(1).strip().rstrip(".,")
+    return text
+
+
+# ── Fuzzy title index ─────────────────────────────────────────────────────────
+class FuzzyTitleIndex:
+    """
+    Typo-tolerant title lookup over every known paper.
+
+    Titles are broken into character n-gram shingles; MinHash signatures
+    bucketed by LSH bands give a handful of candidates per query in
+    constant time, which are then scored by their exact shingle Jaccard.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, ngram: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.ngram = ngram
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 31, num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, 2 ** 31, num_perm, dtype=np.uint64)[:, None]
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._shingles: List[frozenset] = []
+        self._keys: Dict[str, int] = {}
+        self.papers: List[dict] = []
+        self.synced = 0  # last PaperIndex rowid folded in
+        self._lock = threading.Lock()
+
+    def shingles(self, title: str) -> frozenset:
+        text = f" {normalize_title(title)} "
+        if len(text.strip()) == 0:
+            return frozenset()
+        n = self.ngram
+        return frozenset(zlib.crc32(text[i:i + n].encode()) for i in range(max(1, len(text) - n + 1)))
+
+    def _signature(self, shingles: frozenset) -> np.ndarray:
+        h = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))[None, :]
+        return ((self._a * h + self._b) % MERSENNE_PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, paper: dict) -> bool:
+        """Index a paper; False if it (same title + year) is already known or untitled."""
+        shingles = self.shingles(paper.get("title"))
+        key = paper_key(paper)
+        if not shingles:
+            return False
+        with self._lock:
+            if key in self._keys:
+                return False
+            pid = len(self.papers)
+            self._keys[key] = pid
+            self.papers.append(paper)
+            self._shingles.append(shingles)
+            for band, bucket_key in zip(self._buckets, self._band_keys(self._signature(shingles))):
+                band.setdefault(bucket_key, []).append(pid)
+        return True
+
+    def add_many(self, papers: List[dict]) -> int:
+        return sum(self.add(p) for p in papers)
+
+    def sync(self, paper_index) -> int:
+        """Fold in papers added to the local PaperIndex since the last sync."""
+        rows = paper_index.papers_since(self.synced)
+        for rowid, paper in rows:
+            self.add(paper)
+            self.synced = rowid
+        return len(rows)
+
+    def match(self, title: str, limit: int = 1) -> List[Tuple[dict, float]]:
+        """Closest known papers to title as (paper, Jaccard score), best first."""
+        shingles = self.shingles(title)
+        if not shingles:
+            return []
+        with self._lock:
+            # papers sharing more bands are likelier matches; only the
+            # most promising ones get an exact score
+            votes = Counter()
+            for band, bucket_key in zip(self._buckets, self._band_keys(self._signature(shingles))):
+                votes.update(band.get(bucket_key, ()))
+            scored = [
+                (self.papers[pid], len(shingles & self._shingles[pid]) / len(shingles | self._shingles[pid]))
+                for pid, _ in votes.most_common(max(limit, MAX_CANDIDATES))
+            ]
+        scored.sort(key=lambda item: -item[1])
+        return scored[:limit]
+
+    def __len__(self) -> int:
+        return len(self.papers)
+
+
+_title_index = None
+_title_index_lock = threading.Lock()
+
+
+def get_title_index() -> FuzzyTitleIndex:
+    """Process-wide fuzzy index, kept in sync with the local paper index."""
+    global _title_index
+    with _title_index_lock:
+        if _title_index is None:
+            _title_index = FuzzyTitleIndex()
+        paper_index = get_paper_index()
+        if paper_index is not None:
+            _title_index.sync(paper_index)
+    return _title_index
+
+
+# ── Batch verification ────────────────────────────────────────────────────────
+def _verdict(citation: str, title: str, matches: List[Tuple[dict, float]], source: str, threshold: float) -> dict:
+    paper, score = matches[0] if matches else (None, 0.0)
+    return {
+        "citation": citation,
+        "title": title,
+        "status": "found" if score >= threshold else "not_found",
+        "score": round(score, 3),
+        "source": source if paper is not None else None,
+        "match": paper,
+    }
+
+
+@traced("verify.citations")
+def verify_citations(
+    citations: List[str],
+    threshold: float = MATCH_THRESHOLD,
+    scrape: bool = True,
+    concurrency: Optional[int] = None,
+    progress_fn: Optional[Callable] = None,
+    index: Optional[FuzzyTitleIndex] = None,
+) -> List[dict]:
+    """
+    Verify a reference list. Every title is first matched against the fuzzy
+    index of known papers; only the unresolved ones are searched on Scholar,
+    concurrently (bounded by the browser pool, with the usual page pacing).
+    Returns one verdict per citation: status found/not_found/error, the
+    match score in [0, 1], where it was found and the matching paper.
+    """
+    from app.scholar import search_scholar
+
+    progress = progress_fn or (lambda message, stage=None: None)
+    index = index if index is not None else get_title_index()
+    titles = [extract_title(c) for c in citations]
+    verdicts = [_verdict(c, t, index.match(t), "index", threshold) for c, t in zip(citations, titles)]
+
+    # one scrape per distinct unresolved title
+    unresolved: Dict[str, List[int]] = {}
+    for i, verdict in enumerate(verdicts):
+        if verdict["status"] != "found":
+            unresolved.setdefault(normalize_title(titles[i]), []).append(i)
+    progress(f"📚 {len(citations) - sum(map(len, unresolved.values()))}/{len(citations)} citations matched locally", "match")
+    if not scrape or not unresolved:
+        return verdicts
+
+    workers = max(1, min(concurrency or config.FETCH_CONCURRENCY, len(unresolved)))
+    print(f"DEBUG: Scraping {len(unresolved)} unresolved titles with concurrency={workers}")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verify") as executor:
+        futures = {
+            executor.submit(search_scholar, titles[rows[0]], pool_size=3, wait_for_user=False): rows
+            for rows in unresolved.values()
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            rows = futures[future]
+            try:
+                index.add_many(future.result())
+            except Exception as e:
+                print(f"⚠️ Scholar check failed for {titles[rows[0]]!r}: {e}")
+                for i in rows:
+                    verdicts[i].update(status="error", error=str(e))
+                continue
+            for i in rows:
+                verdicts[i] = _verdict(citations[i], titles[i], index.match(titles[i]), "scholar", threshold)
+            progress(f"🔎 Checked {done}/{len(futures)} titles on Scholar", "scrape")
+    return verdicts
@@ -0,0 +1,227 @@
+"""
+Concurrent load generator for the FastAPI service: throughput and
+p50/p95/p99 latency of /search and of full lookups (POST /jobs, followed
+until the job finishes) at several concurrency levels.
+
+    python -m benchmarks.loadtest --spawn                       # mock upstreams + API, all local
+    python -m benchmarks.loadtest --api http://127.0.0.1:8000 --targets search --levels 1,8,32
+
+--spawn starts benchmarks.mock_server and the API (pointed at it, with
+fresh caches) in subprocesses, so nothing reaches Google Scholar or OpenAI;
+mock options such as --latency are passed through. Without --spawn the
+API at --api is used as it is configured.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LEVELS = (1, 4, 16)
+QUERIES = ("bayesian regression", "gaussian processes", "causal inference", "variational inference")
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile (p in 0..100) of values."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+async def run_level(send: Callable[[int], Awaitable[None]], concurrency: int, requests: int) -> dict:
+    """Issue requests calls of send(i), concurrency at a time; latency stats in seconds."""
+    latencies, errors = [], []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                await send(i)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+# ── Targets ───────────────────────────────────────────────────────────────────
+def _queries(unique: bool):
+    """Queries to send, in order; unique ones (numbered across all levels) defeat
+    the page cache and the shared in-flight scrapes."""
+    for n in itertools.count():
+        query = QUERIES[n % len(QUERIES)]
+        yield f"{query} {n}" if unique else query
+
+
+def search_target(client, args) -> Callable[[int], Awaitable[None]]:
+    queries = _queries(args.unique)
+
+    async def send(i):
+        response = await client.get(
+            "/search", params={"query": next(queries), "max_results": args.pool_size, "raw": "true"}
+        )
+        response.raise_for_status()
+    return send
+
+
+def lookup_target(client, args) -> Callable[[int], Awaitable[None]]:
+    queries = _queries(args.unique)
+
+    async def send(i):
+        body = {"query": next(queries), "pool_size": args.pool_size, "final_top_n": 5}
+        response = await client.post("/jobs", json=body)
+        response.raise_for_status()
+        job_id = response.json()["id"]
+        final = None
+        async with client.stream("GET", f"/jobs/{job_id}/events") as events:
+            events.raise_for_status()
+            async for line in events.aiter_lines():
+                if line.strip():
+                    final = json.loads(line)
+        if not final or final.get("status") != "done":
+            raise RuntimeError(f"job {job_id} ended {final and final.get('status')}: {final and final.get('error')}")
+    return send
+
+
+TARGETS = {"search": search_target, "lookup": lookup_target}
+
+
+async def run(args) -> List[dict]:
+    import httpx
+
+    rows = []
+    limits = httpx.Limits(max_connections=max(args.levels) * 2)
+    async with httpx.AsyncClient(base_url=args.api, timeout=args.timeout, limits=limits) as client:
+        for name in args.targets:
+            send = TARGETS[name](client, args)
+            for level in args.levels:
+                requests = args.requests or max(10, 4 * level)
+                row = {"target": name, **await run_level(send, level, requests)}
+                rows.append(row)
+                print(f"{name:7s} c={level:<4d} {row['ok']:>4d}/{requests:<4d} ok  {row['throughput']:7.2f} req/s  "
+                      f"p50 {row['p50'] * 1000:8.1f}ms  p95 {row['p95'] * 1000:8.1f}ms  p99 {row['p99'] * 1000:8.1f}ms"
+                      + (f"  ⚠️ {row['first_error']}" if row["errors"] else ""))
+    return rows
+
+
+# ── Local stack ───────────────────────────────────────────────────────────────
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url: str, process, timeout: float = 30):
+    import httpx
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{url} did not come up within {timeout}s")
+
+
+@contextmanager
+def local_stack(args):
+    """Mock upstreams + the API pointed at them; yields the API base URL."""
+    mock_port, api_port = _free_port(), _free_port()
+    mock_url = f"http://127.0.0.1:{mock_port}"
+    mock_cmd = [
+        sys.executable, "-m", "benchmarks.mock_server", "--port", str(mock_port),
+        "--latency", str(args.latency), "--jitter", str(args.jitter), "--llm-latency", str(args.llm_latency),
+        "--captcha-rate", str(args.captcha_rate),
+    ]
+    api_cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(api_port), "--log-level", "warning"]
+    with tempfile.TemporaryDirectory(prefix="research_helper_load_") as cache_dir:
+        env: Dict[str, str] = dict(
+            os.environ,
+            SCHOLAR_BASE_URL=mock_url,
+            OPENAI_BASE_URL=f"{mock_url}/v1",
+            OPENAI_API_KEY="mock",
+            RESEARCH_HELPER_CACHE_DIR=cache_dir,
+            SCHOLAR_HEADLESS="1",
+            SCHOLAR_SLOW_MO="0",
+            SCHOLAR_PAGE_DELAY="0",
+            SCHOLAR_PAGE_JITTER="0",
+            LLM_CACHE_MODE="off",
+        )
+        processes = [subprocess.Popen(mock_cmd, cwd=ROOT, env=env)]
+        try:
+            _wait_until_up(f"{mock_url}/stats", processes[0])
+            processes.append(subprocess.Popen(api_cmd, cwd=ROOT, env=env))
+            _wait_until_up(f"http://127.0.0.1:{api_port}/ping", processes[1])
+            yield f"http://127.0.0.1:{api_port}"
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                process.wait(timeout=10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description="Load test the API")
+    parser.add_argument("--api", default="http://127.0.0.1:8000", help="API base URL (ignored with --spawn)")
+    parser.add_argument("--spawn", action="store_true", help="start mock upstreams + the API locally")
+    parser.add_argument("--targets", default="search,lookup", help="comma-separated: search, lookup")
+    parser.add_argument("--levels", default=",".join(map(str, LEVELS)), help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=0, help="requests per level (default: 4 x concurrency, min 10)")
+    parser.add_argument("--pool-size", type=int, default=10, help="papers per search / lookup pool")
+    parser.add_argument("--unique", action="store_true", help="a distinct query per request (no cache hits)")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds per request")
+    parser.add_argument("--json", help="also write the results to this file")
+    mock = parser.add_argument_group("mock upstreams (--spawn)")
+    mock.add_argument("--latency", type=float, default=0.2)
+    mock.add_argument("--jitter", type=float, default=0.1)
+    mock.add_argument("--llm-latency", type=float, default=0.3)
+    mock.add_argument("--captcha-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    args.targets = [t for t in args.targets.split(",") if t]
+    args.levels = [int(level) for level in args.levels.split(",") if level]
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+
+    if args.spawn:
+        with local_stack(args) as api:
+            args.api = api
+            rows = asyncio.run(run(args))
+    else:
+        rows = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 1 if any(row["errors"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Local stand-in for Google Scholar and the OpenAI API, for load tests and
+offline runs of the real service.
+
+    python -m benchmarks.mock_server --port 8765 --latency 0.2 --llm-latency 0.5 --captcha-rate 0.05
+
+then start the API against it:
+
+    SCHOLAR_BASE_URL=http://127.0.0.1:8765 OPENAI_BASE_URL=http://127.0.0.1:8765/v1 \\
+    OPENAI_API_KEY=mock SCHOLAR_HEADLESS=1 uvicorn app.main:app
+
+GET /scholar serves the recorded result pages (cycled by `start`) after
+--latency seconds (+ up to --jitter). With --captcha-rate, that share of
+page loads gets a captcha page instead, which reloads itself after
+--captcha-solve seconds and then shows the results, like a solved captcha.
+POST /v1/chat/completions and /v1/embeddings answer in the OpenAI wire
+format with the benchmark fakes (see benchmarks.pipeline).
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse
+
+from benchmarks.pipeline import fake_completion, fixture_pages
+
+CAPTCHA_PAGE = """<html><head><title>Sorry...</title>
+<meta http-equiv="refresh" content="{solve}"></head>
+<body><div id="gs_captcha_ccl"><h1>Please show you're not a robot</h1>
+<form id="gs_captcha_f"><div class="g-recaptcha"></div></form></div></body></html>"""
+
+
+@dataclass
+class MockSettings:
+    latency: float = 0.0  # seconds per Scholar page
+    jitter: float = 0.0  # extra random 0..jitter seconds per page
+    llm_latency: float = 0.0  # seconds per completion / embedding request
+    captcha_rate: float = 0.0  # share of page loads answered with a captcha
+    captcha_solve: float = 2.0  # seconds until a captcha page reloads itself
+    seed: int = 0
+
+
+def create_app(settings: MockSettings = None) -> FastAPI:
+    settings = settings or MockSettings()
+    pages = fixture_pages()
+    rng = random.Random(settings.seed)
+    captchas = set()  # page urls currently showing a captcha
+    lock = threading.Lock()
+    stats = {"pages": 0, "captchas": 0, "completions": 0, "embeddings": 0}
+    app = FastAPI(title="Mock Scholar + OpenAI")
+    app.state.settings, app.state.stats = settings, stats
+
+    def _embedder():
+        from app.embeddings import LocalEmbeddings
+
+        if not hasattr(app.state, "embedder"):
+            app.state.embedder = LocalEmbeddings()
+        return app.state.embedder
+
+    @app.get("/scholar", response_class=HTMLResponse)
+    async def scholar(request: Request, start: int = 0):
+        await asyncio.sleep(settings.latency + rng.random() * settings.jitter)
+        key = str(request.url)
+        with lock:
+            if key in captchas:
+                captchas.discard(key)  # "solved": the reload gets results
+            elif rng.random() < settings.captcha_rate:
+                captchas.add(key)
+                stats["captchas"] += 1
+                return HTMLResponse(CAPTCHA_PAGE.format(solve=settings.captcha_solve))
+            stats["pages"] += 1
+        return HTMLResponse(pages[(start // 10) % len(pages)])
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(settings.llm_latency)
+        prompt = body["messages"][-1]["content"]
+        content = fake_completion(prompt)
+        with lock:
+            stats["completions"] += 1
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+        return {
+            "id": f"chatcmpl-mock-{stats['completions']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {**usage, "total_tokens": sum(usage.values())},
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        await asyncio.sleep(settings.llm_latency)
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        vectors = _embedder().embed(texts, body.get("model", "mock"))
+        with lock:
+            stats["embeddings"] += 1
+        tokens = sum(len(t) for t in texts) // 4
+        return {
+            "object": "list",
+            "model": body.get("model", "mock"),
+            "data": [{"object": "embedding", "index": i, "embedding": v.tolist()} for i, v in enumerate(vectors)],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.get("/stats")
+    def get_stats():
+        """Pages, captchas, completions and embedding requests served so far."""
+        return dict(stats)
+
+    return app
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.mock_server", description="Mock Scholar + OpenAI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per Scholar page")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds per page (0..jitter)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per OpenAI request")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="share of page loads that hit a captcha")
+    parser.add_argument("--captcha-solve", type=float, default=2.0, help="seconds until a captcha page reloads")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    settings = MockSettings(
+        latency=args.latency, jitter=args.jitter, llm_latency=args.llm_latency,
+        captcha_rate=args.captcha_rate, captcha_solve=args.captcha_solve, seed=args.seed,
+    )
+    print(f"🧪 Mock Scholar at http://{args.host}:{args.port}/scholar, OpenAI at http://{args.host}:{args.port}/v1")
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Offline pipeline benchmark: parsing, ranking, formatting and paper selection
+on recorded Scholar pages, with a fake OpenAI client (no network, no keys).
+
+    python -m benchmarks.pipeline run                     # all cases, pools of 10..10k
+    python -m benchmarks.pipeline run --sizes 10,100 --cases rank
+    python -m benchmarks.pipeline compare <base> [<head>] # exits 1 on regressions
+
+Pools larger than the fixtures are synthesized from the recorded papers
+(varied titles, citation counts and years, fixed seed), so every run sees
+the same data. Each run is saved to benchmarks/results/<commit>.json
+("-dirty" when the tree has uncommitted changes); compare takes two such
+files, or the commits they were recorded at.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FIXTURE_DIR = os.path.join(ROOT, "tests", "fixtures")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SIZES = (10, 100, 1000, 10000)
+QUERY = "bayesian regression"
+REGRESSION_RATIO = 1.25  # head slower than base by more than this is flagged
+
+VOCABULARY = (
+    "hierarchical", "sparse", "variational", "robust", "nonparametric", "online", "scalable",
+    "gaussian process", "mixture", "shrinkage", "prior", "inference", "survival", "spatial",
+    "time series", "logistic", "quantile", "model selection", "MCMC", "deep", "kernel",
+)
+
+
+# ── Offline data + fakes ──────────────────────────────────────────────────────
+def fixture_pages() -> list:
+    """Raw HTML of every recorded result page."""
+    paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, "scholar_*.html")))
+    return [open(p, encoding="utf-8").read() for p in paths]
+
+
+def fixture_papers() -> list:
+    """The papers recorded alongside the pages (expected parses)."""
+    papers = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "scholar_*.json"))):
+        with open(path, encoding="utf-8") as f:
+            papers.extend(json.load(f))
+    return papers
+
+
+def make_pool(size: int, seed: int = 0) -> list:
+    """A deterministic pool of size papers modelled on the recorded ones."""
+    base = fixture_papers()
+    rng = random.Random(seed)
+    pool = []
+    for i in range(size):
+        paper = dict(base[i % len(base)])
+        if i >= len(base):
+            paper["title"] = f"{paper['title']}: {' '.join(rng.sample(VOCABULARY, 2))} ({i})"
+            paper["snippet"] = f"{paper.get('snippet') or ''} {rng.choice(VOCABULARY)}"
+            paper["citations"] = rng.choice([None, 0, rng.randint(1, 5000)])
+            paper["year"] = rng.choice([None, rng.randint(1990, 2025)])
+            if rng.random() < 0.5:
+                paper["pdf_link"] = None
+        pool.append(paper)
+    return pool
+
+
+def fake_completion(prompt: str) -> str:
+    """
+    Deterministic answer to one of our prompts: rerank prompts get their
+    candidates back in reverse order, summary prompts one line per numbered
+    paper, anything else a short fixed answer.
+    """
+    if "array of indices" in prompt:
+        candidates = re.findall(r"^\[(\d+)\]", prompt, flags=re.M)
+        return str([int(c) for c in reversed(candidates)])
+    titles = re.findall(r"^\[(\d+)\] Title: (.*)$", prompt, flags=re.M)
+    if titles:
+        return "\n".join(f"[{i}] A study of {title.strip()}." for i, title in titles)
+    return "OK."
+
+
+class FakeOpenAI:
+    """
+    Stand-in for the OpenAI client: chat answers come from fake_completion,
+    embeddings are hashed features (see LocalEmbeddings).
+    """
+
+    def __init__(self, dim: int = 256):
+        from app.embeddings import LocalEmbeddings
+
+        self._embedder = LocalEmbeddings(dim)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    def _chat(self, model, messages, **params):
+        prompt = messages[-1]["content"]
+        content = fake_completion(prompt)
+        usage = SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=len(content) // 4)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+    def _embed(self, model, input):
+        vectors = self._embedder.embed(list(input), model)
+        data = [SimpleNamespace(index=i, embedding=v.tolist()) for i, v in enumerate(vectors)]
+        usage = SimpleNamespace(prompt_tokens=sum(len(t) for t in input) // 4, completion_tokens=0)
+        return SimpleNamespace(data=data, usage=usage)
+
+
+@contextlib.contextmanager
+def offline():
+    """Fake client in, every cache and the trace log off; restored afterwards."""
+    from app import config
+    from app.clients import set_openai_client
+
+    overrides = {
+        "LLM_CACHE_MODE": "off",
+        "EMBEDDING_CACHE_ENABLED": False,
+        "LOCAL_INDEX_ENABLED": False,
+        "SUMMARY_CACHE_ENABLED": False,
+        "TRACE_LOG": "",
+    }
+    saved = {name: getattr(config, name) for name in overrides}
+    client = FakeOpenAI()
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    set_openai_client(client)
+    try:
+        yield client
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+        set_openai_client(None)
+
+
+# ── Cases ─────────────────────────────────────────────────────────────────────
+def _setup_parse(backend):
+    def setup(size, client):
+        from app.parsing import parse_results_page
+
+        pages = fixture_pages()
+        per_page = max(1, len(fixture_papers()) // len(pages))
+        batch = [pages[i % len(pages)] for i in range(max(1, -(-size // per_page)))]
+        return lambda: [parse_results_page(html, backend=backend) for html in batch]
+    return setup
+
+
+def _setup_heuristic(size, client):
+    from app.scholar import rank_papers
+
+    pool = make_pool(size)
+    return lambda: rank_papers(QUERY, pool, max_results=20)
+
+
+def _setup_smart(size, client):
+    from app.embeddings import OpenAIEmbeddings
+    from app.scholar import smart_rank_papers
+
+    pool = make_pool(size)
+    backend = OpenAIEmbeddings(client=client)
+    return lambda: smart_rank_papers(QUERY, pool, max_results=20, embedding_backend=backend)
+
+
+def _setup_bayesian(size, client):
+    from app.scholar import bayesian_rank_papers
+
+    pool = make_pool(size)
+    return lambda: bayesian_rank_papers(QUERY, pool, max_results=20)
+
+
+def _setup_format(size, client):
+    from app.models import format_results_for_llm
+
+    pool = make_pool(size)
+    return lambda: format_results_for_llm(pool)
+
+
+def _setup_select(size, client):
+    import llm_wrapper
+
+    pool = make_pool(size)
+    return lambda: llm_wrapper.llm_select_papers(QUERY, pool_size=size, pool=pool)
+
+
+# name -> setup(size, client) returning the callable to time
+CASES = {
+    "parse.lxml": _setup_parse("lxml"),
+    "parse.bs4": _setup_parse("bs4"),
+    "rank.heuristic": _setup_heuristic,
+    "rank.smart": _setup_smart,
+    "rank.bayesian": _setup_bayesian,
+    "format_results": _setup_format,
+    "select_papers": _setup_select,
+}
+
+
+# ── Running ───────────────────────────────────────────────────────────────────
+def measure(fn, min_runs: int = 3, min_seconds: float = 0.5, max_runs: int = 50) -> dict:
+    """Time fn repeatedly (at least min_runs, and until min_seconds have passed)."""
+    times = []
+    while len(times) < min_runs or (sum(times) < min_seconds and len(times) < max_runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"median": statistics.median(times), "min": min(times), "runs": len(times)}
+
+
+def run(sizes=SIZES, cases=None, min_runs: int = 3, verbose: bool = True) -> dict:
+    """Benchmark every case (or those starting with one of cases) at every size."""
+    selected = [name for name in CASES if not cases or any(name.startswith(c) for c in cases)]
+    results = {}
+    with offline() as client:
+        for name in selected:
+            for size in sizes:
+                fn = CASES[name](size, client)
+                with contextlib.redirect_stdout(io.StringIO()):  # keep DEBUG logging out of the timings
+                    fn()  # warm-up: imports, lazy singletons
+                    r = measure(fn, min_runs=min_runs)
+                results[f"{name}[{size}]"] = {"case": name, "size": size, **r}
+                if verbose:
+                    print(f"{name:16s} {size:>6d}  median {r['median'] * 1000:10.2f}ms  "
+                          f"min {r['min'] * 1000:10.2f}ms  ({r['runs']} runs)")
+    return results
+
+
+def _git(*args) -> str:
+    out = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True)
+    return out.stdout.strip() if out.returncode == 0 else ""
+
+
+def save(results: dict, directory: str = RESULTS_DIR) -> str:
+    """Write results under the current commit; returns the file path."""
+    commit = _git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{commit}{'-dirty' if dirty else ''}.json")
+    record = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+def load(ref: str, directory: str = RESULTS_DIR) -> dict:
+    """A saved run, by file path or by the commit (any ref) it was recorded at."""
+    if os.path.exists(ref):
+        path = ref
+    else:
+        commit = _git("rev-parse", "--short", ref) or ref
+        path = os.path.join(directory, f"{commit}.json")
+        if not os.path.exists(path):
+            path = os.path.join(directory, f"{commit}-dirty.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No benchmark results for {ref!r} (run `python -m benchmarks.pipeline run` there)")
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(base: dict, head: dict, threshold: float = REGRESSION_RATIO) -> list:
+    """Print head vs base median timings; returns the regressed entries."""
+    print(f"{'case':16s} {'size':>6s} {'base ms':>10s} {'head ms':>10s}  ratio")
+    regressions = []
+    for key, new in head["results"].items():
+        old = base["results"].get(key)
+        if old is None:
+            continue
+        ratio = new["median"] / old["median"] if old["median"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  ⚠️ slower"
+            regressions.append(key)
+        elif ratio < 1 / threshold:
+            flag = "  🚀 faster"
+        print(f"{new['case']:16s} {new['size']:>6d} {old['median'] * 1000:10.2f} "
+              f"{new['median'] * 1000:10.2f}  {ratio:5.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    sys.path.insert(0, ROOT)
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.pipeline", description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="benchmark and save the results for this commit")
+    p_run.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated pool sizes")
+    p_run.add_argument("--cases", default="", help="comma-separated case name prefixes (default: all)")
+    p_run.add_argument("--runs", type=int, default=3, help="minimum timed runs per case")
+    p_run.add_argument("--no-save", action="store_true")
+    p_cmp = sub.add_parser("compare", help="compare two saved runs")
+    p_cmp.add_argument("base", help="results file or commit")
+    p_cmp.add_argument("head", nargs="?", default="HEAD", help="results file or commit (default: HEAD)")
+    p_cmp.add_argument("--threshold", type=float, default=REGRESSION_RATIO)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        sizes = [int(s) for s in args.sizes.split(",") if s]
+        cases = [c for c in args.cases.split(",") if c]
+        results = run(sizes, cases, min_runs=args.runs)
+        if not args.no_save:
+            print(f"\n💾 Saved to {save(results)}")
+        return 0
+
+    regressions = compare(load(args.base), load(args.head), args.threshold)
+    for key in regressions:
+        print(f"❌ {key} regressed")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Cold-start benchmark: import time and resident memory per entry point.
+
+    python -m benchmarks.startup
+
+Each entry point is imported in a fresh interpreter (best of several runs)
+and checked against a time/memory budget. Heavy optional modules must not be
+imported at startup at all. Exits non-zero if anything is over budget.
+STARTUP_BUDGET_SCALE=2 loosens every budget, e.g. on slow CI machines.
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# entry point -> (statement run in the child, max seconds, max MB RSS)
+ENTRY_POINTS = {
+    "api": ("import app.main", 1.5, 120),
+    "llm_wrapper": ("import llm_wrapper", 1.0, 90),
+    "ui": ("import runpy; runpy.run_path('ui.py', run_name='__main__')", 2.5, 150),
+}
+
+# must only be imported once a ranking engine / backend is actually used
+LAZY_MODULES = ["numpy", "pymc", "playwright", "openai", "lxml", "bs4", "httpx"]
+
+_CHILD = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+exec(sys.argv[1])
+elapsed = time.perf_counter() - t0
+try:
+    # peak RSS of this image only; ru_maxrss on Linux keeps the forking parent's
+    with open("/proc/self/status") as f:
+        rss_mb = next(int(l.split()[1]) for l in f if l.startswith("VmHWM:")) / 1024
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+print(json.dumps({"seconds": elapsed, "rss_mb": rss_mb,
+                  "loaded": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+"""
+
+
+def measure(statement: str, runs: int = 3) -> dict:
+    """Best-of-runs import time, peak RSS and eagerly loaded heavy modules."""
+    env = dict(os.environ, STREAMLIT_LOG_LEVEL="error")
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD, statement, json.dumps(LAZY_MODULES)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(results, key=lambda r: r["seconds"])
+
+
+def check(runs: int = 3) -> list:
+    """Measure every entry point; returns a list of budget violations."""
+    scale = float(os.getenv("STARTUP_BUDGET_SCALE", "1"))
+    failures = []
+    for name, (statement, max_seconds, max_mb) in ENTRY_POINTS.items():
+        r = measure(statement, runs)
+        print(f"{name:12s} {r['seconds']:6.3f}s (budget {max_seconds * scale:.1f}s)  "
+              f"{r['rss_mb']:6.1f}MB (budget {max_mb * scale:.0f}MB)  eager: {r['loaded'] or '-'}")
+        if r["seconds"] > max_seconds * scale:
+            failures.append(f"{name}: import took {r['seconds']:.3f}s > {max_seconds * scale:.1f}s")
+        if r["rss_mb"] > max_mb * scale:
+            failures.append(f"{name}: RSS {r['rss_mb']:.1f}MB > {max_mb * scale:.0f}MB")
+        if r["loaded"]:
+            failures.append(f"{name}: imported {', '.join(r['loaded'])} at startup")
+    return failures
+
+
+if __name__ == "__main__":
+    problems = check()
+    for p in problems:
+        print(f"❌ {p}")
+    sys.exit(1 if problems else 0)
@@ -1,18 +1,28 @@
-import os
 import json
 import ast
 import time
 import re
-from typing import List, Dict, Optional
-from difflib import SequenceMatcher
-
-from app.scholar import search_scholar, rank_papers
-from openai import OpenAI
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Dict, Optional, Tuple
+
+from app import config
+from app.cache import get_summary_cache
+from app.captcha import get_captcha_broker
+from app.clients import get_openai_client
+from app.history import HistoryBuffer, clip_history
+from app.index import get_paper_index, paper_key
+from app.llm import LLMInvalidAnswer, gather, hedged_chat
+from app.pools import RankedPool, get_pool_store
+from app.scholar import iter_scholar, search_scholar
+from app.tracing import span, traced
 
 # ── OpenAI client ──────────────────────────────────────────────────────────────
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Built on first use (see app.clients) so importing this module stays cheap.
+def __getattr__(name):
+    if name == "client":
+        return get_openai_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 MODEL = "gpt-5-mini"  # single model everywhere
 
@@ -26,20 +36,42 @@ MODES = {
     "auto": None,  # let LLM decide
 }
 
+
+def _weights(mode: str) -> dict:
+    """Weights of a ranking mode; unknown modes (and an unresolved "auto") rank as balanced."""
+    return MODES.get(mode) or MODES["balanced"]
+
 # ── Helpers ────────────────────────────────────────────────────────────────────
-def _clip_history(history: List[Dict[str, str]], max_chars: int = 4000) -> str:
+def _compact_history(summary: str, turns: List[str]) -> str:
+    """Fold turns that no longer fit the history budget into the running summary."""
+    previous = f"Summary so far:\n{summary}\n\n" if summary else ""
+    return _chat(
+        "Condense this conversation between a user and a research assistant into a few "
+        "sentences, keeping the topics, papers and preferences that later questions may "
+        "refer back to. Reply with the summary only.\n\n"
+        f"{previous}Next turns:\n" + "\n".join(turns)
+    )
+
+
+def new_history() -> HistoryBuffer:
+    """An empty history buffer for one conversation, configured from app.config."""
+    return HistoryBuffer(
+        max_tokens=config.HISTORY_MAX_TOKENS,
+        summarize=_compact_history if config.HISTORY_COMPACT else None,
+        summary_tokens=config.HISTORY_SUMMARY_TOKENS,
+    )
+
+
+def _history_text(history, max_tokens: Optional[int] = None) -> str:
+    """
+    Prompt text of history (a HistoryBuffer or a list of messages), capped
+    at max_tokens (default HISTORY_MAX_TOKENS) and never cut mid-word.
+    """
     if not history:
         return ""
-    tail = history
-    chunks, running = [], 0
-    for m in tail:
-        piece = f"{m['role'].upper()}: {m['content']}\n"
-        running += len(piece)
-        chunks.append(piece)
-    text = "".join(chunks)
-    if len(text) > max_chars:
-        text = text[-max_chars:]
-    return text.strip()
+    if isinstance(history, HistoryBuffer):
+        return history.text(max_tokens)
+    return clip_history(history, max_tokens or config.HISTORY_MAX_TOKENS)
 
 
 def _safe_json(s: str, fallback: dict) -> dict:
@@ -49,7 +81,51 @@ def _safe_json(s: str, fallback: dict) -> dict:
         return fallback
 
 
+def _chat(prompt: str, validate: Optional[callable] = None) -> str:
+    """
+    One single-message chat completion, through the LLM response cache,
+    with a timeout and hedged retries (see app.llm.hedged_chat).
+    """
+    return hedged_chat([{"role": "user", "content": prompt}], model=MODEL, validate=validate)
+
+
+def _is_index_list(s: str) -> bool:
+    try:
+        return isinstance(ast.literal_eval(s.strip()), list)
+    except Exception:
+        return False
+
+
+def _scrape_pool(query: str, pool_size: int, sort_by: str, progress, session_id: Optional[str] = None) -> list:
+    """
+    Stream a pool from Scholar, reporting each paper and any captcha.
+    A captcha waits on the broker under session_id (the caller's session,
+    so its UI can offer to resume it), or under a fresh id.
+    """
+    pool = []
+    broker = get_captcha_broker()
+    session_id = session_id or broker.new_session()
+
+    def on_captcha(event):
+        if event["type"] == "captcha":
+            progress(f"🧩 Captcha — solve it in the browser window (session {session_id})", "captcha")
+        elif event["type"] == "resolved":
+            progress("▶️ Captcha cleared, scraping resumed", "scrape")
+
+    unsubscribe = broker.listen(on_captcha, session_id)
+    try:
+        for paper in iter_scholar(
+            query, pool_size=pool_size, sort_by=sort_by, wait_for_user=True, session_id=session_id
+        ):
+            pool.append(paper)
+            progress(f"📥 {len(pool)}/{pool_size} papers — {paper.get('title', 'No title')}", "scrape")
+    finally:
+        unsubscribe()
+    return pool
+
+
 # ── Core pipeline (broad search) ──────────────────────────────────────────────
+@traced("pipeline.select_papers")
 def llm_select_papers(
     query: str,
     pool_size: int = 100,
@@ -58,23 +134,39 @@ def llm_select_papers(
     sort_by: str = "relevance",
     mode: str = "balanced",
     history_text: str = "",
+    progress_fn: Optional[callable] = None,
+    pool: Optional[list] = None,
+    session_id: Optional[str] = None,
 ):
+    """
+    Scrape a pool, filter it heuristically, then let the LLM pick final_top_n.
+    progress_fn(message, stage) is called as papers arrive and stages change.
+    Pass pool to rank papers you already have (e.g. from the local index).
+    With a session_id the pool is kept (with its feature matrix) for the
+    session, and a later lookup of the same query re-scores it instead of
+    scraping again, e.g. after switching the ranking mode.
+    """
+    progress = progress_fn or (lambda message, stage=None: None)
     t0 = time.time()
-    pool = search_scholar(query, pool_size=pool_size, sort_by=sort_by, wait_for_user=True)
-    if not pool:
-        return []
-    weights = MODES.get(mode, MODES["balanced"])
-    filtered = rank_papers(
-        query,
-        pool,
-        max_results=min(filter_top_k, 30),
-        w_sim=weights["w_sim"],
-        w_cites=weights["w_cites"],
-        w_recency=weights["w_recency"],
-    )
+    ranked = get_pool_store().get(session_id) if session_id and pool is None else None
+    if ranked is not None and ranked.covers(query, sort_by, pool_size):
+        progress(f"⚡ Re-scoring the {len(ranked)} papers already scraped for this query", "rank")
+    else:
+        if pool is None:
+            with span("pipeline.scrape", pool_size=pool_size) as s:
+                pool = _scrape_pool(query, pool_size, sort_by, progress, session_id)
+                s.set(papers=len(pool))
+        if not pool:
+            return []
+        ranked = RankedPool(query, pool, sort_by=sort_by, pool_size=pool_size)
+        if session_id:
+            get_pool_store().put(session_id, ranked)
+    print(f"DEBUG: Pool of {len(ranked)} papers ready after {time.time() - t0:.2f}s")
+    progress(f"🏅 Ranking {len(ranked)} papers (mode={mode})...", "rank")
+    filtered = ranked.rank(_weights(mode), min(filter_top_k, 30))
     if not filtered:
         return []
-    rerank_candidates = filtered[: min(12, len(filtered))]
+    rerank_candidates = filtered[: min(12, len(filtered))].to_dicts()
     compact_list = "\n\n".join(
         f"[{i+1}] {p.get('title','No title')} — {p.get('authors_year','')}\n{p.get('snippet','')}"
         for i, p in enumerate(rerank_candidates)
@@ -92,17 +184,13 @@ Candidate papers:
 Select the {final_top_n} most relevant papers.
 Return ONLY a JSON array of indices (e.g., [2, 5, 1]).
 """
+    progress(f"🤖 Reranking {len(rerank_candidates)} candidates with the LLM...", "rerank")
     ranked_indices = None
-    for attempt in range(2):
-        try:
-            response = client.chat.completions.create(
-                model=MODEL,
-                messages=[{"role": "user", "content": rerank_prompt}],
-            )
-            ranked_indices = ast.literal_eval(response.choices[0].message.content.strip())
-            break
-        except Exception as e:
-            print(f"⚠️ LLM rerank failed attempt {attempt+1}: {e}")
+    try:
+        with span("pipeline.rerank", candidates=len(rerank_candidates)):
+            ranked_indices = ast.literal_eval(_chat(rerank_prompt, validate=_is_index_list).strip())
+    except Exception as e:
+        print(f"⚠️ LLM rerank failed: {e}")
     if not ranked_indices:
         ranked_indices = list(range(1, min(final_top_n, len(rerank_candidates)) + 1))
     return [
@@ -112,8 +200,20 @@ Return ONLY a JSON array of indices (e.g., [2, 5, 1]).
     ]
 
 
+def rescore(session_id: str, mode: str, top_k: int = 20) -> Optional[List[Dict]]:
+    """
+    The session's kept pool ranked under another mode, without scraping or
+    calling the LLM (milliseconds); None if the session has no pool.
+    """
+    ranked = get_pool_store().get(session_id)
+    if ranked is None:
+        return None
+    with span("pipeline.rescore", papers=len(ranked), mode=mode):
+        return ranked.rank(_weights(mode), top_k).to_dicts()
+
+
 # ── Batch summaries ───────────────────────────────────────────────────────────
-def summarize_papers(papers: List[Dict], history_text: str = "") -> List[str]:
+def _summary_prompt(papers: List[Dict], history_text: str = "") -> str:
     paper_contexts = []
     for i, p in enumerate(papers, 1):
         paper_contexts.append(
@@ -121,7 +221,7 @@ def summarize_papers(papers: List[Dict], history_text: str = "") -> List[str]:
             f"Authors/Year: {p.get('authors_year','Unknown')}\n"
             f"Snippet: {p.get('snippet','')}"
         )
-    prompt = f"""
+    return f"""
 You are an assistant that ONLY summarizes papers.
 
 Task: Summarize each of the following academic papers in 2–3 sentences.
@@ -139,21 +239,80 @@ Conversation context:
 Papers:
 {chr(10).join(paper_contexts)}
 """
-    response = client.chat.completions.create(
-        model=MODEL, messages=[{"role": "user", "content": prompt}]
-    )
-    text = response.choices[0].message.content.strip()
-    summaries = []
-    for i in range(1, len(papers) + 1):
-        marker = f"[{i}]"
-        if marker in text:
-            part = text.split(marker, 1)[1]
-            next_marker = f"[{i+1}]"
-            piece = part.split(next_marker)[0].strip() if next_marker in part else part.strip()
-            summaries.append(piece)
+
+
+def _split_summaries(text: str, n: int) -> List[Optional[str]]:
+    """Pull the [1]..[n] summaries out of one answer; None where a marker is missing."""
+    text = text.strip()
+    parts = re.split(r"\[(\d+)\]", text)
+    found = {}
+    for number, piece in zip(parts[1::2], parts[2::2]):
+        found.setdefault(int(number), piece.strip())
+    if n == 1 and not found and text:
+        return [text]  # a lone summary often comes back unnumbered
+    return [found.get(i) or None for i in range(1, n + 1)]
+
+
+def summarize_papers(papers: List[Dict], history_text: str = "") -> List[str]:
+    text = _chat(_summary_prompt(papers, history_text))
+    return [s if s is not None else "⚠️ Summary missing" for s in _split_summaries(text, len(papers))]
+
+
+def iter_summaries(
+    papers: List[Dict],
+    chunk_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (index, summary) for every paper as soon as it is ready: cached
+    summaries first, then one LLM call per chunk_size papers, run in parallel.
+    Summaries are cached by paper (title + year), so they are written without
+    the conversation context; a paper missing from a chunk's answer is
+    retried on its own.
+    """
+    cache = get_summary_cache()
+    keys = [f"{MODEL}|{paper_key(p)}" for p in papers]
+    todo = []
+    for i, key in enumerate(keys):
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            yield i, cached
         else:
-            summaries.append("⚠️ Summary missing")
-    return summaries
+            todo.append(i)
+    if not todo:
+        return
+
+    chunk_size = max(1, chunk_size or config.SUMMARY_CHUNK_SIZE)
+    chunks = [todo[k:k + chunk_size] for k in range(0, len(todo), chunk_size)]
+
+    def summarize(chunk: List[int]) -> List[Tuple[int, str]]:
+        try:
+            pieces = _split_summaries(_chat(_summary_prompt([papers[i] for i in chunk])), len(chunk))
+            if len(chunk) > 1:
+                pieces = [
+                    piece if piece is not None else _split_summaries(_chat(_summary_prompt([papers[i]])), 1)[0]
+                    for i, piece in zip(chunk, pieces)
+                ]
+        except Exception as e:
+            print(f"⚠️ Summary failed: {e}")
+            return [(i, "⚠️ Summary failed") for i in chunk]
+        done = []
+        for i, piece in zip(chunk, pieces):
+            if piece is None:
+                done.append((i, "⚠️ Summary missing"))
+                continue
+            if cache is not None:
+                cache.set(keys[i], piece)
+            done.append((i, piece))
+        return done
+
+    workers = max(1, min(concurrency or config.SUMMARY_CONCURRENCY, len(chunks)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summarize")
+    try:
+        for future in as_completed([executor.submit(summarize, chunk) for chunk in chunks]):
+            yield from future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 # ── Generalized Scholar lookup ────────────────────────────────────────────────
@@ -165,35 +324,64 @@ def scholar_lookup(
     final_top_n: int = 10,
     sort_by: str = "relevance",
     history_text: str = "",
+    progress_fn: Optional[callable] = None,
+    local_first: Optional[bool] = None,
+    ranking_mode: str = "balanced",
+    session_id: Optional[str] = None,
 ):
+    """
+    local_first: answer from the local paper index when it already holds
+    enough matches (filter_top_k for broad, a title verify_citations finds for direct),
+    and only scrape Scholar otherwise. Defaults to LOCAL_FIRST.
+    ranking_mode: a MODES entry weighting the heuristic filter (broad only).
+    session_id: keep/reuse the scraped pool per session (see llm_select_papers).
+    """
+    local_first = config.LOCAL_FIRST if local_first is None else local_first
+    # the index can't reproduce Scholar's newest-first ordering
+    local_first = local_first and sort_by == "relevance"
     if mode == "broad":
+        pool = _local_pool(query, pool_size, min_matches=filter_top_k) if local_first else None
         return llm_select_papers(
             query=query,
             pool_size=pool_size,
             filter_top_k=filter_top_k,
             final_top_n=final_top_n,
             sort_by=sort_by,
-            mode="balanced",
+            mode=ranking_mode,
             history_text=history_text,
+            progress_fn=progress_fn,
+            pool=pool,
+            session_id=session_id,
         )
     elif mode == "direct":
+        if local_first:
+            # same match rule as verify_report: the fuzzy title index of known papers
+            from app.verify import verify_citations
+
+            verdict = verify_citations([query], scrape=False)[0]
+            if verdict["status"] == "found":
+                print(f"⚡ Answering from the local index (match {verdict['score']:.2f})")
+                return [verdict["match"]]
         pool = search_scholar(query, pool_size=3, sort_by=sort_by, wait_for_user=False)
         return pool if pool else []
     return []
 
 
-# ── Router ────────────────────────────────────────────────────────────────────
-def chat_query(user_message: str, mode: str = "balanced", history: Optional[List[Dict[str, str]]] = None):
-    history = history or []
-    history_text = _clip_history(history)
+def _local_pool(query: str, pool_size: int, min_matches: int) -> Optional[list]:
+    """Matches from the local index, or None if it doesn't hold min_matches of them."""
+    index = get_paper_index()
+    if index is None:
+        return None
+    matches = index.search(query, limit=pool_size)
+    if len(matches) < min_matches:
+        print(f"DEBUG: Local index has {len(matches)}/{min_matches} matches, scraping instead")
+        return None
+    print(f"⚡ Answering from the local index ({len(matches)} matches)")
+    return matches
 
-    # 🔹 Extract "N papers" or "top N" from user request
-    match = re.search(r"\b(?:top\s*)?(\d+)\s+(?:papers|articles|studies)\b", user_message.lower())
-    requested_n = int(match.group(1)) if match else 10
 
-    # 🔹 Resolve auto mode via LLM
-    if mode == "auto":
-        mode_prompt = """
+# ── Router ────────────────────────────────────────────────────────────────────
+MODE_PROMPT = """
 You are deciding the best Scholar ranking mode based on the user query.
 
 Available modes (weights = similarity, citations, recency):
@@ -205,20 +393,25 @@ Available modes (weights = similarity, citations, recency):
 
 Pick ONE mode name (just the word).
 """
-        resp = client.chat.completions.create(
-            model=MODEL,
-            messages=[{"role": "user", "content": mode_prompt + "\n\nUser query:\n" + user_message}],
-        )
-        picked = resp.choices[0].message.content.strip().lower()
-        if picked in MODES and picked != "auto":
-            mode = picked
-        else:
-            mode = "balanced"
+
+
+@traced("pipeline.chat_query")
+def chat_query(user_message: str, mode: str = "balanced", history=None):
+    """
+    Route one user message: a direct answer, or a Scholar lookup to confirm.
+    history is the conversation so far, a HistoryBuffer or a list of messages.
+    """
+    history_text = _history_text(history)
+
+    # 🔹 Extract "N papers" or "top N" from user request
+    match = re.search(r"\b(?:top\s*)?(\d+)\s+(?:papers|articles|studies)\b", user_message.lower())
+    requested_n = int(match.group(1)) if match else 10
 
     router_prompt = f"""
 You are a scholarly research assistant.
 
 If the user asks for papers, citations, references, or to check a specific title:
+  (to check titles or a pasted reference list use mode "direct" and put each citation on its own line in "query")
   Output JSON:
   {{
     "action": "scholar_lookup",
@@ -242,9 +435,25 @@ Conversation history:
 User message:
 {user_message}
 """
-    raw = client.chat.completions.create(
-        model=MODEL, messages=[{"role": "user", "content": router_prompt}]
-    ).choices[0].message.content
+    def route_call():
+        try:
+            return _chat(router_prompt, validate=lambda s: "action" in _safe_json(s, fallback={}))
+        except LLMInvalidAnswer:
+            return ""
+
+    # 🔹 Resolve auto mode via LLM, alongside the router call (neither needs the other)
+    if mode == "auto":
+        picked, raw = gather(
+            lambda: _chat(MODE_PROMPT + "\n\nUser query:\n" + user_message),
+            route_call,
+        )
+        picked = picked.strip().lower()
+        if picked in MODES and picked != "auto":
+            mode = picked
+        else:
+            mode = "balanced"
+    else:
+        raw = route_call()
     route = _safe_json(raw, fallback={"action": "answer", "reply": "⚠️ Couldn't decide."})
 
     if route.get("action") == "answer":
@@ -259,15 +468,38 @@ User message:
 
 
 # ── Run Scholar lookup ────────────────────────────────────────────────────────
-def run_scholar_lookup(route: dict, history: Optional[List[Dict[str, str]]] = None, log_fn: Optional[callable] = None):
-    history = history or []
-    history_text = _clip_history(history)
+def _paper_block(p: Dict, summary: str) -> str:
+    return (
+        f"## 📄 {p.get('title','No title')}\n\n"
+        f"**👥 Authors/Year:** {p.get('authors_year','Unknown')}\n\n"
+        f"**🔗 Link:** {p.get('link') or p.get('scholar_link') or 'N/A'}\n\n"
+        f"**📑 Citations:** {p.get('citations','N/A')}\n\n"
+        f"**📝 Summary:**\n{summary}\n"
+    )
 
-    def log(msg: str):
-        if log_fn: log_fn(msg)
+
+@traced("pipeline.lookup")
+def lookup_pipeline(
+    route: dict,
+    history=None,
+    progress_fn: Optional[callable] = None,
+) -> str:
+    """
+    The full lookup (scrape → rank → LLM rerank → summarize) as Markdown.
+    progress_fn(message, stage) receives per-stage progress; a job's
+    report method fits directly.
+    """
+    # the rerank and summary prompts only need the gist of the latest turns
+    history_text = _history_text(history, config.HISTORY_LOOKUP_TOKENS)
+
+    def log(msg: str, stage: Optional[str] = None, **data):
+        if progress_fn: progress_fn(msg, stage, **data)
         else: print(msg)
 
-    log("⏳ Running Scholar lookup pipeline...")
+    if route.get("mode") == "direct":
+        return verify_report(route.get("query", ""), progress_fn=log)
+
+    log("⏳ Running Scholar lookup pipeline...", "scrape")
     papers = scholar_lookup(
         query=route.get("query", ""),
         mode=route.get("mode", "broad"),
@@ -276,30 +508,102 @@ def run_scholar_lookup(route: dict, history: Optional[List[Dict[str, str]]] = No
         final_top_n=int(route.get("final_top_n", 10)),
         sort_by=route.get("sort_by", "relevance"),
         history_text=history_text,
+        progress_fn=log,
+        local_first=route.get("local_first"),
+        ranking_mode=route.get("ranking_mode", "balanced"),
+        session_id=route.get("session_id"),
     )
     if not papers:
         return "⚠️ No papers could be retrieved."
 
-    if route.get("mode") == "direct":
-        best = papers[0]
-        sim = SequenceMatcher(None, route.get("query","").lower(), best.get("title","").lower()).ratio()
-        if sim > 0.85:
-            return f"## 📄 {best.get('title')}\n**Status:** ✅ Found\n**👥 Authors/Year:** {best.get('authors_year','Unknown')}\n**📑 Citations:** {best.get('citations','N/A')}\n**🔗 Link:** {best.get('link') or best.get('scholar_link') or 'N/A'}"
+    log("⏳ Starting summarization...", "summarize")
+    with span("pipeline.summarize", papers=len(papers), mode=config.SUMMARY_MODE):
+        if config.SUMMARY_MODE == "batch":
+            summaries = summarize_papers(papers, history_text=history_text)
+            blocks = [_paper_block(p, summary) for p, summary in zip(papers, summaries)]
         else:
-            return f"## 📄 {route.get('query')}\n**Status:** ❌ Not found in Google Scholar — probably fake."
-
-    log("⏳ Starting summarization...")
-    summaries = summarize_papers(papers, history_text=history_text)
-    blocks = []
-    for p, summary in zip(papers, summaries):
-        block = (
-            f"## 📄 {p.get('title','No title')}\n\n"
-            f"**👥 Authors/Year:** {p.get('authors_year','Unknown')}\n\n"
-            f"**🔗 Link:** {p.get('link') or p.get('scholar_link') or 'N/A'}\n\n"
-            f"**📑 Citations:** {p.get('citations','N/A')}\n\n"
-            f"**📝 Summary:**\n{summary}\n"
-        )
-        blocks.append(block)
+            # stream: each paper's block is reported (stage "summary") as it lands
+            blocks = [None] * len(papers)
+            for done, (i, summary) in enumerate(iter_summaries(papers), 1):
+                blocks[i] = _paper_block(papers[i], summary)
+                log(f"📝 {done}/{len(papers)} summarized — {papers[i].get('title', 'No title')}",
+                    "summary", index=i, block=blocks[i])
 
     ranking_mode = route.get("ranking_mode", "balanced")
     return f"Here are {len(papers)} papers for **{route.get('query')}** (mode={ranking_mode}):\n\n" + "\n\n---\n\n".join(blocks)
+
+
+def verify_report(text: str, progress_fn: Optional[callable] = None) -> str:
+    """Verify every citation in text (one per line) and report each as Markdown."""
+    from app.verify import split_citations, verify_citations
+
+    citations = split_citations(text) or [text]
+    verdicts = verify_citations(citations, progress_fn=progress_fn)
+    blocks = []
+    for v in verdicts:
+        best = v["match"] or {}
+        if v["status"] == "found":
+            blocks.append(f"## 📄 {best.get('title')}\n**Status:** ✅ Found (match {v['score']:.2f})\n**👥 Authors/Year:** {best.get('authors_year','Unknown')}\n**📑 Citations:** {best.get('citations','N/A')}\n**🔗 Link:** {best.get('link') or best.get('scholar_link') or 'N/A'}")
+        elif v["status"] == "error":
+            blocks.append(f"## 📄 {v['title']}\n**Status:** ⚠️ Could not check Google Scholar ({v.get('error')})")
+        else:
+            blocks.append(f"## 📄 {v['title']}\n**Status:** ❌ Not found in Google Scholar — probably fake (best match {v['score']:.2f})")
+    if len(verdicts) == 1:
+        return blocks[0]
+    found = sum(v["status"] == "found" for v in verdicts)
+    return f"**{found}/{len(verdicts)} citations found.**\n\n" + "\n\n---\n\n".join(blocks)
+
+
+LOOKUP_KEY_FIELDS = ("mode", "pool_size", "filter_top_k", "final_top_n", "sort_by", "ranking_mode", "local_first")
+
+
+def lookup_key(route: dict, history=None) -> str:
+    """
+    Identity of a lookup's result: the normalized query, the route options
+    that shape it and a digest of the conversation its prompts see.
+    """
+    import hashlib
+
+    from app.cache import normalize_query
+
+    options = {k: route.get(k) for k in LOOKUP_KEY_FIELDS}
+    context = hashlib.sha1(_history_text(history, config.HISTORY_LOOKUP_TOKENS).encode()).hexdigest()
+    return json.dumps([normalize_query(route.get("query", "")), options, context], sort_keys=True)
+
+
+def submit_lookup(route: dict, history=None, priority: int = 0):
+    """Queue a lookup on the background job queue and return the Job."""
+    from app.jobs import get_job_queue
+
+    # a snapshot: the conversation goes on while the job waits
+    history = history.copy() if isinstance(history, HistoryBuffer) else list(history or [])
+    return get_job_queue().submit(
+        lambda job: lookup_pipeline(route, history, progress_fn=job.report),
+        kind="scholar_lookup",
+        priority=priority,
+        params={"route": route},
+    )
+
+
+def run_scholar_lookup(
+    route: dict,
+    history=None,
+    log_fn: Optional[callable] = None,
+    priority: int = 0,
+    summary_fn: Optional[callable] = None,
+):
+    """
+    Run a lookup on the job queue and wait for it, forwarding progress
+    messages to log_fn(msg) from the calling thread, and each paper's
+    Markdown block to summary_fn(index, block) as soon as it is summarized.
+    """
+    def log(msg: str):
+        if log_fn: log_fn(msg)
+        else: print(msg)
+
+    job = submit_lookup(route, history, priority=priority)
+    for event in job.follow():
+        log(event["message"])
+        if summary_fn and "block" in event:
+            summary_fn(event["index"], event["block"])
+    return job.get_result()
@@ -0,0 +1,29 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app import main
+from benchmarks.pipeline import make_pool
+
+POOL = make_pool(25)
+
+
+def test_search_stream_is_ndjson_in_order_and_truncated(monkeypatch):
+    stopped = []
+
+    def fake_iter_scholar(query, pool_size, sort_by):
+        try:
+            yield from POOL  # more than asked for, like a full last page
+        finally:
+            stopped.append(True)
+
+    monkeypatch.setattr(main, "iter_scholar", fake_iter_scholar)
+    response = TestClient(main.app).get("/search/stream", params={"query": "bayesian regression", "max_results": 12})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    papers, summary = lines[:-1], lines[-1]
+    assert [p["title"] for p in papers] == [p["title"] for p in POOL[:12]]
+    assert summary == {"done": True, "count": 12}
+    assert stopped  # the scrape was stopped once max_results were sent
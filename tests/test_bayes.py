@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from app.bayes import BayesianLinearRanker
+
+
+def make_features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 1, size=(n, 3))
+
+
+def test_known_sigma_matches_textbook_posterior():
+    X = make_features(50)
+    y = X @ np.array([1.0, -0.5, 0.25]) + 0.1
+    ranker = BayesianLinearRanker(sigma=0.5).update(X, y)
+
+    prior_precision = np.diag(1 / np.array([0.3, 0.3, 0.3]) ** 2)
+    precision = prior_precision + X.T @ X / 0.25
+    expected = np.linalg.solve(precision, prior_precision @ [0.8, 0.5, 0.5] + X.T @ y / 0.25)
+    assert np.allclose(ranker.weights, expected)
+
+
+def test_incremental_updates_match_batch_fit():
+    X = make_features(40, seed=1)
+    batch = BayesianLinearRanker().update(X)
+    incremental = BayesianLinearRanker().update(X[:25]).update(X[25:])
+    assert np.allclose(batch.weights, incremental.weights)
+
+
+def test_feedback_shifts_weights():
+    X = make_features(30, seed=2)
+    ranker = BayesianLinearRanker().update(X)
+    before = ranker.weights.copy()
+    # users keep marking high-recency papers as irrelevant
+    ranker.update(np.array([[0.1, 0.0, 1.0]] * 10), np.zeros(10))
+    assert ranker.weights[2] < before[2]
+
+
+def test_no_data_returns_prior_mean():
+    assert np.allclose(BayesianLinearRanker().weights, [0.8, 0.5, 0.5])
+
+
+def test_ranking_leaves_the_callers_ranker_alone():
+    from app.scholar import bayesian_rank_papers
+    from benchmarks.pipeline import make_pool
+
+    ranker = BayesianLinearRanker().update(make_features(5), np.zeros(5))
+    before = (ranker.n, ranker.weights.copy())
+    bayesian_rank_papers("bayesian regression", make_pool(30), max_results=5, ranker=ranker)
+    assert ranker.n == before[0] and np.allclose(ranker.weights, before[1])
+
+
+def test_analytic_weights_match_mcmc():
+    pytest.importorskip("pymc")
+    from app.bayes import pymc_posterior_mean
+
+    X = make_features(40, seed=3)
+    sampled = pymc_posterior_mean(X, draws=1000, tune=500, chains=2, cores=1)
+    assert np.allclose(BayesianLinearRanker().update(X).weights, sampled, atol=0.05)
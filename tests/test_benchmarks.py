@@ -0,0 +1,27 @@
+from benchmarks import pipeline
+
+
+def test_every_case_runs_offline():
+    results = pipeline.run(sizes=[10], min_runs=1, verbose=False)
+    assert set(results) == {f"{name}[10]" for name in pipeline.CASES}
+    assert all(r["median"] > 0 for r in results.values())
+
+
+def test_pool_is_deterministic():
+    pool = pipeline.make_pool(50)
+    assert len(pool) == 50
+    assert pool == pipeline.make_pool(50)
+    synthesized = pool[len(pipeline.fixture_papers()):]
+    assert len({p["title"] for p in synthesized}) == len(synthesized)
+
+
+def test_save_load_and_compare(tmp_path):
+    base = {"rank.heuristic[10]": {"case": "rank.heuristic", "size": 10, "median": 0.010, "min": 0.01, "runs": 3},
+            "select_papers[10]": {"case": "select_papers", "size": 10, "median": 0.010, "min": 0.01, "runs": 3}}
+    path = pipeline.save(base, directory=str(tmp_path))
+    loaded = pipeline.load(path)
+    assert loaded["results"] == base
+
+    head = {"results": {k: dict(v) for k, v in base.items()}}
+    head["results"]["select_papers[10]"]["median"] = 0.020
+    assert pipeline.compare(loaded, head) == ["select_papers[10]"]
@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import CancelledError, Future
+
+import pytest
+
+from app import browser
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.connected = False
+
+
+class FakePage:
+    def __init__(self, launch: int):
+        self.launch = launch
+
+    def is_closed(self):
+        return False
+
+
+class FakeSlot(browser.BrowserSlot):
+    """BrowserSlot with Playwright replaced by fakes; pages know their launch number."""
+
+    def _launch(self):
+        self.launches += 1
+        self._browser = FakeBrowser()
+        self._page = FakePage(self.launches)
+        self.pages_served = 0
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    monkeypatch.setattr(browser, "BrowserSlot", FakeSlot)
+    pools = []
+
+    def make(**kwargs):
+        pools.append(browser.BrowserPool(slow_mo=0, **kwargs))
+        return pools[-1]
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_recycles_the_browser_after_max_pages(make_pool):
+    pool = make_pool(size=1, max_pages=3)
+    launches = [pool.run(lambda page: page.launch) for _ in range(7)]
+    assert launches == [1, 1, 1, 2, 2, 2, 3]
+
+
+def test_relaunches_after_a_failed_page(make_pool):
+    pool = make_pool(size=1, max_pages=100)
+
+    def crash(page):
+        raise RuntimeError("target closed")
+
+    assert pool.run(lambda page: page.launch) == 1
+    with pytest.raises(RuntimeError, match="target closed"):
+        pool.run(crash)
+    assert pool.run(lambda page: page.launch) == 2
+    assert pool.stats()["free"] == 1
+
+
+def test_queued_calls_get_slots_in_order(make_pool):
+    pool = make_pool(size=1)
+    release = threading.Event()
+    order = []
+
+    busy = pool.submit(lambda page: release.wait(5))
+    queued = [pool.submit(lambda page, i=i: order.append(i)) for i in range(5)]
+    assert pool.stats()["waiting"] == 5 and not any(f.done() for f in queued)
+
+    release.set()
+    for future in [busy] + queued:
+        future.result(timeout=5)
+    assert order == [0, 1, 2, 3, 4]  # handed the freed slot first in, first out
+    assert pool.stats()["free"] == 1 and pool.stats()["waiting"] == 0
+
+
+def test_cancelled_slot_work_fails_the_call_and_frees_the_slot(make_pool):
+    pool = make_pool(size=1)
+    slot = pool._slots[0]
+    cancelled = Future()
+    cancelled.cancel()
+    slot.submit = lambda fn: cancelled  # e.g. the slot's executor was shut down
+
+    with pytest.raises(CancelledError):
+        pool.run(lambda page: None, timeout=5)
+    assert pool.stats()["free"] == 1
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app import cache as cache_module
+from app import config, scholar
+from app.cache import DiskCache
+from benchmarks.pipeline import fixture_pages
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time for DiskCache: advance it with clock.now += seconds."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def test_expired_entries_miss(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "c.sqlite3"), ttl=60)
+    cache.set("k", [1, 2])
+    clock.now += 59
+    assert cache.get("k") == [1, 2]
+    clock.now += 2
+    assert cache.get("k") is None
+    assert len(cache) == 0 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_read_entry_is_evicted_first(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "c.sqlite3"), max_entries=3)
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        cache.set(key, key)
+    clock.now += 1
+    assert cache.get("a") == "a"  # now b is the least recently used
+
+    clock.now += 1
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+
+
+def test_byte_cap_keeps_the_most_recently_read(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "c.sqlite3"), max_bytes=120)
+    for key in ("a", "b"):
+        clock.now += 1
+        cache.set(key, "x" * 50)  # 52 bytes of JSON each
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.set("c", "x" * 50)
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("c") is not None
+
+
+class CountingPool:
+    """Browser pool whose tab always shows the recorded page; records each URL visited."""
+
+    size = 1
+
+    def __init__(self):
+        self.urls = []
+
+    def run(self, fn):
+        page = SimpleNamespace(url="", wait_for_selector=lambda selector, timeout: None, content=lambda: fixture_pages()[0])
+
+        def goto(url):
+            self.urls.append(url)
+            page.url = url
+
+        page.goto = goto
+        return fn(page)
+
+    def starts(self):
+        return [parse_qs(urlparse(url).query)["start"][0] for url in self.urls]
+
+
+def test_bigger_pool_fetches_only_the_missing_pages(tmp_path, monkeypatch):
+    pages = DiskCache(str(tmp_path / "pages.sqlite3"), table="pages", ttl=3600)
+    pool = CountingPool()
+    monkeypatch.setattr(scholar, "get_page_cache", lambda: pages)
+    monkeypatch.setattr(scholar, "get_browser_pool", lambda: pool)
+    monkeypatch.setattr(scholar, "get_http_fetcher", lambda: None)
+    monkeypatch.setattr(scholar, "get_paper_index", lambda: None)
+    for name in ("PAGE_DELAY", "PAGE_JITTER"):
+        monkeypatch.setattr(config, name, 0)
+
+    assert len(scholar.search_scholar("bayesian regression", pool_size=20)) == 20
+    assert pool.starts() == ["0", "10"]
+
+    pool.urls.clear()
+    assert len(scholar.search_scholar("Bayesian  Regression", pool_size=30)) == 30
+    assert pool.starts() == ["20"]  # page index 2 only
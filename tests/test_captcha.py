@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.captcha import CaptchaBroker
+from app import scholar
+
+
+class StuckPage:
+    """Fake Playwright page that stays on a captcha until solved is set."""
+
+    def __init__(self):
+        self.solved = threading.Event()
+
+    def goto(self, url):
+        pass
+
+    def wait_for_selector(self, selector, timeout):
+        # time is compressed: every wait gives up after at most 20ms
+        if not self.solved.wait(min(timeout, 20) / 1000 if timeout else None):
+            raise TimeoutError(selector)
+
+    def is_closed(self):
+        return False
+
+    def content(self):
+        return "<html></html>"
+
+
+def test_sessions_are_independent(monkeypatch):
+    broker = CaptchaBroker()
+    monkeypatch.setattr(scholar, "get_captcha_broker", lambda: broker)
+    monkeypatch.setattr(scholar, "CAPTCHA_CHECK_MS", 20)
+    events, unsubscribe = broker.subscribe()
+
+    pages = {"a": StuckPage(), "b": StuckPage()}
+    threads = {
+        sid: threading.Thread(target=scholar._fetch_page, args=(page, f"url-{sid}", True, sid))
+        for sid, page in pages.items()
+    }
+    for t in threads.values():
+        t.start()
+
+    deadline = time.time() + 5
+    while len(broker.pending()) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert {p["session"] for p in broker.pending()} == {"a", "b"}
+
+    assert broker.resume("a")
+    threads["a"].join(timeout=5)
+    assert not threads["a"].is_alive()
+    assert [p["session"] for p in broker.pending()] == ["b"]
+
+    pages["b"].solved.set()  # solved in the browser, no resume needed
+    threads["b"].join(timeout=5)
+    assert broker.pending() == []
+    assert not broker.resume("b")
+
+    unsubscribe()
+    seen = []
+    while not events.empty():
+        event = events.get()
+        seen.append((event["type"], event["session"]))
+    assert ("resume", "a") in seen and ("resolved", "a") in seen
+    assert ("captcha", "b") in seen and ("resolved", "b") in seen
+    assert ("resume", "b") not in seen
+
+
+def test_listener_filters_by_session():
+    broker = CaptchaBroker()
+    got = []
+    unsubscribe = broker.listen(lambda e: got.append(e["type"]), session_id="mine")
+    broker.register("other", "u")
+    broker.register("mine", "u")
+    broker.done("mine")
+    unsubscribe()
+    broker.done("mine")
+    assert got == ["captcha", "done"]
+
+
+def test_stopping_a_scrape_early_still_signals_done(monkeypatch):
+    broker = CaptchaBroker()
+    monkeypatch.setattr(scholar, "get_captcha_broker", lambda: broker)
+    pages = {i: [{"title": f"Paper {i}.{j}"} for j in range(scholar.PER_PAGE)] for i in range(3)}
+    monkeypatch.setattr(scholar, "_cached_pages", lambda query, pool_size, sort_by: (3, pages, []))
+    events, unsubscribe = broker.subscribe("s")
+
+    papers = scholar.iter_scholar("q", pool_size=30, session_id="s")
+    assert next(papers)["title"] == "Paper 0.0"
+    papers.close()  # e.g. /search/stream once it has max_results
+    unsubscribe()
+    assert events.get_nowait()["type"] == "done"
+
+
+def test_failed_async_scrape_stops_its_pages_and_signals_done(monkeypatch):
+    broker = CaptchaBroker()
+    monkeypatch.setattr(scholar, "get_captcha_broker", lambda: broker)
+    monkeypatch.setattr(scholar, "get_http_fetcher", lambda: None)
+    monkeypatch.setattr(scholar, "get_browser_pool", lambda: SimpleNamespace(size=3))
+    monkeypatch.setattr(scholar, "_cached_pages", lambda query, pool_size, sort_by: (3, {}, [0, 1, 2]))
+    for name in ("PAGE_DELAY", "PAGE_JITTER"):
+        monkeypatch.setattr(scholar.config, name, 0)
+    stored = []
+
+    def fetch(fetcher, url):
+        if "start=0" in url:
+            raise RuntimeError("browser crashed")
+        time.sleep(0.2)
+        return "<html></html>"
+
+    monkeypatch.setattr(scholar, "_http_fetch", fetch)
+    monkeypatch.setattr(scholar, "_store_page", lambda query, sort_by, i, html: stored.append(i) or [])
+    events, unsubscribe = broker.subscribe("s")
+
+    with pytest.raises(RuntimeError, match="browser crashed"):
+        asyncio.run(scholar.asearch_scholar("q", pool_size=30, concurrency=3, session_id="s"))
+    time.sleep(0.3)  # the other pages' fetches have returned by now
+    unsubscribe()
+    assert stored == []  # their loads were cancelled, nothing stored after the failure
+    assert events.get_nowait()["type"] == "done"
@@ -0,0 +1,44 @@
+import numpy as np
+
+from app import config, embeddings
+from app.embeddings import EmbeddingCache, LocalEmbeddings, embed_texts
+
+
+class CountingBackend(LocalEmbeddings):
+    name = "counting"
+
+    def __init__(self):
+        super().__init__(dim=32)
+        self.calls = []
+
+    def embed(self, texts, model):
+        self.calls.append(list(texts))
+        return super().embed(texts, model)
+
+
+def test_cache_round_trip_and_growth(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m")
+    texts = [f"paper {i}" for i in range(1500)]
+    vectors = LocalEmbeddings(dim=8).embed(texts, "m")
+    cache.store(texts[:10], vectors[:10])
+    cache.store(texts, vectors)  # forces the memmap to grow past 1024 rows
+
+    reopened = EmbeddingCache(str(tmp_path), "m")
+    found = reopened.lookup(["paper 3", "paper 1499", "unseen"])
+    assert np.allclose(found[0], vectors[3])
+    assert np.allclose(found[1], vectors[1499])
+    assert found[2] is None
+    assert len(reopened) == 1500
+
+
+def test_embed_texts_only_embeds_unseen_texts(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(embeddings, "_caches", {})
+    backend = CountingBackend()
+
+    first = embed_texts(["a b", "c d"], backend=backend)
+    second = embed_texts(["c d", "e f", "a b"], backend=backend)
+
+    assert backend.calls == [["a b", "c d"], ["e f"]]
+    assert np.allclose(second[0], first[1])
+    assert np.allclose(second[2], first[0])
@@ -0,0 +1,132 @@
+import threading
+
+import pytest
+
+from app.history import HistoryBuffer, clip_history, count_tokens
+
+import llm_wrapper
+
+
+def conversation(turns: int):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i} about bayesian hierarchical models " * 3}
+        for i in range(turns)
+    ]
+
+
+def test_token_estimate():
+    assert count_tokens("") == 0
+    assert count_tokens("Hello, world!") == 6  # "Hello" and "world" are 2 each
+    assert count_tokens("internationalization") == 5  # 20 characters, 4 per token
+
+
+def test_clip_keeps_the_newest_whole_turns_within_budget():
+    messages = conversation(200)
+    text = clip_history(messages, 100)
+    assert count_tokens(text) <= 100
+    assert text.endswith(messages[-1]["content"])
+    assert all(line.startswith(("USER: ", "ASSISTANT: ")) for line in text.splitlines())
+
+
+def test_oversized_message_keeps_its_end_and_whole_words():
+    text = clip_history([{"role": "user", "content": "alpha beta gamma " * 100 + "final words"}], 20)
+    assert count_tokens(text) <= 20
+    assert text.startswith("USER: … ") and text.endswith("final words")
+    assert text.split("… ")[1].split()[0] in ("alpha", "beta", "gamma", "final")
+
+
+def test_buffer_is_incremental_and_bounded():
+    messages = conversation(50)
+    history = HistoryBuffer(max_tokens=120)
+    for n in range(1, len(messages) + 1):
+        history.sync(messages[:n])
+        assert history.tokens <= 120
+        assert history.tokens == count_tokens(history.text())
+    assert history.text() == clip_history(messages, 120)
+    assert history.text(30).endswith(messages[-1]["content"][-20:])
+
+    history.sync([])  # a new conversation
+    assert history.text() == "" and len(history) == 0
+
+
+def test_old_turns_are_compacted_into_a_cached_summary():
+    calls = []
+
+    def summarize(summary, turns):
+        calls.append(len(turns))
+        return f"{summary} +{len(turns)} turns".strip()
+
+    messages = conversation(40)
+    history = HistoryBuffer(max_tokens=250, summarize=summarize, summary_tokens=80)
+    for n in range(1, len(messages) + 1):
+        history.sync(messages[:n])
+        text = history.text()
+        assert count_tokens(text) <= 250 + 10  # summary framing
+    assert history.summary and text.startswith("(Summary of the earlier conversation:")
+    assert sum(calls) + len(history) <= len(messages)
+    assert len(calls) < len(messages) - len(history)  # evicted turns are summarized in batches
+
+    n = len(calls)
+    history.text()
+    assert len(calls) == n  # nothing new evicted: the summary is reused
+
+
+def test_lookup_snapshot_is_independent():
+    history = HistoryBuffer(max_tokens=500).sync(conversation(3))
+    snapshot = history.copy()
+    history.sync(conversation(6))
+    assert len(snapshot) == 3 and len(history) == 6
+
+
+def test_prompt_history_is_capped(monkeypatch):
+    monkeypatch.setattr(llm_wrapper.config, "HISTORY_MAX_TOKENS", 200)
+    messages = conversation(1000)
+    assert count_tokens(llm_wrapper._history_text(messages)) <= 200
+    assert count_tokens(llm_wrapper._history_text(messages, 50)) <= 50
+    assert llm_wrapper._history_text(None) == ""
+
+
+def test_budgets_are_validated():
+    for kwargs in ({"max_tokens": 0}, {"max_tokens": 100, "summary_tokens": 100}, {"max_tokens": 100, "summary_tokens": 0}):
+        with pytest.raises(ValueError):
+            HistoryBuffer(summarize=lambda summary, turns: summary, **kwargs)
+    HistoryBuffer(max_tokens=100, summary_tokens=500)  # no summary, no summary budget
+
+    tiny = HistoryBuffer(max_tokens=1).sync(conversation(3))  # too small for even a role prefix
+    assert tiny.text() == "" and tiny.tokens == 0
+
+
+def test_summarizing_does_not_block_the_buffer():
+    started, release, batches = threading.Event(), threading.Event(), []
+
+    def slow_summarize(summary, turns):
+        batches.append(len(turns))
+        started.set()
+        release.wait(5)
+        return f"{summary} +{len(turns)}".strip()
+
+    messages = conversation(30)
+    history = HistoryBuffer(max_tokens=250, summarize=slow_summarize, summary_tokens=80).sync(messages[:12])
+    reader = threading.Thread(target=history.text)
+    reader.start()
+    assert started.wait(5)
+
+    history.sync(messages)  # evicts more turns while the summary is being made
+    snapshot = history.copy()
+    assert reader.is_alive()  # neither call waited for the summary
+    assert len(snapshot) == len(history)
+
+    release.set()
+    reader.join(5)
+    assert history.summary == f"+{batches[0]}"
+    history.text()
+    assert len(batches) == 2  # only the turns evicted meanwhile are folded next
+    assert sum(batches) + len(history) == len(messages)
+
+
+def test_smaller_budget_leaves_out_the_summary():
+    history = HistoryBuffer(max_tokens=250, summarize=lambda summary, turns: "earlier talk", summary_tokens=80)
+    history.sync(conversation(20))
+    assert history.text().startswith("(Summary of the earlier conversation: earlier talk)")
+    short = history.text(60)
+    assert "Summary" not in short and count_tokens(short) <= 60
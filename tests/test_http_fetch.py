@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app import config, scholar
+from app.http_fetch import Blocked, HttpFetcher, check_page
+from benchmarks.mock_server import CAPTCHA_PAGE
+from benchmarks.pipeline import fixture_pages
+
+RESULTS = fixture_pages()[0]
+CAPTCHA = CAPTCHA_PAGE.format(solve=2)
+
+
+def test_check_page():
+    check_page(200, "https://scholar.google.com/scholar?q=x", RESULTS)
+    check_page(200, "https://scholar.google.com/scholar?q=x", "<p>Your search did not match any articles.</p>")
+    for status, url, body in [
+        (200, "https://scholar.google.com/scholar?q=x", CAPTCHA),
+        (302, "https://www.google.com/sorry/index?continue=x", ""),
+        (429, "https://scholar.google.com/scholar?q=x", "Too many requests"),
+        (200, "https://scholar.google.com/scholar?q=x", "<html>consent</html>"),
+    ]:
+        with pytest.raises(Blocked):
+            check_page(status, url, body)
+
+
+class FakePage:
+    """Browser tab that always renders the recorded results."""
+
+    context = SimpleNamespace(cookies=lambda: [{"name": "GSP", "value": "solved", "domain": "scholar.google.com", "path": "/"}])
+
+    def goto(self, url):
+        self.url = url
+
+    def wait_for_selector(self, selector, timeout):
+        pass
+
+    def is_closed(self):
+        return False
+
+    def content(self):
+        return RESULTS
+
+
+class FakePool:
+    size = 1
+
+    def __init__(self):
+        self.calls = 0
+
+    def run(self, fn):
+        self.calls += 1
+        return fn(FakePage())
+
+
+def test_blocked_pages_fall_back_to_the_browser(monkeypatch):
+    served = []
+
+    def handler(request):
+        served.append(request)
+        start = int(request.url.params["start"])
+        return httpx.Response(200, text=CAPTCHA if start == 10 else RESULTS)
+
+    fetcher = HttpFetcher(cooldown=60, transport=httpx.MockTransport(handler))
+    pool = FakePool()
+    for name, value in [("PAGE_DELAY", 0), ("PAGE_JITTER", 0), ("FETCH_CONCURRENCY", 1)]:
+        monkeypatch.setattr(config, name, value)
+    monkeypatch.setattr(scholar, "get_http_fetcher", lambda: fetcher)
+    monkeypatch.setattr(scholar, "get_browser_pool", lambda: pool)
+    monkeypatch.setattr(scholar, "get_page_cache", lambda: None)
+    monkeypatch.setattr(scholar, "get_paper_index", lambda: None)
+
+    papers = scholar.search_scholar("bayesian regression", pool_size=30)
+    assert len(papers) == 30
+    # page 0 over HTTP; page 1 hit a captcha, so it and (cooling down) page 2 used the browser
+    assert len(served) == 2 and pool.calls == 2
+    assert not fetcher.available
+    assert fetcher.client.cookies.get("GSP") == "solved"
+
+
+class DictCache(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+def test_only_real_result_pages_are_cached(monkeypatch):
+    cache = DictCache()
+    monkeypatch.setattr(scholar, "get_page_cache", lambda: cache)
+    monkeypatch.setattr(scholar, "get_paper_index", lambda: None)
+
+    # a captcha resumed without solving it: skipped, and nothing cached
+    page = FakePage()
+    page.content = lambda: CAPTCHA
+    page.goto("https://scholar.google.com/scholar?q=x")
+    assert scholar._browser_fetch(page, page.url, True, "s") is None
+    assert scholar._store_page("x", "relevance", 0, None) == []
+    assert scholar._store_page("x", "relevance", 1, "<html>consent</html>") == []
+    assert cache == {}
+
+    # Scholar's own empty result page is a genuine answer
+    assert scholar._store_page("x", "relevance", 2, "<p>Your search did not match any articles.</p>") == []
+    assert list(cache.values()) == [[]]
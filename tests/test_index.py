@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import llm_wrapper
+from app import config, verify
+from app.clients import set_openai_client
+from app.index import PaperIndex, paper_key
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_pool():
+    pool = []
+    for name in ("scholar_bayesian_regression_p0.json", "scholar_bayesian_regression_p1.json"):
+        pool.extend(json.loads((FIXTURES / name).read_text()))
+    return pool
+
+
+def test_ingest_dedupes_and_refreshes():
+    index = PaperIndex(":memory:")
+    pool = load_pool()
+    assert index.add(pool) == len(pool)
+
+    again = dict(pool[0], title=pool[0]["title"].upper() + "!", citations=(pool[0]["citations"] or 0) + 5)
+    assert index.add([again]) == 0
+    assert len(index) == len(pool)
+    assert paper_key(again) == paper_key(pool[0])
+
+    hit = index.search(pool[0]["title"], title_only=True)[0]
+    assert hit["title"] == pool[0]["title"]
+    assert hit["citations"] == again["citations"]
+
+
+def test_search_requires_every_term():
+    index = PaperIndex(":memory:")
+    index.add(load_pool())
+    assert index.search("bayesian regression")
+    assert all("bayes" in (p["title"] + " " + (p["snippet"] or "")).lower() for p in index.search("bayesian"))
+    assert index.search("bayesian quantum chromodynamics") == []
+
+
+def test_local_first_skips_scraping(monkeypatch):
+    index = PaperIndex(":memory:")
+    index.add(load_pool())
+    monkeypatch.setattr(llm_wrapper, "get_paper_index", lambda: index)
+    monkeypatch.setattr(verify, "get_paper_index", lambda: index)
+    monkeypatch.setattr(verify, "_title_index", None)
+    monkeypatch.setattr(config, "LLM_CACHE_MODE", "off")
+
+    def no_scraping(*args, **kwargs):
+        raise AssertionError("should have answered from the local index")
+
+    monkeypatch.setattr(llm_wrapper, "iter_scholar", no_scraping)
+    monkeypatch.setattr(llm_wrapper, "search_scholar", no_scraping)
+    reply = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="[2, 1]"))])
+    set_openai_client(SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: reply))))
+    try:
+        papers = llm_wrapper.scholar_lookup("bayesian regression", filter_top_k=3, final_top_n=2, local_first=True)
+        assert len(papers) == 2
+
+        title = load_pool()[4]["title"]
+        found = llm_wrapper.scholar_lookup(title, mode="direct", local_first=True)
+        assert found[0]["title"] == title
+    finally:
+        set_openai_client(None)
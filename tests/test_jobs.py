@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from app.jobs import DONE, FAILED, JobQueue, JobQueueFull
+
+
+def test_priorities_and_progress():
+    jobs = JobQueue(workers=1)
+    gate = threading.Event()
+    order = []
+
+    blocker = jobs.submit(lambda job: gate.wait())
+    low = jobs.submit(lambda job: order.append("low"), priority=5)
+    high = jobs.submit(lambda job: order.append("high"), priority=-1)
+
+    def staged(job):
+        job.report("fetching", "scrape")
+        job.report("page 2")
+        job.report("ranking", "rank")
+        return 42
+
+    staged_job = jobs.submit(staged, priority=10)
+    gate.set()
+
+    assert staged_job.wait(timeout=5)
+    assert order == ["high", "low"]
+    assert staged_job.get_result() == 42
+    events = list(staged_job.follow())
+    assert [(e["stage"], e["message"]) for e in events] == [
+        ("scrape", "fetching"), ("scrape", "page 2"), ("rank", "ranking"),
+    ]
+    assert staged_job.to_dict(since=2)["events"][0]["message"] == "ranking"
+    assert blocker.status == low.status == high.status == DONE
+
+
+def test_failed_job_reraises():
+    jobs = JobQueue(workers=1)
+
+    def boom(job):
+        raise ValueError("captcha")
+
+    job = jobs.submit(boom)
+    assert job.wait(timeout=5)
+    assert job.status == FAILED
+    assert "captcha" in job.error
+    with pytest.raises(ValueError):
+        job.get_result()
+
+
+def test_queue_is_bounded():
+    jobs = JobQueue(workers=1, max_queued=1)
+    gate = threading.Event()
+    jobs.submit(lambda job: gate.wait())
+    started = threading.Event()
+    while jobs.stats().get("running") != 1:
+        started.wait(0.01)
+    jobs.submit(lambda job: None)
+    with pytest.raises(JobQueueFull):
+        jobs.submit(lambda job: None)
+    gate.set()
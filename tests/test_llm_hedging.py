@@ -0,0 +1,77 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_wrapper
+from app import config, llm
+from app.clients import set_openai_client
+
+
+class ScriptedClient:
+    """Fake OpenAI client: each call sleeps / fails / answers per script(prompt, call_no)."""
+
+    def __init__(self, script):
+        self.script = script
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages):
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        delay, content = self.script(messages[-1]["content"], n)
+        time.sleep(delay)
+        if isinstance(content, Exception):
+            raise content
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_MODE", "off")
+    yield
+    set_openai_client(None)
+
+
+def ask(**kwargs):
+    return llm.hedged_chat([{"role": "user", "content": "q"}], model="m", **kwargs)
+
+
+def test_slow_attempt_is_hedged():
+    client = ScriptedClient(lambda prompt, n: (1.0, "slow") if n == 1 else (0.05, "fast"))
+    set_openai_client(client)
+    t0 = time.time()
+    assert ask(hedge_after=0.1, attempts=2, timeout=5) == "fast"
+    assert time.time() - t0 < 0.5
+
+
+def test_failures_and_invalid_answers_are_retried():
+    client = ScriptedClient(lambda prompt, n: (0, RuntimeError("boom")) if n == 1 else (0, "ok"))
+    set_openai_client(client)
+    assert ask(hedge_after=10, attempts=2) == "ok"
+
+    set_openai_client(ScriptedClient(lambda prompt, n: (0, "nope")))
+    with pytest.raises(llm.LLMInvalidAnswer):
+        ask(attempts=2, validate=lambda s: s == "yes")
+
+
+def test_timeout():
+    set_openai_client(ScriptedClient(lambda prompt, n: (1.0, "late")))
+    with pytest.raises(TimeoutError):
+        ask(timeout=0.1, hedge_after=10, attempts=1)
+
+
+def test_auto_mode_costs_one_round_trip():
+    def script(prompt, n):
+        if "ranking mode" in prompt:
+            return 0.3, "recent"
+        return 0.3, '{"action": "scholar_lookup", "query": "q", "mode": "broad"}'
+
+    set_openai_client(ScriptedClient(script))
+    t0 = time.time()
+    reply, route = llm_wrapper.chat_query("recent papers on lasso", mode="auto")
+    assert time.time() - t0 < 0.55
+    assert route["ranking_mode"] == "recent"
@@ -0,0 +1,42 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from openai import OpenAI
+
+from app.parsing import parse_results_page
+from benchmarks.loadtest import percentile, run_level
+from benchmarks.mock_server import MockSettings, create_app
+
+
+def test_serves_recorded_pages_and_captchas():
+    http = TestClient(create_app(MockSettings(captcha_rate=1.0)))
+    url = "/scholar?hl=en&q=bayesian&start=10&scisbd=0"
+    first = http.get(url)
+    assert "gs_captcha" in first.text and parse_results_page(first.text) == []
+    again = http.get(url)  # the captcha page reloads into the results
+    assert len(parse_results_page(again.text)) > 0
+    assert http.get("/stats").json()["captchas"] == 1
+
+
+def test_speaks_the_openai_wire_format():
+    http = TestClient(create_app())
+    client = OpenAI(api_key="mock", base_url="http://testserver/v1", http_client=http)
+    prompt = "Candidates:\n[1] A\n[2] B\nReturn ONLY a JSON array of indices (e.g., [2, 5, 1])."
+    reply = client.chat.completions.create(model="m", messages=[{"role": "user", "content": prompt}])
+    assert reply.choices[0].message.content == "[2, 1]"
+    assert reply.usage.prompt_tokens > 0
+    vectors = client.embeddings.create(model="m", input=["a paper", "another paper"])
+    assert [d.index for d in vectors.data] == [0, 1] and len(vectors.data[0].embedding) == 256
+
+
+def test_load_levels_report_percentiles():
+    assert percentile([0.1 * i for i in range(1, 101)], 95) == 0.1 * 95
+
+    async def send(i):
+        await asyncio.sleep(0.01)
+        if i == 3:
+            raise RuntimeError("boom")
+
+    row = asyncio.run(run_level(send, concurrency=4, requests=12))
+    assert (row["ok"], row["errors"]) == (11, 1)
+    assert row["p50"] >= 0.01 and row["throughput"] > 0
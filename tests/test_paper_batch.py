@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from app import config, embeddings
+from app.models import Paper, PaperBatch
+from app.scholar import bayesian_rank_papers, rank_papers, smart_rank_papers
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_pool():
+    pool = []
+    for name in ("scholar_bayesian_regression_p0.json", "scholar_bayesian_regression_p1.json"):
+        pool.extend(json.loads((FIXTURES / name).read_text()))
+    pool[0] = {**pool[0], "citations": None, "year": None, "pdf_link": None}
+    return pool
+
+
+def test_round_trip_and_columns():
+    pool = load_pool()
+    batch = PaperBatch.from_dicts(pool)
+
+    assert len(batch) == len(pool)
+    assert batch.to_dicts() == [Paper(**p).model_dump() for p in pool]
+    assert batch.citations[0] == -1 and batch.year[0] == 0 and not batch.has_pdf[0]
+    assert batch.to_papers()[3] == Paper(**pool[3])
+
+    sub = batch[2:5]
+    assert isinstance(sub, PaperBatch)
+    assert [p["title"] for p in sub] == [p["title"] for p in pool[2:5]]
+    picked = batch.take([4, 1])
+    assert picked[0] == batch[4] and picked[1] == batch[1]
+    assert picked.citations.tolist() == [batch.citations[4], batch.citations[1]]
+
+
+def test_rankers_accept_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(embeddings, "_caches", {})
+    pool = load_pool()
+    batch = PaperBatch.from_dicts(pool)
+    query = "bayesian linear regression"
+
+    for ranker, kwargs in [
+        (rank_papers, {}),
+        (bayesian_rank_papers, {}),
+        (smart_rank_papers, {"embedding_backend": "local"}),
+    ]:
+        from_dicts = ranker(query, pool, max_results=7, **kwargs)
+        from_batch = ranker(query, batch, max_results=7, **kwargs)
+        assert isinstance(from_batch, PaperBatch)
+        assert [p["title"] for p in from_batch] == [p["title"] for p in from_dicts]
+
+    empty = rank_papers(query, batch.take(np.array([], dtype=np.int64)))
+    assert isinstance(empty, PaperBatch) and len(empty) == 0
@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+
+from app.parsing import BACKENDS, parse_results_page
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+PAGES = ["scholar_bayesian_regression_p0", "scholar_bayesian_regression_p1"]
+
+
+def load_page(name: str) -> str:
+    with open(os.path.join(FIXTURES, name + ".html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def load_expected(name: str) -> list:
+    with open(os.path.join(FIXTURES, name + ".json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("name", PAGES)
+def test_parse_matches_recorded_output(backend, name):
+    pytest.importorskip(backend)
+    papers = parse_results_page(load_page(name), backend=backend)
+    assert [p.model_dump() for p in papers] == load_expected(name)
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("document", ["", "  \n\t", "<!-- aborted -->"])
+def test_empty_documents_parse_to_nothing(backend, document):
+    pytest.importorskip(backend)
+    assert parse_results_page(document, backend=backend) == []
+
+
+def test_nested_entries_are_not_duplicated():
+    papers = parse_results_page(load_page(PAGES[0]))
+    titles = [p.title for p in papers if p.title != "No title"]
+    assert len(titles) == len(set(titles))
+    assert len(papers) == 10
+
+
+def test_fields():
+    papers = parse_results_page(load_page(PAGES[0]))
+    bart = next(p for p in papers if p.title.startswith("BART"))
+    assert bart.citations == 4871
+    assert bart.year == 2010
+    assert bart.pdf_link == "https://arxiv.org/pdf/0806.3286"
+
+    lasso = next(p for p in papers if p.title == "The Bayesian lasso")
+    assert lasso.citations == 3215  # narrow no-break space thousands separator
+
+    inla = next(p for p in papers if "INLA" in p.title)
+    assert inla.scholar_link.startswith("https://scholar.google.com/scholar?cluster=")
+
+    citation_only = [p for p in papers if p.title == "No title"]
+    assert citation_only and citation_only[0].link is None
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        parse_results_page("<html></html>", backend="regex")
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import llm_wrapper
+from app import config
+from app.clients import set_openai_client
+from app.pools import PoolStore, RankedPool
+from app.scholar import rank_papers, top_k
+from benchmarks.pipeline import FakeOpenAI, make_pool
+
+POOL = make_pool(300)
+
+
+def test_top_k_matches_a_stable_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 5, 200).astype(float)  # plenty of ties
+    for k in (1, 7, 50, 200, 500):
+        assert top_k(scores, k).tolist() == np.argsort(-scores, kind="stable")[:k].tolist()
+
+
+def test_rescoring_matches_a_full_ranking():
+    ranked = RankedPool("bayesian regression", POOL)
+    for mode, weights in llm_wrapper.MODES.items():
+        if weights is None:
+            continue
+        assert ranked.rank(weights, 20).to_dicts() == rank_papers("bayesian regression", POOL, 20, **weights)
+
+
+def test_store_evicts_least_recent():
+    store = PoolStore(max_sessions=2)
+    pools = {sid: RankedPool(sid, POOL[:5]) for sid in "abc"}
+    store.put("a", pools["a"])
+    store.put("b", pools["b"])
+    store.get("a")
+    store.put("c", pools["c"])
+    assert store.get("b") is None and store.get("a") is pools["a"]
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_MODE", "off")
+    monkeypatch.setattr(llm_wrapper, "get_pool_store", lambda store=PoolStore(): store)
+    scrapes = []
+
+    def fake_scrape(query, pool_size, sort_by, progress, session_id=None):
+        scrapes.append(query)
+        return POOL[:pool_size]
+
+    monkeypatch.setattr(llm_wrapper, "_scrape_pool", fake_scrape)
+    set_openai_client(FakeOpenAI())
+    yield scrapes
+    set_openai_client(None)
+
+
+def test_switching_modes_reuses_the_session_pool(offline):
+    route = {"query": "bayesian regression", "pool_size": 200, "final_top_n": 5, "session_id": "s1"}
+    recent = llm_wrapper.scholar_lookup(**{**route, "ranking_mode": "recent"})
+    famous = llm_wrapper.scholar_lookup(**{**route, "ranking_mode": "famous"})
+    assert offline == ["bayesian regression"]  # scraped once
+    assert [p["title"] for p in recent] != [p["title"] for p in famous]
+
+    calls = []
+    client = FakeOpenAI()
+    client.chat.completions.create = lambda **kwargs: calls.append("chat")
+    client.embeddings.create = lambda **kwargs: calls.append("embeddings")
+    set_openai_client(client)
+    top = llm_wrapper.rescore("s1", "hot", top_k=10)
+    assert calls == [] and len(offline) == 1  # rescored from the stored pool: no scrape, no LLM call
+    set_openai_client(FakeOpenAI())
+    assert top == rank_papers("bayesian regression", POOL[:200], 10, **llm_wrapper.MODES["hot"])
+
+    llm_wrapper.scholar_lookup(**{**route, "query": "gaussian processes"})
+    assert len(offline) == 2 and llm_wrapper.rescore("nobody", "hot") is None
@@ -0,0 +1,83 @@
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app import config, embeddings, scholar
+from app.models import PaperBatch
+from app.scholar import bayesian_rank_papers, rank_papers, smart_rank_papers
+from benchmarks.pipeline import make_pool
+
+POOL = make_pool(200)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    # smart ranking caches embeddings under CACHE_DIR
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(embeddings, "_caches", {})
+
+
+def test_rankers_return_top_k_of_the_pool():
+    titles = {p["title"] for p in POOL}
+    for rank in (rank_papers, bayesian_rank_papers):
+        ranked = rank("bayesian regression", POOL, max_results=15)
+        assert len(ranked) == 15
+        assert {p["title"] for p in ranked} <= titles
+    ranked = smart_rank_papers("bayesian regression", POOL, max_results=15, embedding_backend="local")
+    assert len(ranked) == 15
+
+
+def test_rankers_keep_batches_columnar():
+    batch = PaperBatch.from_dicts(POOL)
+    ranked = rank_papers("bayesian regression", batch, max_results=5)
+    assert isinstance(ranked, PaperBatch)
+    assert ranked.to_dicts() == rank_papers("bayesian regression", POOL, max_results=5)
+
+
+class ReverseOrderFetcher:
+    """
+    HTTP tier fetched in waves of `wave` pages that are all in flight at
+    once, each page answering only after the next one of its wave.
+    """
+
+    available = True
+
+    def __init__(self, wave: int):
+        self.wave = wave
+        self.everyone_in = threading.Barrier(wave)
+        self.done = {}
+        self.in_flight = self.max_in_flight = 0
+        self.finished = []
+        self._lock = threading.Lock()
+
+    def fetch(self, url):
+        page = int(parse_qs(urlparse(url).query)["start"][0]) // scholar.PER_PAGE
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            done = self.done.setdefault(page, threading.Event())
+            after = self.done.setdefault(page + 1, threading.Event())
+        self.everyone_in.wait(5)
+        if (page + 1) % self.wave:
+            after.wait(5)
+        with self._lock:
+            self.in_flight -= 1
+            self.finished.append(page)
+        done.set()
+        return str(page)
+
+
+def test_concurrent_pages_are_yielded_in_page_order(monkeypatch):
+    fetcher = ReverseOrderFetcher(wave=3)
+    for name, value in [("PAGE_DELAY", 0), ("PAGE_JITTER", 0), ("FETCH_CONCURRENCY", 3)]:
+        monkeypatch.setattr(config, name, value)
+    monkeypatch.setattr(scholar, "get_page_cache", lambda: None)
+    monkeypatch.setattr(scholar, "get_browser_pool", lambda: None)
+    monkeypatch.setattr(scholar, "get_http_fetcher", lambda: fetcher)
+    monkeypatch.setattr(scholar, "_store_page", lambda query, sort_by, i, html: [{"title": f"page {html}"}])
+
+    titles = [p["title"] for p in scholar.iter_scholar("q", pool_size=60)]
+    assert fetcher.finished == [2, 1, 0, 5, 4, 3]  # each wave back to front
+    assert titles == [f"page {i}" for i in range(6)]  # yet yielded front to back
+    assert fetcher.max_in_flight == 3  # never more than FETCH_CONCURRENCY at once
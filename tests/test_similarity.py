@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from app.similarity import LexicalIndex, lexical_similarity, tokenize
+
+
+TITLES = [
+    "The Bayesian lasso",
+    "Bayesian linear regression",
+    "BART: Bayesian additive regression trees",
+    "Deep residual learning for image recognition",
+]
+
+
+def test_tokenize():
+    assert tokenize("BART: Bayesian additive-regression") == ["bart", "bayesian", "additive", "regression"]
+    assert tokenize(None) == []
+
+
+def test_tfidf_exact_title_scores_one():
+    sims = lexical_similarity("the bayesian LASSO", TITLES, scheme="tfidf")
+    assert sims[0] == pytest.approx(1.0)
+    assert sims[3] == 0.0
+    assert np.all((sims >= 0) & (sims <= 1))
+
+
+def test_tfidf_unseen_query_terms_lower_the_score():
+    full = lexical_similarity("bayesian linear regression", TITLES, scheme="tfidf")[1]
+    extra = lexical_similarity("bayesian linear regression with horseshoe priors", TITLES, scheme="tfidf")[1]
+    assert extra < full
+
+
+@pytest.mark.parametrize("scheme", ["tfidf", "bm25"])
+def test_index_scores_many_queries(scheme):
+    index = LexicalIndex(TITLES, scheme=scheme)
+    assert index.score("bayesian regression").argmax() in (1, 2)
+    assert index.score("image recognition").argmax() == 3
+    assert not index.score("").any()
+
+
+def test_empty_pool():
+    assert lexical_similarity("anything", []).shape == (0,)
+    assert lexical_similarity("anything", ["", None]).tolist() == [0.0, 0.0]
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    runs = []
+
+    async def scrape(tag):
+        runs.append(tag)
+        await asyncio.sleep(0.01)
+        return [tag]
+
+    async def main():
+        return await asyncio.gather(
+            *[flight.do("a", lambda: scrape("a")) for _ in range(5)],
+            flight.do("b", lambda: scrape("b")),
+        )
+
+    results = asyncio.run(main())
+    assert results == [["a"]] * 5 + [["b"]]
+    assert runs == ["a", "b"]
+    assert flight.stats() == {"calls": 2, "shared": 4, "in_flight": 0}
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    flight = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("captcha")
+
+    async def main():
+        results = await asyncio.gather(*[flight.do("k", failing) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await flight.do("k", failing)
+
+    asyncio.run(main())
+    assert len(attempts) == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
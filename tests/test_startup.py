@@ -0,0 +1,5 @@
+from benchmarks.startup import check
+
+
+def test_entry_points_within_startup_budget():
+    assert check(runs=2) == []
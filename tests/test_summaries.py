@@ -0,0 +1,68 @@
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_wrapper
+from app import cache, config
+from app.clients import set_openai_client
+
+
+class SummaryClient:
+    """Fake client summarizing each numbered paper; the slow title finishes last."""
+
+    def __init__(self, slow_title=None, drop_second=False):
+        self.prompts = []
+        self.slow_title = slow_title
+        self.drop_second = drop_second
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages):
+        prompt = messages[-1]["content"]
+        with self._lock:
+            self.prompts.append(prompt)
+        titles = re.findall(r"\[\d+\] Title: (.*)", prompt)
+        if self.slow_title in titles:
+            time.sleep(0.3)
+        parts = [f"[{i}] Summary of {t}." for i, t in enumerate(titles, 1)]
+        if self.drop_second and len(parts) > 1:
+            del parts[1]
+        content = "\n".join(parts)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+PAPERS = [{"title": f"Paper {i}", "year": 2000 + i, "authors_year": "", "snippet": ""} for i in range(4)]
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_MODE", "off")
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cache, "_summary_cache", None)
+    yield
+    set_openai_client(None)
+
+
+def test_streams_in_completion_order_and_caches():
+    client = SummaryClient(slow_title="Paper 0")
+    set_openai_client(client)
+
+    got = list(llm_wrapper.iter_summaries(PAPERS, chunk_size=1, concurrency=4))
+    assert got[-1] == (0, "Summary of Paper 0.")
+    assert sorted(got) == [(i, f"Summary of Paper {i}.") for i in range(4)]
+    assert len(client.prompts) == 4
+
+    again = list(llm_wrapper.iter_summaries(PAPERS + [{"title": "Paper 9", "year": 2009}], chunk_size=1))
+    assert len(again) == 5
+    assert len(client.prompts) == 5  # only the new paper was summarized
+
+
+def test_chunk_miss_is_retried_alone():
+    client = SummaryClient(drop_second=True)
+    set_openai_client(client)
+    got = dict(llm_wrapper.iter_summaries(PAPERS[:3], chunk_size=3))
+    assert got == {i: f"Summary of Paper {i}." for i in range(3)}
+    assert len(client.prompts) == 2
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from app import config
+from app.tracing import Registry, SPAN_ERRORS, SPAN_SECONDS, span, traced
+
+
+def test_render_prometheus_text():
+    registry = Registry()
+    hits = registry.counter("demo_hits_total", "Demo hits", ["cache"])
+    latency = registry.histogram("demo_seconds", "Demo latency", buckets=(0.1, 1))
+    hits.inc(cache="llm")
+    hits.inc(2, cache="llm")
+    latency.observe(0.5)
+
+    text = registry.render()
+    assert "# TYPE demo_hits_total counter" in text
+    assert 'demo_hits_total{cache="llm"} 3' in text
+    assert 'demo_seconds_bucket{le="0.1"} 0' in text
+    assert 'demo_seconds_bucket{le="1"} 1' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 1' in text
+    assert "demo_seconds_count 1" in text
+
+
+def test_spans_nest_and_log(tmp_path, monkeypatch):
+    log = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(config, "TRACE_LOG", str(log))
+    before = SPAN_SECONDS.count(span="test.outer")
+
+    @traced("test.inner")
+    def inner():
+        raise RuntimeError("boom")
+
+    with span("test.outer", query="q") as outer:
+        with pytest.raises(RuntimeError):
+            inner()
+
+    assert SPAN_SECONDS.count(span="test.outer") == before + 1
+    assert SPAN_ERRORS.value(span="test.inner") >= 1
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [r["name"] for r in records] == ["test.inner", "test.outer"]
+    assert records[0]["parent"] == outer.span_id
+    assert records[0]["trace"] == records[1]["trace"]
+    assert records[0]["error"] == "RuntimeError: boom"
+    assert records[1]["attrs"] == {"query": "q"}
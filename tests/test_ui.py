@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import llm_wrapper
+from app.captcha import get_captcha_broker
+from app.clients import set_openai_client
+from benchmarks.pipeline import FakeOpenAI
+
+UI = os.path.join(os.path.dirname(__file__), "..", "ui.py")
+ROUTE = {"action": "scholar_lookup", "query": "bayesian regression", "mode": "broad", "final_top_n": 1}
+
+
+def confirm_lookup(messages=()) -> AppTest:
+    """A session (with messages so far) that confirms the lookup."""
+    at = AppTest.from_file(UI, default_timeout=10)
+    at.session_state["pending_route"] = dict(ROUTE)
+    at.session_state["messages"] = list(messages)
+    at.run()
+    at.button[0].click().run()
+    return at
+
+
+def wait_for_reply(at) -> str:
+    deadline = time.time() + 5
+    while at.session_state["active_lookup"] is not None and time.time() < deadline:
+        time.sleep(0.1)
+        at.run()
+    return at.session_state["messages"][-1]["content"]
+
+
+def test_lookups_run_in_the_background_and_are_shared(monkeypatch):
+    st.cache_resource.clear()
+    runs, release = [], threading.Event()
+
+    def slow_pipeline(route, history, progress_fn=None):
+        runs.append(route["session_id"])
+        progress_fn("📥 scraping", "scrape")
+        release.wait(5)
+        return "Here are 1 papers"
+
+    monkeypatch.setattr(llm_wrapper, "lookup_pipeline", slow_pipeline)
+    set_openai_client(FakeOpenAI())
+    try:
+        at = confirm_lookup()
+        # the click returned while the lookup is still running
+        assert at.session_state["active_lookup"] is not None and not release.is_set()
+        release.set()
+        assert wait_for_reply(at) == "Here are 1 papers"
+
+        other = confirm_lookup()  # another session, same lookup: answered from the finished job
+        assert wait_for_reply(other) == "Here are 1 papers"
+        assert len(runs) == 1
+
+        # the same query in another conversation is ranked and summarized for that one
+        followup = confirm_lookup([{"role": "user", "content": "only papers on hierarchical priors please"}])
+        assert wait_for_reply(followup) == "Here are 1 papers"
+        assert len(runs) == 2
+    finally:
+        release.set()
+        set_openai_client(None)
+
+
+def test_blocked_lookup_offers_to_resume_its_own_captcha(monkeypatch):
+    st.cache_resource.clear()
+    broker = get_captcha_broker()
+
+    def blocked_pipeline(route, history, progress_fn=None):
+        resumed = broker.register(route["session_id"], "https://scholar.google.com/sorry")
+        try:
+            resumed.wait(5)
+        finally:
+            broker.resolved(route["session_id"])
+        return "Here are 0 papers"
+
+    monkeypatch.setattr(llm_wrapper, "lookup_pipeline", blocked_pipeline)
+    set_openai_client(FakeOpenAI())
+    other = broker.register("someone-else", "https://scholar.google.com/sorry")
+    try:
+        at = confirm_lookup()
+        sid = at.session_state["session_id"]
+        deadline = time.time() + 5
+        while not any(p["session"] == sid for p in broker.pending()) and time.time() < deadline:
+            time.sleep(0.05)
+        at.run()
+        # only this session's captcha, drawn by the polling fragment
+        assert [b.key for b in at.button if b.key and b.key.startswith("resume-")] == [f"resume-{sid}"]
+
+        # another session attached to the same running job sees the owner's captcha too
+        watcher = confirm_lookup()
+        assert watcher.session_state["active_lookup"]["owner"] == sid
+        assert [b.key for b in watcher.button if b.key and b.key.startswith("resume-")] == [f"resume-{sid}"]
+
+        at.button(key=f"resume-{sid}").click().run()
+        assert wait_for_reply(at) == "Here are 0 papers"
+        assert wait_for_reply(watcher) == "Here are 0 papers"
+        assert not other.is_set()
+    finally:
+        broker.resume("someone-else")
+        broker.resolved("someone-else")
+        set_openai_client(None)
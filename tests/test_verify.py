@@ -0,0 +1,56 @@
+import json
+import threading
+from pathlib import Path
+
+from app import scholar
+from app.verify import FuzzyTitleIndex, extract_title, split_citations, verify_citations
+
+FIXTURES = Path(__file__).parent / "fixtures"
+POOL = json.loads((FIXTURES / "scholar_bayesian_regression_p0.json").read_text())
+
+
+def test_extract_title():
+    assert extract_title('3. Park, T. "The Bayesian lasso." JASA, 2008.') == "The Bayesian lasso"
+    assert extract_title("Park, T., & Casella, G. (2008). The Bayesian lasso. JASA, 103.") == "The Bayesian lasso"
+    assert extract_title("[2] Bayesian linear regression") == "Bayesian linear regression"
+    assert split_citations("1. A title here\n\n- Another one\n -  \n") == ["1. A title here", "- Another one"]
+
+
+def test_fuzzy_index_tolerates_typos():
+    index = FuzzyTitleIndex()
+    assert index.add_many(POOL) == len({(p["title"], p["year"]) for p in POOL})
+    assert not index.add(dict(POOL[0]))
+
+    title = POOL[5]["title"]
+    typo = title[:5] + title[6:] + "."
+    paper, score = index.match(typo)[0]
+    assert paper["title"] == title
+    assert 0.8 <= score < 1.0
+    assert index.match(title)[0][1] == 1.0
+    assert not index.match("Quantum chromodynamics on the lattice") or \
+        index.match("Quantum chromodynamics on the lattice")[0][1] < 0.5
+
+
+def test_only_unresolved_titles_are_scraped(monkeypatch):
+    index = FuzzyTitleIndex()
+    index.add_many(POOL[:5])
+    scraped, lock = [], threading.Lock()
+
+    def fake_search(query, pool_size=3, wait_for_user=False):
+        with lock:
+            scraped.append(query)
+        return [p for p in POOL if p["title"] == query]
+
+    monkeypatch.setattr(scholar, "search_scholar", fake_search)
+    citations = [
+        POOL[0]["title"],                      # known locally
+        f'Doe, J. (2020). {POOL[7]["title"]}. Journal.',  # found on Scholar
+        "A completely made up paper about nothing",
+        "A completely made up paper about nothing",
+    ]
+    verdicts = verify_citations(citations, index=index, concurrency=2)
+
+    assert [v["status"] for v in verdicts] == ["found", "found", "not_found", "not_found"]
+    assert [v["source"] for v in verdicts[:2]] == ["index", "scholar"]
+    assert verdicts[1]["match"]["title"] == POOL[7]["title"]
+    assert sorted(scraped) == sorted([POOL[7]["title"], "A completely made up paper about nothing"])
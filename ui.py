@@ -1,15 +1,76 @@
+import threading
+import time
+import uuid
+
 import streamlit as st
-from llm_wrapper import chat_query, run_scholar_lookup
+from app import config
+from app.browser import get_browser_pool
+from app.captcha import get_captcha_broker
+from app.clients import get_openai_client
+from app.jobs import FAILED, get_job_queue
+from app.pools import get_pool_store
+from llm_wrapper import chat_query, lookup_key, new_history, rescore, submit_lookup
 
 st.set_page_config(page_title="📚 Research Helper", layout="wide")
 
+
+# ── Shared across reruns and sessions ─────────────────────────────────────────
+@st.cache_resource
+def shared_services():
+    """Lookup workers, OpenAI client and browser pool, set up once per server."""
+    get_openai_client()
+    get_browser_pool()
+    return get_job_queue()
+
+
+@st.cache_resource
+def shared_lookups():
+    """Lookup key -> (job id, session id, submitted); identical lookups share one job."""
+    return {}, threading.Lock()
+
+
+def start_lookup(route: dict, history):
+    """
+    The job answering route, and the session it runs for (whose id its
+    captchas wait under): a finished or running identical lookup in the same
+    conversational context (from any session, within LOOKUP_REUSE_TTL) if
+    there is one, else a new job for this session.
+    """
+    jobs = shared_services()
+    lookups, lock = shared_lookups()
+    key = lookup_key(route, history)
+    with lock:
+        entry = lookups.get(key)
+        job = jobs.get(entry[0]) if entry else None
+        if job is not None and job.status != FAILED and time.time() - entry[2] < config.LOOKUP_REUSE_TTL:
+            # the pool the other session scraped can be re-ranked here too
+            pool = get_pool_store().get(entry[1])
+            if pool is not None:
+                get_pool_store().put(route["session_id"], pool)
+            print(f"♻️ Reusing lookup {job.id} for {route.get('query')!r}")
+            return job, entry[1]
+        job = submit_lookup(route, history)
+        lookups[key] = (job.id, route["session_id"], time.time())
+        return job, route["session_id"]
+
+
 st.title("📚 Research Helper")
 
 # Initialize session state
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "history" not in st.session_state:
+    # prompt view of messages: token-counted once per turn, capped by budget
+    st.session_state.history = new_history()
 if "pending_route" not in st.session_state:
     st.session_state.pending_route = None
+if "session_id" not in st.session_state:
+    # the last scraped pool is kept under this id for instant re-ranking
+    st.session_state.session_id = uuid.uuid4().hex
+if "last_lookup" not in st.session_state:
+    st.session_state.last_lookup = None
+if "active_lookup" not in st.session_state:
+    st.session_state.active_lookup = None  # {"job": id, "route": route, "owner": session id} while a lookup runs
 
 # Sidebar for mode choice
 with st.sidebar:
@@ -20,11 +81,73 @@ with st.sidebar:
         index=0,  # default = auto
     )
 
+    # Switching modes re-ranks the last scraped pool instantly (no new scrape)
+    last = st.session_state.last_lookup
+    if last and mode not in ("auto", last["mode"]):
+        papers = rescore(st.session_state.session_id, mode, top_k=last["top_n"])
+        if papers:
+            st.subheader(f"🔁 {last['query']} — {mode}")
+            for i, p in enumerate(papers, 1):
+                year = p.get("year") or "n.d."
+                st.markdown(f"{i}. **{p.get('title', 'No title')}** ({year}, {p.get('citations') or 0} cites)")
+            st.caption("Ask again to get summaries under this mode.")
+
 # Display chat history
 for msg in st.session_state.messages:
     with st.chat_message(msg["role"]):
         st.markdown(msg["content"])
 
+
+# Running lookup: polled in the background, the rest of the page stays usable
+@st.fragment(run_every=1.0)
+def lookup_progress():
+    active = st.session_state.active_lookup
+    if active is None:
+        return
+    job = shared_services().get(active["job"])
+    if job is None:
+        st.session_state.active_lookup = None
+        st.rerun(scope="app")
+    state = job.to_dict()
+    with st.chat_message("assistant"):
+        if state["events"]:
+            st.markdown(f"```\n{state['events'][-1]['message']}\n```")
+        else:
+            st.markdown("```\n⏳ Waiting for a free lookup worker...\n```")
+        # papers appear in rank order as their summaries arrive
+        blocks = {e["index"]: e["block"] for e in state["events"] if "block" in e}
+        if blocks:
+            st.markdown("\n\n---\n\n".join(blocks[i] for i in sorted(blocks)))
+
+        # the job's scrape blocked on a captcha (solve it in the browser, or skip waiting);
+        # it waits under the id of the session the job runs for, maybe another one
+        session_id = active["owner"]
+        pending = next((p for p in get_captcha_broker().pending() if p["session"] == session_id), None)
+        if pending:
+            st.warning(f"🧩 Captcha while scraping\n\n{pending['url']}")
+            if st.button("▶️ Resume scraping", key=f"resume-{session_id}"):
+                get_captcha_broker().resume(session_id)
+
+    if not job.done:
+        return
+    route = active["route"]
+    if state["status"] == FAILED:
+        reply = f"⚠️ Lookup failed: {state['error']}"
+    else:
+        reply = state["result"]
+        if route.get("mode", "broad") == "broad":
+            st.session_state.last_lookup = {
+                "query": route.get("query", ""),
+                "mode": route.get("ranking_mode", "balanced"),
+                "top_n": int(route.get("final_top_n", 10)),
+            }
+    st.session_state.messages.append({"role": "assistant", "content": reply})
+    st.session_state.active_lookup = None
+    st.rerun(scope="app")
+
+
+lookup_progress()
+
 # Input box
 if user_input := st.chat_input("Ask me about papers, citations, or concepts..."):
     st.session_state.messages.append({"role": "user", "content": user_input})
@@ -34,9 +157,8 @@ if user_input := st.chat_input("Ask me about papers, citations, or concepts...")
     with st.chat_message("assistant"):
         with st.spinner("🔎 Thinking..."):
             try:
-                reply, route = chat_query(
-                    user_input, mode=mode, history=st.session_state.messages
-                )
+                history = st.session_state.history.sync(st.session_state.messages)
+                reply, route = chat_query(user_input, mode=mode, history=history)
 
                 if route and route.get("action") == "scholar_lookup":
                     # Store pending route for later confirmation
@@ -65,22 +187,12 @@ if st.session_state.pending_route:
         col1, col2 = st.columns(2)
 
         with col1:
-            if st.button("✅ Yes, search now"):
+            busy = st.session_state.active_lookup is not None
+            if st.button("✅ Yes, search now", disabled=busy, help="Wait for the running lookup" if busy else None):
                 print("🔎 User confirmed Scholar lookup...")
-
-                status_box = st.empty()
-
-                def log_update(msg: str):
-                    print(msg)
-                    status_box.markdown(f"```\n{msg}\n```")
-
-                reply = run_scholar_lookup(
-                    route, history=st.session_state.messages, log_fn=log_update
-                )
-
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": reply}
-                )
+                route["session_id"] = st.session_state.session_id
+                job, owner = start_lookup(route, st.session_state.history.sync(st.session_state.messages))
+                st.session_state.active_lookup = {"job": job.id, "route": route, "owner": owner}
                 st.session_state.pending_route = None
                 st.rerun()
 
@@ -92,4 +204,3 @@ if st.session_state.pending_route:
                 )
                 st.session_state.pending_route = None
                 st.rerun()
-